@@ -0,0 +1,22 @@
+"""
+One-off migration: re-key legacy code chunks so their _id is the chunk_id.
+
+Usage (from the backend directory):
+    python -m scripts.migrate_chunk_ids
+"""
+
+from src.database.mongodb import db
+from src.database.repositories import ChunkRepository
+
+
+def main() -> None:
+    db.connect()
+    try:
+        count = ChunkRepository.migrate_legacy_ids()
+        print(f"Re-keyed {count} chunks")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
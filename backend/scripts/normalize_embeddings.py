@@ -0,0 +1,25 @@
+"""
+One-off migration: rewrite legacy embeddings as normalized float32 vectors.
+
+Usage (from the backend directory):
+    python -m scripts.normalize_embeddings [job_id]
+"""
+
+import sys
+
+from src.database.mongodb import db
+from src.embeddings.vector_store import get_vector_store
+
+
+def main() -> None:
+    job_id = sys.argv[1] if len(sys.argv) > 1 else None
+    db.connect()
+    try:
+        count = get_vector_store().normalize_stored_embeddings(job_id)
+        print(f"Normalized {count} embeddings")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
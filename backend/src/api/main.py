@@ -22,10 +22,12 @@ from fastapi.responses import JSONResponse
 
 from src.config import settings
 from src.database.mongodb import db
+from src.database.async_mongodb import async_db
 from src.database.models import HealthResponse
 from src.api.routes.ingestion import router as ingestion_router
 from src.api.routes.retrieval import router as retrieval_router
 from src.api.routes.generation import router as generation_router
+from src.generation.llm_client import close_default_llm_client
 from src.api.middleware import (
     limiter,
     rate_limit_exceeded_handler,
@@ -83,6 +85,11 @@ async def lifespan(app: FastAPI):
         logger.critical(f"❌ Failed to connect to database: {e}")
         raise
     
+    if settings.EAGER_INIT:
+        from src.generation.generator import get_generator
+        get_generator()
+        logger.info("✅ Generator initialized")
+    
     logger.info("✅ DocuMind AI backend ready to serve requests")
     
     yield
@@ -90,7 +97,10 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down DocuMind AI backend...")
     db.close()
+    async_db.close()
     logger.info("Database connection closed")
+    await close_default_llm_client()
+    logger.info("LLM client connections closed")
 
 
 # Create FastAPI application
@@ -4,14 +4,16 @@ Handles RAG-based code documentation generation.
 """
 
 from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, validator
 
 from src.generation import (
     get_generator,
     GeneratorError,
     GenerationResponse,
-    GenerationStatus
+    GenerationStatus,
+    dump_json
 )
 from src.database.repositories import JobRepository
 from src.utils.logger import get_logger
@@ -106,6 +108,7 @@ class GenerateResponseModel(BaseModel):
     query: str
     tokens_used: Optional[int] = None
     error_message: Optional[str] = None
+    cache_hit: bool = False
 
     class Config:
         json_schema_extra = {
@@ -126,11 +129,62 @@ class GenerateResponseModel(BaseModel):
                 "model": "mock-llm",
                 "job_id": "5fa93024-e32b-47f4-a7f1-8cfcce61b182",
                 "query": "How does authentication work?",
-                "tokens_used": 256
+                "tokens_used": 256,
+                "cache_hit": False
             }
         }
 
 
+class GenerateBatchRequest(BaseModel):
+    """Request model for batch generation endpoint."""
+    queries: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        description="Questions to answer about the codebase"
+    )
+    job_id: str = Field(
+        ...,
+        min_length=1,
+        description="Job ID to search within"
+    )
+    top_k: int = Field(default=5, ge=1, le=20)
+    max_tokens: int = Field(default=1024, ge=50, le=4096)
+    temperature: float = Field(default=0.7, ge=0.0, le=2.0)
+    
+    @validator("queries")
+    def validate_queries(cls, v):
+        """Validate and strip each query."""
+        queries = [q.strip() for q in v]
+        if any(not q for q in queries):
+            raise ValueError("Queries cannot be empty")
+        return queries
+    
+    @validator("job_id")
+    def validate_job_id(cls, v):
+        """Validate job_id format."""
+        if not v or not v.strip():
+            raise ValueError("Job ID cannot be empty")
+        return v.strip()
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": [
+                    "How does the authentication system work?",
+                    "Where are database connections configured?"
+                ],
+                "job_id": "5fa93024-e32b-47f4-a7f1-8cfcce61b182",
+                "top_k": 5
+            }
+        }
+
+
+class GenerateBatchResponseModel(BaseModel):
+    """Response model for batch generation endpoint."""
+    responses: List[GenerateResponseModel]
+
+
 class GenerateWithContextRequest(BaseModel):
     """Request model for generation with manual context."""
     query: str = Field(..., min_length=1, max_length=2000)
@@ -262,7 +316,7 @@ class GenerateDocResponse(BaseModel):
     """
 )
 @limiter.limit("30/minute")
-async def generate(request: Request, body: GenerateRequest) -> GenerateResponseModel:
+async def generate(request: Request, body: GenerateRequest) -> Response:
     """Generate an answer for a query about a codebase."""
     # Validate query
     is_valid, error_msg = validate_query(body.query)
@@ -309,27 +363,7 @@ async def generate(request: Request, body: GenerateRequest) -> GenerateResponseM
             f"status={response.status}, sources={len(response.sources)}"
         )
         
-        return GenerateResponseModel(
-            answer=response.answer,
-            status=response.status.value,
-            sources=[
-                SourceModel(
-                    file_path=s.file_path,
-                    start_line=s.start_line,
-                    end_line=s.end_line,
-                    language=s.language,
-                    relevance_score=s.relevance_score,
-                    snippet_preview=s.snippet_preview
-                )
-                for s in response.sources
-            ],
-            confidence=response.confidence,
-            model=response.model,
-            job_id=response.job_id,
-            query=response.query,
-            tokens_used=response.tokens_used,
-            error_message=response.error_message
-        )
+        return Response(content=response.to_bytes(), media_type="application/json")
         
     except GeneratorError as e:
         logger.error(f"Generator error: {e}")
@@ -345,6 +379,148 @@ async def generate(request: Request, body: GenerateRequest) -> GenerateResponseM
         )
 
 
+@router.post(
+    "/stream",
+    summary="Stream a documentation answer",
+    description="""
+    Generate an answer like `POST /generate`, streamed as newline-delimited
+    JSON events as the LLM produces it.
+    
+    **Events (in order):**
+    - `metadata`: status, sources, confidence, model, job_id, query
+    - `token`: a chunk of the answer in `content` (repeated)
+    - `done`, or `error` with a `message` if generation failed mid-stream
+    """
+)
+@limiter.limit("30/minute")
+async def generate_stream(request: Request, body: GenerateRequest) -> StreamingResponse:
+    """Stream an answer for a query about a codebase."""
+    # Validate query
+    is_valid, error_msg = validate_query(body.query)
+    if not is_valid:
+        raise HTTPException(
+            status_code=400,
+            detail=error_msg
+        )
+    
+    sanitized_query = sanitize_query(body.query)
+    logger.info(f"Streaming generation request for job {body.job_id}: {sanitized_query[:50]}...")
+    
+    # Validate job exists
+    job = JobRepository.get_job(body.job_id)
+    if not job:
+        logger.warning(f"Job not found: {body.job_id}")
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job not found: {body.job_id}"
+        )
+    
+    # Check job status
+    if job.status not in ["completed", "embedded"]:
+        logger.warning(f"Job {body.job_id} not ready for generation: {job.status}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Job not ready for generation. Current status: {job.status}. "
+                   f"Job must be 'completed' or 'embedded'."
+        )
+    
+    generator = get_generator()
+    events = generator.generate_stream(
+        query=body.query,
+        job_id=body.job_id,
+        top_k=body.top_k,
+        max_tokens=body.max_tokens,
+        temperature=body.temperature
+    )
+    
+    # Run retrieval before the response starts so failures still map to
+    # an HTTP error status
+    try:
+        metadata = await events.__anext__()
+    except GeneratorError as e:
+        logger.error(f"Generator error: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Generation failed: {str(e)}"
+        )
+    
+    async def ndjson():
+        yield dump_json(metadata) + b"\n"
+        async for event in events:
+            yield dump_json(event) + b"\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/batch",
+    response_model=GenerateBatchResponseModel,
+    summary="Generate answers for several questions",
+    description="""
+    Answer up to 20 questions about the same codebase in one request.
+    
+    Queries are embedded and retrieved together and sent to the LLM as a
+    single batch. Responses are returned in query order.
+    """
+)
+@limiter.limit("10/minute")
+async def generate_batch(request: Request, body: GenerateBatchRequest) -> Response:
+    """Generate answers for several queries about a codebase."""
+    for query in body.queries:
+        is_valid, error_msg = validate_query(query)
+        if not is_valid:
+            raise HTTPException(
+                status_code=400,
+                detail=error_msg
+            )
+    
+    logger.info(f"Batch generation request for job {body.job_id}: {len(body.queries)} queries")
+    
+    # Validate job exists
+    job = JobRepository.get_job(body.job_id)
+    if not job:
+        logger.warning(f"Job not found: {body.job_id}")
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job not found: {body.job_id}"
+        )
+    
+    # Check job status
+    if job.status not in ["completed", "embedded"]:
+        logger.warning(f"Job {body.job_id} not ready for generation: {job.status}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Job not ready for generation. Current status: {job.status}. "
+                   f"Job must be 'completed' or 'embedded'."
+        )
+    
+    try:
+        generator = get_generator()
+        responses = await generator.generate_batch(
+            queries=body.queries,
+            job_id=body.job_id,
+            top_k=body.top_k,
+            max_tokens=body.max_tokens,
+            temperature=body.temperature
+        )
+        
+        content = b'{"responses":[' + b",".join(r.to_bytes() for r in responses) + b"]}"
+        return Response(content=content, media_type="application/json")
+        
+    except GeneratorError as e:
+        logger.error(f"Generator error: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Generation failed: {str(e)}"
+        )
+    except Exception as e:
+        logger.exception(f"Unexpected error during batch generation: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred during generation"
+        )
+
+
 @router.post(
     "/with-context",
     response_model=GenerateResponseModel,
@@ -353,7 +529,7 @@ async def generate(request: Request, body: GenerateRequest) -> GenerateResponseM
 )
 async def generate_with_context(
     request: GenerateWithContextRequest
-) -> GenerateResponseModel:
+) -> Response:
     """Generate an answer with manually provided context."""
     logger.info(f"Generation with manual context: {request.query[:50]}...")
     
@@ -366,27 +542,7 @@ async def generate_with_context(
             temperature=request.temperature
         )
         
-        return GenerateResponseModel(
-            answer=response.answer,
-            status=response.status.value,
-            sources=[
-                SourceModel(
-                    file_path=s.file_path,
-                    start_line=s.start_line,
-                    end_line=s.end_line,
-                    language=s.language,
-                    relevance_score=s.relevance_score,
-                    snippet_preview=s.snippet_preview
-                )
-                for s in response.sources
-            ],
-            confidence=response.confidence,
-            model=response.model,
-            job_id=response.job_id,
-            query=response.query,
-            tokens_used=response.tokens_used,
-            error_message=response.error_message
-        )
+        return Response(content=response.to_bytes(), media_type="application/json")
         
     except Exception as e:
         logger.exception(f"Error during context generation: {e}")
@@ -480,7 +636,7 @@ async def generate_documentation(
         )
         
         return GenerateDocResponse(
-            status=response.status.value,
+            status=response.status,
             content=response.answer,
             doc_type=body.doc_type,
             job_id=body.job_id,
@@ -14,7 +14,7 @@ from src.database.models import (
     IngestRequest, IngestResponse, JobStatusResponse,
     CodeChunk
 )
-from src.database.repositories import JobRepository, ChunkRepository
+from src.database.repositories import JobRepository, ChunkRepository, AsyncChunkRepository
 from src.ingestion.git_client import GitClient, GitClientError
 from src.ingestion.file_walker import FileWalker, get_language_from_extension
 from src.ingestion.parser import FileParser, FileParseError
@@ -210,6 +210,13 @@ async def list_jobs(
     }
 
 
+# Chunk fields returned by the chunks endpoint
+_CHUNK_RESPONSE_FIELDS = [
+    "chunk_id", "file_path", "language",
+    "start_line", "end_line", "token_count", "content"
+]
+
+
 @router.get(
     "/jobs/{job_id}/chunks",
     summary="Get job chunks",
@@ -239,24 +246,18 @@ async def get_job_chunks(
             detail=f"Job not found: {job_id}"
         )
     
-    # Get chunks
-    if file_path:
-        chunks = ChunkRepository.get_chunks_by_file(job_id, file_path)
-    else:
-        chunks = ChunkRepository.get_chunks_by_job(job_id, limit=limit)
+    # Get chunks as raw BSON - they are forwarded without further processing
+    chunks = ChunkRepository.get_raw_chunks(
+        job_id,
+        file_path=file_path,
+        limit=limit,
+        fields=_CHUNK_RESPONSE_FIELDS
+    )
     
     return {
         "job_id": job_id,
         "chunks": [
-            {
-                "chunk_id": chunk.chunk_id,
-                "file_path": chunk.file_path,
-                "language": chunk.language,
-                "start_line": chunk.start_line,
-                "end_line": chunk.end_line,
-                "token_count": chunk.token_count,
-                "content": chunk.content
-            }
+            {field: chunk.get(field) for field in _CHUNK_RESPONSE_FIELDS}
             for chunk in chunks
         ],
         "total": len(chunks)
@@ -296,12 +297,11 @@ async def run_ingestion_pipeline(job_id: str, repo_url: str) -> None:
         # =================================================================
         # Stage 1: Clone Repository
         # =================================================================
-        JobRepository.update_job_status(job_id, JobStatus.CLONING)
+        JobRepository.transition(job_id, JobStatus.CLONING)
         logger.info(f"[{job_id}] Cloning repository: {repo_url}")
         
         try:
             local_path, repo_name = git_client.clone_repository(repo_url, job_id)
-            JobRepository.update_job_local_path(job_id, local_path)
             logger.info(f"[{job_id}] Clone complete: {local_path}")
         except GitClientError as e:
             raise IngestionError(f"Failed to clone repository: {e}")
@@ -309,7 +309,9 @@ async def run_ingestion_pipeline(job_id: str, repo_url: str) -> None:
         # =================================================================
         # Stage 2: Scan Files
         # =================================================================
-        JobRepository.update_job_status(job_id, JobStatus.SCANNING)
+        JobRepository.transition(
+            job_id, JobStatus.SCANNING, phase="cloning", local_path=local_path
+        )
         logger.info(f"[{job_id}] Scanning files...")
         
         files = file_walker.get_all_files(local_path)
@@ -328,12 +330,11 @@ async def run_ingestion_pipeline(job_id: str, repo_url: str) -> None:
             stats.files_by_language[lang] = stats.files_by_language.get(lang, 0) + 1
         
         logger.info(f"[{job_id}] Found {stats.total_files} files")
-        JobRepository.set_phase_complete(job_id, "scanning")
         
         # =================================================================
         # Stage 3 & 4: Parse and Chunk Files
         # =================================================================
-        JobRepository.update_job_status(job_id, JobStatus.PARSING)
+        JobRepository.transition(job_id, JobStatus.PARSING, phase="scanning")
         logger.info(f"[{job_id}] Parsing files...")
         
         all_chunks = []
@@ -356,48 +357,42 @@ async def run_ingestion_pipeline(job_id: str, repo_url: str) -> None:
                 logger.warning(f"[{job_id}] Error processing {file_info.relative_path}: {e}")
                 continue
         
-        JobRepository.set_phase_complete(job_id, "parsing")
-        
         # Update to chunking status
-        JobRepository.update_job_status(job_id, JobStatus.CHUNKING)
+        JobRepository.transition(job_id, JobStatus.CHUNKING, phase="parsing")
         stats.total_chunks = len(all_chunks)
         logger.info(f"[{job_id}] Generated {stats.total_chunks} chunks from {stats.processed_files} files")
-        JobRepository.set_phase_complete(job_id, "chunking")
         
         # =================================================================
         # Stage 5: Store Chunks
         # =================================================================
-        JobRepository.update_job_status(job_id, JobStatus.STORING)
+        JobRepository.transition(job_id, JobStatus.STORING, phase="chunking")
         logger.info(f"[{job_id}] Storing chunks in database...")
         
         if all_chunks:
-            # Convert Chunk objects to CodeChunk models
+            # Convert Chunk objects to CodeChunk models. The chunker output
+            # is already typed, so skip re-validation in this hot loop.
             code_chunks = [
-                CodeChunk(
-                    chunk_id=chunk.chunk_id,
-                    job_id=chunk.job_id,
-                    file_path=chunk.file_path,
-                    language=chunk.language,
-                    start_line=chunk.start_line,
-                    end_line=chunk.end_line,
-                    content=chunk.content,
-                    token_count=chunk.token_count,
-                    metadata={"line_count": chunk.end_line - chunk.start_line + 1}
-                )
+                CodeChunk.model_construct(**chunk.to_dict())
                 for chunk in all_chunks
             ]
             
-            # Bulk insert chunks
-            inserted_count = ChunkRepository.insert_chunks_bulk(code_chunks)
+            # Bulk insert chunks; if any batch came up short, fill the
+            # gaps once and fail the job if chunks are still missing
+            inserted_count = await AsyncChunkRepository.insert_chunks_bulk(code_chunks)
+            if inserted_count < len(code_chunks):
+                inserted_count = ChunkRepository.verify_chunks_stored(job_id, code_chunks)
+                if inserted_count < len(code_chunks):
+                    raise IngestionError(
+                        f"Stored only {inserted_count} of {len(code_chunks)} chunks"
+                    )
             logger.info(f"[{job_id}] Stored {inserted_count} chunks")
         
-        JobRepository.set_phase_complete(job_id, "storing")
-        
         # =================================================================
         # Complete
         # =================================================================
-        JobRepository.update_job_stats(job_id, stats)
-        JobRepository.update_job_status(job_id, JobStatus.COMPLETED)
+        JobRepository.transition(
+            job_id, JobStatus.COMPLETED, phase="storing", stats=stats
+        )
         
         logger.info(
             f"[{job_id}] Ingestion complete: "
@@ -406,16 +401,17 @@ async def run_ingestion_pipeline(job_id: str, repo_url: str) -> None:
         
     except IngestionError as e:
         logger.error(f"[{job_id}] Ingestion failed: {e}")
-        JobRepository.update_job_stats(job_id, stats)
-        JobRepository.update_job_status(job_id, JobStatus.FAILED, str(e))
+        JobRepository.transition(
+            job_id, JobStatus.FAILED, stats=stats, error_message=str(e)
+        )
         
     except Exception as e:
         logger.exception(f"[{job_id}] Unexpected error during ingestion: {e}")
-        JobRepository.update_job_stats(job_id, stats)
-        JobRepository.update_job_status(
-            job_id, 
-            JobStatus.FAILED, 
-            f"Unexpected error: {str(e)}"
+        JobRepository.transition(
+            job_id,
+            JobStatus.FAILED,
+            stats=stats,
+            error_message=f"Unexpected error: {str(e)}"
         )
 
 
@@ -473,6 +469,13 @@ async def delete_job(job_id: str):
         "repo_files": False
     }
     
+    # Stop treating the job as indexed (or serving its cached answers)
+    # before its data goes away
+    from src.retrieval.retriever import forget_job
+    from src.generation.generator import forget_job as forget_job_responses
+    forget_job(sanitized_id)
+    forget_job_responses(sanitized_id)
+    
     # Delete embeddings
     try:
         from src.embeddings.vector_store import get_vector_store
@@ -30,6 +30,7 @@ class Settings:
     JOBS_COLLECTION: str = "jobs"
     CHUNKS_COLLECTION: str = "code_chunks"
     EMBEDDINGS_COLLECTION: str = "embeddings"
+    PQ_CODEBOOKS_COLLECTION: str = "pq_codebooks"
     
     # ==========================================================================
     # Git Configuration
@@ -87,6 +88,23 @@ class Settings:
     EMBEDDING_DIMENSIONS: int = int(os.getenv("EMBEDDING_DIMENSIONS", "384"))
     EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
     
+    # Maximum embedding batches in flight at once
+    EMBEDDING_MAX_CONCURRENCY: int = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+    EMBEDDING_MAX_RETRIES: int = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+    
+    # In-process embedding cache (number of vectors kept, 0 disables)
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    
+    # Product quantization of stored embeddings for fallback search
+    # (jobs with fewer than PQ_MIN_VECTORS embeddings stay exact)
+    PQ_ENABLED: bool = os.getenv("PQ_ENABLED", "false").lower() == "true"
+    PQ_SUBVECTORS: int = int(os.getenv("PQ_SUBVECTORS", "48"))
+    PQ_MIN_VECTORS: int = int(os.getenv("PQ_MIN_VECTORS", "1024"))
+    
+    # Local embedder precision on CPU: "none" keeps FP32, "int8" applies
+    # dynamic int8 quantization to the model's linear layers
+    EMBEDDER_QUANTIZATION: str = os.getenv("EMBEDDER_QUANTIZATION", "none").lower()
+    
     # Use mock embeddings for testing (set to "true" to use random vectors)
     USE_MOCK_EMBEDDINGS: bool = os.getenv("USE_MOCK_EMBEDDINGS", "false").lower() == "true"
     
@@ -95,6 +113,10 @@ class Settings:
     DEFAULT_TOP_K: int = int(os.getenv("DEFAULT_TOP_K", "5"))
     SIMILARITY_THRESHOLD: float = float(os.getenv("SIMILARITY_THRESHOLD", "0.5"))
     
+    # Atlas $vectorSearch candidates per requested result, and query timeout
+    VECTOR_SEARCH_NUM_CANDIDATES_MULT: int = int(os.getenv("VECTOR_SEARCH_NUM_CANDIDATES_MULT", "10"))
+    VECTOR_SEARCH_TIMEOUT_MS: int = int(os.getenv("VECTOR_SEARCH_TIMEOUT_MS", "10000"))
+    
     # ==========================================================================
     # Phase 3: LLM / Generation Configuration
     # ==========================================================================
@@ -105,6 +127,9 @@ class Settings:
     # Use mock LLM for testing
     USE_MOCK_LLM: bool = os.getenv("USE_MOCK_LLM", "true").lower() == "true"
     
+    # Simulated latency of each mock LLM call in seconds (0 answers at once)
+    MOCK_LLM_DELAY: float = float(os.getenv("MOCK_LLM_DELAY", "0"))
+    
     # Ollama LLM (Local - No API key required)
     LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "http://localhost:11434")
     LLM_MODEL: str = os.getenv("LLM_MODEL", "qwen3:8b")
@@ -122,9 +147,42 @@ class Settings:
     LLM_DEFAULT_MAX_TOKENS: int = int(os.getenv("LLM_DEFAULT_MAX_TOKENS", "1024"))
     LLM_DEFAULT_TEMPERATURE: float = float(os.getenv("LLM_DEFAULT_TEMPERATURE", "0.7"))
     
+    # Coalesce concurrent generate() calls into batched LLM requests
+    LLM_BATCH_ENABLED: bool = os.getenv("LLM_BATCH_ENABLED", "false").lower() == "true"
+    LLM_BATCH_MAX_SIZE: int = int(os.getenv("LLM_BATCH_MAX_SIZE", "16"))
+    LLM_BATCH_MAX_WAIT_MS: float = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", "10"))
+    
+    # Maximum requests in flight per generate_batch() call on clients
+    # without a native batch endpoint
+    LLM_CONCURRENCY: int = int(os.getenv("LLM_CONCURRENCY", "8"))
+    
     # Generation Configuration
     MAX_CONTEXT_TOKENS: int = int(os.getenv("MAX_CONTEXT_TOKENS", "3000"))
     
+    # Share of the model's context window the whole prompt plus answer may use
+    CONTEXT_BUDGET_RATIO: float = float(os.getenv("CONTEXT_BUDGET_RATIO", "0.6"))
+    
+    # Build the generator (retriever, LLM client, prompts) at startup
+    # instead of on the first generation request
+    EAGER_INIT: bool = os.getenv("EAGER_INIT", "false").lower() == "true"
+    
+    # Answer returned without calling the LLM when retrieval finds nothing
+    NO_CONTEXT_ANSWER: str = os.getenv(
+        "NO_CONTEXT_ANSWER",
+        "I don't have information about that in the indexed codebase."
+    )
+    
+    # Semantic response cache (query-to-query cosine similarity; size 0 disables).
+    # Off by default: a near-duplicate query can still need a different answer
+    SEMANTIC_CACHE_SIZE: int = int(os.getenv("SEMANTIC_CACHE_SIZE", "0"))
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))
+    SEMANTIC_CACHE_TTL: float = float(os.getenv("SEMANTIC_CACHE_TTL", "300"))
+    
+    # Exact-match cache of deterministic (temperature 0) LLM responses
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    LLM_CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", "1000"))
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", "3600"))
+    
     # ==========================================================================
     # Security Configuration
     # ==========================================================================
@@ -202,6 +260,8 @@ class Settings:
             errors.append(f"Invalid LLM_TIMEOUT: {self.LLM_TIMEOUT} (must be > 0)")
         if self.LLM_MAX_RETRIES < 0:
             errors.append(f"Invalid LLM_MAX_RETRIES: {self.LLM_MAX_RETRIES} (must be >= 0)")
+        if self.LLM_CONCURRENCY < 1:
+            errors.append(f"Invalid LLM_CONCURRENCY: {self.LLM_CONCURRENCY} (must be >= 1)")
         if not 0 <= self.LLM_DEFAULT_TEMPERATURE <= 2:
             errors.append(f"Invalid LLM_DEFAULT_TEMPERATURE: {self.LLM_DEFAULT_TEMPERATURE}")
         if self.MAX_QUERY_LENGTH <= 0:
@@ -9,7 +9,8 @@ from src.database.models import (
     CodeChunk, IngestRequest, IngestResponse,
     JobStatusResponse, HealthResponse
 )
-from src.database.repositories import JobRepository, ChunkRepository
+from src.database.async_mongodb import async_db, get_async_chunks_collection
+from src.database.repositories import JobRepository, ChunkRepository, AsyncChunkRepository
 
 __all__ = [
     # MongoDB
@@ -17,6 +18,8 @@ __all__ = [
     "get_db",
     "get_jobs_collection",
     "get_chunks_collection",
+    "async_db",
+    "get_async_chunks_collection",
     # Models
     "Job",
     "JobStatus",
@@ -30,4 +33,5 @@ __all__ = [
     # Repositories
     "JobRepository",
     "ChunkRepository",
+    "AsyncChunkRepository",
 ]
@@ -0,0 +1,90 @@
+"""
+Async MongoDB connection management for DocuMind AI backend.
+Provides a Motor client for write paths that benefit from pipelining.
+"""
+
+from typing import Optional
+
+from src.config import settings
+from src.utils.logger import get_database_logger
+
+logger = get_database_logger()
+
+
+class AsyncMongoDB:
+    """
+    Async MongoDB connection manager (Motor) with singleton pattern.
+    Mirrors the pool settings of the synchronous MongoDB manager.
+    """
+
+    _instance: Optional['AsyncMongoDB'] = None
+    _client = None
+    _database = None
+
+    def __new__(cls) -> 'AsyncMongoDB':
+        """Ensure only one instance exists (singleton pattern)."""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def get_database(self):
+        """
+        Get the async database instance, creating the client if necessary.
+
+        Motor connects lazily, so no round trip happens here.
+
+        Returns:
+            AsyncIOMotorDatabase instance
+
+        Raises:
+            ImportError: If motor is not installed
+        """
+        if self._database is not None:
+            return self._database
+
+        try:
+            from motor.motor_asyncio import AsyncIOMotorClient
+        except ImportError as e:
+            raise ImportError(
+                "motor not installed. Install with: pip install motor"
+            ) from e
+
+        self._client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            serverSelectionTimeoutMS=5000,
+            maxPoolSize=50,
+            minPoolSize=10
+        )
+        self._database = self._client[settings.MONGODB_DATABASE]
+
+        logger.info(f"Created async MongoDB client for database: {settings.MONGODB_DATABASE}")
+        return self._database
+
+    def get_collection(self, collection_name: str):
+        """
+        Get an async collection from the database.
+
+        Args:
+            collection_name: Name of the collection
+
+        Returns:
+            AsyncIOMotorCollection instance
+        """
+        return self.get_database()[collection_name]
+
+    def close(self) -> None:
+        """Close the async MongoDB client."""
+        if self._client:
+            self._client.close()
+            self._client = None
+            self._database = None
+            logger.info("Async MongoDB connection closed")
+
+
+# Global async database instance
+async_db = AsyncMongoDB()
+
+
+def get_async_chunks_collection():
+    """Get the async code chunks collection."""
+    return async_db.get_collection(settings.CHUNKS_COLLECTION)
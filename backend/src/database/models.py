@@ -76,13 +76,11 @@ class Job(BaseModel):
     class Config:
         """Pydantic model configuration."""
         use_enum_values = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
     
     def to_mongo_dict(self) -> Dict[str, Any]:
         """Convert model to MongoDB-compatible dictionary."""
-        data = self.model_dump()
+        # Python mode keeps datetimes native so they are stored as BSON dates
+        data = self.model_dump(mode="python")
         # Ensure _id is not set (let MongoDB generate it)
         data.pop('_id', None)
         return data
@@ -145,16 +143,13 @@ class CodeChunk(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
-    class Config:
-        """Pydantic model configuration."""
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-    
     def to_mongo_dict(self) -> Dict[str, Any]:
         """Convert model to MongoDB-compatible dictionary."""
-        data = self.model_dump()
-        data.pop('_id', None)
+        # Python mode keeps datetimes native so they are stored as BSON dates
+        data = self.model_dump(mode="python")
+        # chunk_id is the natural key, so use it as _id and rely on the
+        # built-in _id index for uniqueness (chunk_id kept for queries/BC)
+        data['_id'] = data['chunk_id']
         return data
     
     @classmethod
@@ -225,15 +220,10 @@ class EmbeddingRecord(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
-    class Config:
-        """Pydantic model configuration."""
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-    
     def to_mongo_dict(self) -> Dict[str, Any]:
         """Convert model to MongoDB-compatible dictionary."""
-        data = self.model_dump()
+        # Python mode keeps datetimes native so they are stored as BSON dates
+        data = self.model_dump(mode="python")
         data.pop('_id', None)
         return data
     
@@ -4,6 +4,8 @@ Provides connection pooling and database access.
 """
 
 from typing import Optional
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from pymongo import MongoClient
 from pymongo.database import Database
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
@@ -82,8 +84,8 @@ class MongoDB:
             
             # Code chunks collection indexes
             chunks_collection = self._database[settings.CHUNKS_COLLECTION]
+            # chunk_id is stored as _id, which is already uniquely indexed
             chunks_collection.create_index("job_id")
-            chunks_collection.create_index("chunk_id", unique=True)
             chunks_collection.create_index([("job_id", 1), ("file_path", 1)])
             
             logger.info("MongoDB indexes created successfully")
@@ -163,3 +165,15 @@ def get_jobs_collection():
 def get_chunks_collection():
     """Get the code chunks collection."""
     return db.get_collection(settings.CHUNKS_COLLECTION)
+
+
+def get_raw_chunks_collection():
+    """
+    Get the code chunks collection decoding documents as RawBSONDocument.
+    
+    For read paths that forward chunks verbatim: fields are only decoded
+    when accessed, and no model validation runs.
+    """
+    return get_chunks_collection().with_options(
+        codec_options=CodecOptions(document_class=RawBSONDocument)
+    )
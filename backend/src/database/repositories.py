@@ -3,17 +3,36 @@ Database repository layer for DocuMind AI backend.
 Provides CRUD operations for Job and CodeChunk documents.
 """
 
+import asyncio
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from types import MappingProxyType
+from typing import List, Optional, Dict, Any, Mapping
+from bson.raw_bson import RawBSONDocument
+from pymongo import ReplaceOne
 from pymongo.errors import DuplicateKeyError, BulkWriteError
 
 from src.config import settings
-from src.database.mongodb import get_jobs_collection, get_chunks_collection
+from src.database.mongodb import (
+    get_jobs_collection, get_chunks_collection, get_raw_chunks_collection
+)
+from src.database.async_mongodb import get_async_chunks_collection
 from src.database.models import Job, CodeChunk, JobStatus, JobStats
 from src.utils.logger import get_database_logger
 
 logger = get_database_logger()
 
+# Job status -> timestamp field set when the job enters that status
+_STATUS_TO_TIMESTAMP: Mapping[JobStatus, str] = MappingProxyType({
+    JobStatus.PENDING: "created_at",
+    JobStatus.CLONING: "cloning_started_at",
+    JobStatus.SCANNING: "scanning_started_at",
+    JobStatus.PARSING: "parsing_started_at",
+    JobStatus.CHUNKING: "chunking_started_at",
+    JobStatus.STORING: "storing_started_at",
+    JobStatus.COMPLETED: "completed_at",
+    JobStatus.FAILED: "failed_at",
+})
+
 
 class JobRepository:
     """Repository for Job document operations."""
@@ -62,72 +81,121 @@ class JobRepository:
         return None
     
     @staticmethod
-    def update_job_status(
-        job_id: str, 
-        status: JobStatus, 
+    def _build_transition_update(
+        status: Optional[JobStatus] = None,
+        phase: Optional[str] = None,
+        local_path: Optional[str] = None,
+        stats: Optional[JobStats] = None,
+        error_message: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build a single $set document covering every field of a transition."""
+        now = datetime.utcnow()
+        fields: Dict[str, Any] = {}
+        
+        if status is not None:
+            fields["status"] = status.value
+            timestamp_field = JobRepository._get_timestamp_field(status)
+            if timestamp_field:
+                fields[f"timestamps.{timestamp_field}"] = now
+        
+        if phase:
+            fields[f"timestamps.{phase}_completed_at"] = now
+        
+        if local_path is not None:
+            fields["local_path"] = local_path
+        
+        if stats is not None:
+            fields["stats"] = stats.model_dump()
+        
+        if error_message:
+            fields["error_message"] = error_message
+        
+        return {"$set": fields}
+    
+    @staticmethod
+    def transition(
+        job_id: str,
+        status: Optional[JobStatus] = None,
+        phase: Optional[str] = None,
+        local_path: Optional[str] = None,
+        stats: Optional[JobStats] = None,
         error_message: Optional[str] = None
     ) -> bool:
         """
-        Update job status and corresponding timestamp.
+        Apply a job state-machine step in a single write.
+        
+        Combines the status change, completion timestamp of the previous
+        phase, local path, stats and error message into one update_one
+        instead of a round trip per field.
         
         Args:
             job_id: Unique job identifier
-            status: New job status
+            status: New job status (sets its start timestamp)
+            phase: Phase just completed (cloning, scanning, parsing, chunking, storing)
+            local_path: Local path where repo is cloned
+            stats: Updated job statistics
             error_message: Optional error message (for failed status)
             
         Returns:
             True if job was updated, False if not found
         """
-        collection = get_jobs_collection()
-        
-        # Build update document
-        update_doc: Dict[str, Any] = {
-            "$set": {
-                "status": status.value
-            }
-        }
-        
-        # Set appropriate timestamp based on status
-        timestamp_field = JobRepository._get_timestamp_field(status)
-        if timestamp_field:
-            update_doc["$set"][f"timestamps.{timestamp_field}"] = datetime.utcnow()
-        
-        # Add error message if provided
-        if error_message:
-            update_doc["$set"]["error_message"] = error_message
-        
-        result = collection.update_one(
-            {"job_id": job_id},
-            update_doc
+        update_doc = JobRepository._build_transition_update(
+            status=status,
+            phase=phase,
+            local_path=local_path,
+            stats=stats,
+            error_message=error_message
         )
+        if not update_doc["$set"]:
+            return False
+        
+        collection = get_jobs_collection()
+        result = collection.update_one({"job_id": job_id}, update_doc)
         
         if result.modified_count > 0:
-            logger.info(f"Updated job {job_id} status to {status.value}")
+            if status is not None:
+                logger.info(f"Updated job {job_id} status to {status.value}")
             return True
         
-        logger.warning(f"Job not found for status update: {job_id}")
+        logger.warning(f"Job not found for update: {job_id}")
         return False
     
+    @staticmethod
+    def update_job_status(
+        job_id: str, 
+        status: JobStatus, 
+        error_message: Optional[str] = None
+    ) -> bool:
+        """
+        Update job status and corresponding timestamp.
+        
+        Thin wrapper over transition(); prefer transition() when other
+        fields change in the same step.
+        
+        Args:
+            job_id: Unique job identifier
+            status: New job status
+            error_message: Optional error message (for failed status)
+            
+        Returns:
+            True if job was updated, False if not found
+        """
+        return JobRepository.transition(
+            job_id, status=status, error_message=error_message
+        )
+    
     @staticmethod
     def _get_timestamp_field(status: JobStatus) -> Optional[str]:
         """Map job status to corresponding timestamp field."""
-        status_to_timestamp = {
-            JobStatus.PENDING: "created_at",
-            JobStatus.CLONING: "cloning_started_at",
-            JobStatus.SCANNING: "scanning_started_at",
-            JobStatus.PARSING: "parsing_started_at",
-            JobStatus.CHUNKING: "chunking_started_at",
-            JobStatus.STORING: "storing_started_at",
-            JobStatus.COMPLETED: "completed_at",
-            JobStatus.FAILED: "failed_at",
-        }
-        return status_to_timestamp.get(status)
+        return _STATUS_TO_TIMESTAMP.get(status)
     
     @staticmethod
     def update_job_stats(job_id: str, stats: JobStats) -> bool:
         """
         Update job statistics.
         
+        Thin wrapper over transition().
+        
         Args:
             job_id: Unique job identifier
             stats: Updated job statistics
@@ -135,23 +203,15 @@ class JobRepository:
         Returns:
             True if job was updated, False if not found
         """
-        collection = get_jobs_collection()
-        
-        result = collection.update_one(
-            {"job_id": job_id},
-            {"$set": {"stats": stats.model_dump()}}
-        )
-        
-        if result.modified_count > 0:
-            logger.info(f"Updated stats for job {job_id}")
-            return True
-        return False
+        return JobRepository.transition(job_id, stats=stats)
     
     @staticmethod
     def update_job_local_path(job_id: str, local_path: str) -> bool:
         """
         Update job's local repository path.
         
+        Thin wrapper over transition(); also marks cloning complete.
+        
         Args:
             job_id: Unique job identifier
             local_path: Local path where repo is cloned
@@ -159,25 +219,17 @@ class JobRepository:
         Returns:
             True if job was updated, False if not found
         """
-        collection = get_jobs_collection()
-        
-        result = collection.update_one(
-            {"job_id": job_id},
-            {
-                "$set": {
-                    "local_path": local_path,
-                    "timestamps.cloning_completed_at": datetime.utcnow()
-                }
-            }
+        return JobRepository.transition(
+            job_id, phase="cloning", local_path=local_path
         )
-        
-        return result.modified_count > 0
     
     @staticmethod
     def set_phase_complete(job_id: str, phase: str) -> bool:
         """
         Mark a phase as complete with timestamp.
         
+        Thin wrapper over transition().
+        
         Args:
             job_id: Unique job identifier
             phase: Phase name (cloning, scanning, parsing, chunking, storing)
@@ -185,14 +237,7 @@ class JobRepository:
         Returns:
             True if updated successfully
         """
-        collection = get_jobs_collection()
-        
-        result = collection.update_one(
-            {"job_id": job_id},
-            {"$set": {f"timestamps.{phase}_completed_at": datetime.utcnow()}}
-        )
-        
-        return result.modified_count > 0
+        return JobRepository.transition(job_id, phase=phase)
     
     @staticmethod
     def list_jobs(
@@ -274,6 +319,37 @@ class ChunkRepository:
             logger.warning(f"Bulk insert partial success: {inserted_count} chunks inserted")
             return inserted_count
     
+    @staticmethod
+    def verify_chunks_stored(job_id: str, chunks: List[CodeChunk]) -> int:
+        """
+        Verify that a job's chunk inserts all landed, filling any gaps.
+        
+        Called after a bulk insert reported fewer inserts than chunks sent
+        (e.g. a partially failed batch). Compares the stored count against
+        the expected count and, if any are missing, re-sends the chunks.
+        Chunks that already exist are rejected by the unique _id (chunk_id)
+        index, so the retry only fills the gaps.
+        
+        Args:
+            job_id: Unique job identifier
+            chunks: Chunks that were sent for the job
+            
+        Returns:
+            Number of chunks stored for the job; callers should treat a
+            result below len(chunks) as a failed store
+        """
+        expected = len(chunks)
+        stored = ChunkRepository.count_chunks_by_job(job_id)
+        if stored >= expected:
+            return stored
+        
+        logger.warning(
+            f"Chunk count mismatch for job {job_id}: "
+            f"{stored}/{expected} stored, re-sending missing chunks"
+        )
+        ChunkRepository.insert_chunks_bulk(chunks)
+        return ChunkRepository.count_chunks_by_job(job_id)
+    
     @staticmethod
     def get_chunks_by_job(job_id: str, limit: int = 1000) -> List[CodeChunk]:
         """
@@ -297,6 +373,46 @@ class ChunkRepository:
         
         return [CodeChunk.from_mongo_dict(doc) for doc in cursor]
     
+    @staticmethod
+    def get_raw_chunks(
+        job_id: str,
+        file_path: Optional[str] = None,
+        limit: int = 1000,
+        fields: Optional[List[str]] = None
+    ) -> List[RawBSONDocument]:
+        """
+        Retrieve chunks as raw BSON documents for passthrough reads.
+        
+        Skips dict decoding and Pydantic validation; use when chunks are
+        re-emitted without further processing.
+        
+        Args:
+            job_id: Unique job identifier
+            file_path: Optional relative file path filter
+            limit: Maximum number of chunks to return (ignored with file_path)
+            fields: Optional list of fields to project
+            
+        Returns:
+            List of RawBSONDocument instances sorted by file and line
+        """
+        collection = get_raw_chunks_collection()
+        
+        query: Dict[str, Any] = {"job_id": job_id}
+        projection = None
+        if fields:
+            projection = {"_id": 0, **{field: 1 for field in fields}}
+        
+        if file_path:
+            query["file_path"] = file_path
+            cursor = collection.find(query, projection).sort("start_line", 1)
+        else:
+            cursor = collection.find(query, projection).sort([
+                ("file_path", 1),
+                ("start_line", 1)
+            ]).limit(limit)
+        
+        return list(cursor)
+    
     @staticmethod
     def get_chunk(chunk_id: str) -> Optional[CodeChunk]:
         """
@@ -309,7 +425,7 @@ class ChunkRepository:
             CodeChunk instance or None if not found
         """
         collection = get_chunks_collection()
-        chunk_dict = collection.find_one({"chunk_id": chunk_id})
+        chunk_dict = collection.find_one({"_id": chunk_id})
         
         if chunk_dict:
             return CodeChunk.from_mongo_dict(chunk_dict)
@@ -366,3 +482,106 @@ class ChunkRepository:
         
         logger.info(f"Deleted {result.deleted_count} chunks for job {job_id}")
         return result.deleted_count
+    
+    @staticmethod
+    def migrate_legacy_ids(batch_size: int = 1000) -> int:
+        """
+        Re-key chunks stored before chunk_id became their _id.
+        
+        Older chunks have an ObjectId _id and are covered by a unique
+        chunk_id index instead. That index is dropped first, because the
+        re-keyed copy shares its chunk_id with the original until the
+        original is deleted. Each legacy chunk is then upserted under
+        _id=chunk_id and the ObjectId document removed. Re-running the
+        migration is safe.
+        
+        Args:
+            batch_size: Chunks re-keyed per round trip
+            
+        Returns:
+            Number of chunks migrated
+        """
+        collection = get_chunks_collection()
+        if "chunk_id_1" in collection.index_information():
+            collection.drop_index("chunk_id_1")
+            logger.info("Dropped legacy unique chunk_id index")
+        
+        legacy = {"$expr": {"$ne": ["$_id", "$chunk_id"]}}
+        migrated = 0
+        while True:
+            docs = list(collection.find(legacy).limit(batch_size))
+            if not docs:
+                break
+            old_ids = [doc.pop("_id") for doc in docs]
+            collection.bulk_write(
+                [
+                    ReplaceOne(
+                        {"_id": doc["chunk_id"]},
+                        {"_id": doc["chunk_id"], **doc},
+                        upsert=True
+                    )
+                    for doc in docs
+                ],
+                ordered=False
+            )
+            collection.delete_many({"_id": {"$in": old_ids}})
+            migrated += len(docs)
+        
+        logger.info(f"Re-keyed {migrated} legacy chunks by chunk_id")
+        return migrated
+
+
+class AsyncChunkRepository:
+    """Async (Motor) repository for pipelined CodeChunk writes."""
+    
+    # Diminishing returns set in quickly beyond a handful of in-flight batches
+    MAX_CONCURRENT_BATCHES = 4
+    BATCH_SIZE = 500
+    
+    @staticmethod
+    async def insert_chunks_bulk(
+        chunks: List[CodeChunk],
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ) -> int:
+        """
+        Insert chunks as concurrent insert_many batches.
+        
+        Args:
+            chunks: List of CodeChunk instances
+            batch_size: Chunks per insert_many call
+            max_concurrency: Maximum batches in flight at once
+            
+        Returns:
+            Number of chunks inserted
+        """
+        if not chunks:
+            return 0
+        
+        batch_size = batch_size or AsyncChunkRepository.BATCH_SIZE
+        max_concurrency = max_concurrency or AsyncChunkRepository.MAX_CONCURRENT_BATCHES
+        
+        collection = get_async_chunks_collection()
+        
+        chunk_dicts = [chunk.to_mongo_dict() for chunk in chunks]
+        batches = [
+            chunk_dicts[i:i + batch_size]
+            for i in range(0, len(chunk_dicts), batch_size)
+        ]
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def insert_batch(batch: List[Dict[str, Any]]) -> int:
+            async with semaphore:
+                try:
+                    result = await collection.insert_many(batch, ordered=False)
+                    return len(result.inserted_ids)
+                except BulkWriteError as e:
+                    return e.details.get('nInserted', 0)
+        
+        counts = await asyncio.gather(*(insert_batch(b) for b in batches))
+        inserted_count = sum(counts)
+        
+        logger.info(
+            f"Async bulk inserted {inserted_count} chunks in {len(batches)} batches"
+        )
+        return inserted_count
@@ -0,0 +1,87 @@
+"""
+Scoring kernel for the in-memory fallback similarity search.
+
+Uses a Numba-compiled, multi-threaded dot-product loop when numba is
+installed and falls back to a NumPy matrix-vector product otherwise.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_rows(mat, q):
+        n, d = mat.shape
+        scores = np.empty(n, np.float32)
+        for i in prange(n):
+            s = np.float32(0.0)
+            for j in range(d):
+                s += mat[i, j] * q[j]
+            scores[i] = s
+        return scores
+else:
+    def _dot_rows(mat, q):
+        return mat @ q
+
+
+def score_all(mat: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Dot every row of mat with q.
+
+    Args:
+        mat: C-contiguous (N, D) float32 matrix (rows pre-normalized)
+        q: (D,) float32 query (pre-normalized)
+
+    Returns:
+        (N,) float32 scores
+    """
+    return _dot_rows(mat, np.ascontiguousarray(q, dtype=np.float32))
+
+
+def top_k(scores: np.ndarray, k: int, threshold: float) -> np.ndarray:
+    """
+    Indices of the k best scores at or above threshold, best first.
+
+    Args:
+        scores: (N,) scores
+        k: Number of results
+        threshold: Minimum score
+
+    Returns:
+        Index array (may be shorter than k)
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    idx = idx[np.argsort(-scores[idx])]
+    return idx[scores[idx] >= threshold]
+
+
+def score_topk(mat: np.ndarray, q: np.ndarray, k: int, threshold: float):
+    """
+    Score all rows and select the top k.
+
+    Args:
+        mat: C-contiguous (N, D) float32 matrix (rows pre-normalized)
+        q: (D,) float32 query (pre-normalized)
+        k: Number of results
+        threshold: Minimum score
+
+    Returns:
+        Tuple of (indices best first, their scores)
+    """
+    scores = score_all(mat, q)
+    idx = top_k(scores, k, threshold)
+    return idx, scores[idx]
+
+
+# Compile up front so the first search does not pay JIT latency
+if NUMBA_AVAILABLE:
+    score_all(np.zeros((1, 1), dtype=np.float32), np.zeros(1, dtype=np.float32))
@@ -0,0 +1,96 @@
+"""
+Batch kernel for deterministic mock embeddings.
+
+Each row is a unit vector of Gaussian values drawn from a counter-based
+SplitMix64 stream keyed by the row's seed (Box-Muller transform). The
+stream is a pure function of (seed, index), so rows are independent. The
+Numba kernel and the NumPy fallback draw the same values, but normalize
+in different precisions (float32 output buffer vs float64), so their
+results are equal only up to float32 rounding.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_TWO_PI = 2.0 * np.pi
+_INV_2_53 = 1.0 / 9007199254740992.0
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, inline="always")
+    def _splitmix64(seed, counter):
+        z = seed + counter * _GOLDEN
+        z = (z ^ (z >> np.uint64(30))) * _MIX1
+        z = (z ^ (z >> np.uint64(27))) * _MIX2
+        return z ^ (z >> np.uint64(31))
+
+    @njit(parallel=True, cache=True)
+    def _fill(seeds, out):
+        n, d = out.shape
+        for i in prange(n):
+            seed = seeds[i]
+            total = 0.0
+            for p in range((d + 1) // 2):
+                c = np.uint64(2 * p + 1)
+                u1 = 1.0 - (_splitmix64(seed, c) >> np.uint64(11)) * _INV_2_53
+                u2 = (_splitmix64(seed, c + np.uint64(1)) >> np.uint64(11)) * _INV_2_53
+                r = np.sqrt(-2.0 * np.log(u1))
+                a = r * np.cos(_TWO_PI * u2)
+                out[i, 2 * p] = a
+                total += a * a
+                if 2 * p + 1 < d:
+                    b = r * np.sin(_TWO_PI * u2)
+                    out[i, 2 * p + 1] = b
+                    total += b * b
+            norm = np.sqrt(total)
+            if norm > 1e-12:
+                for j in range(d):
+                    out[i, j] = out[i, j] / norm
+else:
+    def _splitmix64(seed, counter):
+        z = seed + counter * _GOLDEN
+        z = (z ^ (z >> np.uint64(30))) * _MIX1
+        z = (z ^ (z >> np.uint64(27))) * _MIX2
+        return z ^ (z >> np.uint64(31))
+
+    def _fill(seeds, out):
+        d = out.shape[1]
+        pairs = (d + 1) // 2
+        counters = 2 * np.arange(pairs, dtype=np.uint64) + np.uint64(1)
+        seeds = seeds[:, None]
+        u1 = 1.0 - (_splitmix64(seeds, counters) >> np.uint64(11)) * _INV_2_53
+        u2 = (_splitmix64(seeds, counters + np.uint64(1)) >> np.uint64(11)) * _INV_2_53
+        r = np.sqrt(-2.0 * np.log(u1))
+        values = np.empty((len(seeds), 2 * pairs))
+        values[:, 0::2] = r * np.cos(_TWO_PI * u2)
+        values[:, 1::2] = r * np.sin(_TWO_PI * u2)
+        values = values[:, :d]
+        values /= np.linalg.norm(values, axis=1, keepdims=True).clip(min=1e-12)
+        out[:] = values
+
+
+def mock_embed_batch(seeds: np.ndarray, dimensions: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Generate unit-norm pseudo-random embeddings, one row per seed.
+
+    Args:
+        seeds: (N,) uint64 seeds
+        dimensions: Embedding dimensions D
+        out: Optional (N, D) float32 buffer to fill
+
+    Returns:
+        (N, D) float32 array
+    """
+    seeds = np.ascontiguousarray(seeds, dtype=np.uint64)
+    if out is None:
+        out = np.empty((len(seeds), dimensions), dtype=np.float32)
+    _fill(seeds, out)
+    return out
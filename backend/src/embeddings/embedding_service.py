@@ -4,17 +4,38 @@ Generates vector embeddings from text using Hugging Face or mock embeddings.
 """
 
 import asyncio
+import atexit
 import hashlib
-import math
-from typing import List, Optional, Union
+import os
+import random
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 from abc import ABC, abstractmethod
 
 from src.config import settings
 from src.utils.logger import get_logger
 # Defer heavy HF provider import to runtime to avoid importing sentence-transformers at startup
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = get_logger("documind.embeddings")
 
+# Whitespace runs to collapse, and a quick test for whether any exist
+# (two consecutive whitespace chars, or any whitespace other than a space)
+_WS_RE = re.compile(r"\s+")
+_WS_RUN_RE = re.compile(r"\s\s|[^\S ]")
+
+# Local model inference runs here rather than on the loop's default
+# executor, so it does not queue behind unrelated blocking calls
+_EMBED_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(2, (os.cpu_count() or 2) // 2),
+    thread_name_prefix="embed"
+)
+atexit.register(_EMBED_EXECUTOR.shutdown, wait=False)
+
 
 class EmbeddingError(Exception):
     """Custom exception for embedding generation errors."""
@@ -25,8 +46,8 @@ class BaseEmbeddingProvider(ABC):
     """Abstract base class for embedding providers."""
     
     @abstractmethod
-    async def generate(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts."""
+    async def generate(self, texts: List[str]) -> "np.ndarray":
+        """Generate embeddings for a list of texts as an (N, D) float32 array."""
         pass
     
     @property
@@ -34,6 +55,16 @@ class BaseEmbeddingProvider(ABC):
     def dimensions(self) -> int:
         """Return the embedding dimensions."""
         pass
+    
+    @property
+    def model_name(self) -> str:
+        """Return the model identifier (empty if not applicable)."""
+        return ""
+    
+    @property
+    def already_normalized(self) -> bool:
+        """Whether generate() returns L2-normalized vectors."""
+        return False
 
 
 class MockEmbeddingProvider(BaseEmbeddingProvider):
@@ -50,7 +81,11 @@ class MockEmbeddingProvider(BaseEmbeddingProvider):
     def dimensions(self) -> int:
         return self._dimensions
     
-    async def generate(self, texts: List[str]) -> List[List[float]]:
+    @property
+    def already_normalized(self) -> bool:
+        return True
+    
+    async def generate(self, texts: List[str]) -> "np.ndarray":
         """
         Generate deterministic mock embeddings based on text hash.
         
@@ -58,29 +93,26 @@ class MockEmbeddingProvider(BaseEmbeddingProvider):
             texts: List of text strings to embed
             
         Returns:
-            List of embedding vectors
+            (N, D) float32 array of embedding vectors
         """
         logger.debug(f"Generating mock embeddings for {len(texts)} texts")
         
         # Import numpy lazily to avoid requiring it at module import time
         import numpy as np
 
-        embeddings = []
-        for text in texts:
-            # Create deterministic seed from text hash
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            seed = int(text_hash[:8], 16)
-            
-            # Generate pseudo-random embedding
-            np.random.seed(seed)
-            embedding = np.random.randn(self._dimensions).astype(np.float32)
-            
-            # Normalize to unit vector (L2 normalization)
-            norm = np.linalg.norm(embedding)
-            if norm > 0:
-                embedding = embedding / norm
-            
-            embeddings.append(embedding.tolist())
+        from src.embeddings._mock_kernel import mock_embed_batch
+        
+        # Deterministic 64-bit seed per text; rows are drawn and normalized
+        # in one batch kernel
+        seeds = np.frombuffer(
+            b"".join(
+                hashlib.blake2b(text.encode(), digest_size=8).digest()
+                for text in texts
+            ),
+            dtype=np.uint64
+        )
+        
+        embeddings = mock_embed_batch(seeds, self._dimensions)
         
         return embeddings
 
@@ -94,12 +126,14 @@ class HFEmbeddingProviderWrapper(BaseEmbeddingProvider):
     def __init__(self, api_key: str, model: str = "sentence-transformers/all-MiniLM-L6-v2"):
         try:
             from src.embeddings.hf_provider import HFEmbeddingProvider
+            # Cheap: the model is loaded lazily on first use
+            self._hf_provider = HFEmbeddingProvider(api_key=api_key, model=model)
         except ImportError as e:
             raise EmbeddingError(
                 "Hugging Face provider not available. Install sentence-transformers to use HF provider"
             ) from e
 
-        self._hf_provider = HFEmbeddingProvider(api_key=api_key, model=model)
+        self._model_name = model
         self._dimensions = 384  # HF model output dimensions
         logger.info(f"Initialized HFEmbeddingProviderWrapper with model {model}")
     
@@ -107,7 +141,16 @@ class HFEmbeddingProviderWrapper(BaseEmbeddingProvider):
     def dimensions(self) -> int:
         return self._dimensions
     
-    async def generate(self, texts: List[str]) -> List[List[float]]:
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+    
+    @property
+    def already_normalized(self) -> bool:
+        # The local sentence-transformers model encodes with normalize_embeddings=True
+        return True
+    
+    async def generate(self, texts: List[str]) -> "np.ndarray":
         """
         Generate embeddings using Hugging Face API.
         
@@ -115,18 +158,20 @@ class HFEmbeddingProviderWrapper(BaseEmbeddingProvider):
             texts: List of text strings to embed
             
         Returns:
-            List of embedding vectors
+            (N, D) float32 array of embedding vectors
         """
+        import numpy as np
+        
         if not texts:
-            return []
+            return np.empty((0, self._dimensions), dtype=np.float32)
         
         logger.debug(f"Generating HF embeddings for {len(texts)} texts")
         
         try:
-            # Run synchronous HF provider in executor to avoid blocking
-            loop = asyncio.get_event_loop()
+            # Run synchronous HF provider in the embedding executor
+            loop = asyncio.get_running_loop()
             embeddings = await loop.run_in_executor(
-                None, self._hf_provider.embed, texts
+                _EMBED_EXECUTOR, self._hf_provider.embed, texts
             )
             return embeddings
         except RuntimeError as e:
@@ -164,7 +209,11 @@ class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
     def dimensions(self) -> int:
         return self._dimensions
     
-    async def generate(self, texts: List[str]) -> List[List[float]]:
+    @property
+    def model_name(self) -> str:
+        return self._model
+    
+    async def generate(self, texts: List[str]) -> "np.ndarray":
         """
         Generate embeddings using OpenAI API.
         
@@ -172,10 +221,12 @@ class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
             texts: List of text strings to embed
             
         Returns:
-            List of embedding vectors
+            (N, D) float32 array of embedding vectors
         """
+        import numpy as np
+        
         if not texts:
-            return []
+            return np.empty((0, self._dimensions), dtype=np.float32)
         
         logger.debug(f"Generating OpenAI embeddings for {len(texts)} texts")
         
@@ -187,7 +238,7 @@ class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
             )
             
             # Extract embeddings in correct order
-            embeddings = [None] * len(texts)
+            embeddings = np.empty((len(texts), self._dimensions), dtype=np.float32)
             for item in response.data:
                 embeddings[item.index] = item.embedding
             
@@ -207,7 +258,9 @@ class EmbeddingService:
     def __init__(
         self,
         provider: Optional[BaseEmbeddingProvider] = None,
-        batch_size: int = None
+        batch_size: int = None,
+        cache_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None
     ):
         """
         Initialize the embedding service.
@@ -215,8 +268,16 @@ class EmbeddingService:
         Args:
             provider: Embedding provider (defaults based on settings)
             batch_size: Maximum texts per batch (default from settings)
+            cache_size: Maximum cached embeddings, 0 disables (default from settings)
+            max_concurrency: Maximum batches in flight (default from settings)
         """
         self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.max_concurrency = max(1, max_concurrency or settings.EMBEDDING_MAX_CONCURRENCY)
+        self.max_retries = max(0, settings.EMBEDDING_MAX_RETRIES)
+        self.cache_size = (
+            cache_size if cache_size is not None else settings.EMBEDDING_CACHE_SIZE
+        )
+        self._cache: "OrderedDict[bytes, Any]" = OrderedDict()
         
         # Initialize provider based on settings
         if provider:
@@ -233,6 +294,10 @@ class EmbeddingService:
                 model=settings.HF_EMBEDDING_MODEL
             )
     
+        self._cache_namespace = (
+            f"{type(self._provider).__name__}|{self._provider.model_name}|"
+        )
+    
     @property
     def dimensions(self) -> int:
         """Get embedding dimensions."""
@@ -256,45 +321,158 @@ class EmbeddingService:
         Raises:
             EmbeddingError: If embedding generation fails
         """
+        matrix = await self.generate_embeddings_ndarray(texts, normalize=normalize)
+        return matrix.tolist()
+    
+    async def generate_embeddings_ndarray(
+        self, 
+        texts: Union[str, List[str]],
+        normalize: bool = True
+    ) -> "np.ndarray":
+        """
+        Generate embeddings for one or more texts as a float32 matrix.
+        
+        Preferred by internal callers (e.g. the vector store) that would
+        otherwise convert the list form straight back to an array.
+        
+        Args:
+            texts: Single text or list of texts to embed
+            normalize: Whether to L2 normalize embeddings (default True)
+            
+        Returns:
+            (N, D) float32 array of embedding vectors
+            
+        Raises:
+            EmbeddingError: If embedding generation fails
+        """
+        import numpy as np
+        
         # Handle single text input
         if isinstance(texts, str):
             texts = [texts]
         
         if not texts:
-            return []
+            return np.empty((0, self.dimensions), dtype=np.float32)
         
         logger.info(f"Generating embeddings for {len(texts)} texts")
         
         # Clean and validate texts
         cleaned_texts = [self._clean_text(t) for t in texts]
         
-        # Process in batches for large inputs
-        all_embeddings = []
+        # Serve repeated texts from the cache; identical misses within the
+        # batch are only sent to the provider once
+        hits: Dict[int, Any] = {}
+        misses: Dict[bytes, List[int]] = {}
+        for i, text in enumerate(cleaned_texts):
+            key = self._cache_key(text)
+            cached = self._cache_get(key)
+            if cached is not None:
+                hits[i] = cached
+            else:
+                misses.setdefault(key, []).append(i)
+        
+        miss_embeddings = None
+        if misses:
+            miss_texts = [cleaned_texts[indices[0]] for indices in misses.values()]
+            miss_embeddings = await self._generate_batches(miss_texts)
+        
+        # Rows are written straight into the output matrix
+        dims = (
+            miss_embeddings.shape[1] if miss_embeddings is not None
+            else len(next(iter(hits.values())))
+        )
+        matrix = np.empty((len(cleaned_texts), dims), dtype=np.float32)
+        for i, cached in hits.items():
+            matrix[i] = cached
+        if misses:
+            for (key, indices), embedding in zip(misses.items(), miss_embeddings):
+                matrix[indices] = embedding
+                self._cache_put(key, embedding.copy())
+        
+        logger.debug(
+            f"Embedding cache: {len(cleaned_texts) - sum(map(len, misses.values()))} hits, "
+            f"{len(misses)} unique misses"
+        )
+        
+        # Normalize once on the whole matrix, and only if the provider
+        # has not already done so
+        if normalize and not self._provider.already_normalized:
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+        
+        logger.info(f"Successfully generated {len(matrix)} embeddings")
+        return matrix
+    
+    async def _generate_batches(self, texts: List[str]) -> "np.ndarray":
+        """
+        Send texts to the provider in concurrent batches.
         
-        for i in range(0, len(cleaned_texts), self.batch_size):
-            batch = cleaned_texts[i:i + self.batch_size]
-            batch_num = i // self.batch_size + 1
-            total_batches = math.ceil(len(cleaned_texts) / self.batch_size)
+        At most max_concurrency batches are in flight; each batch is
+        retried with jittered exponential backoff before failing.
+        
+        Args:
+            texts: Cleaned texts to embed
             
-            logger.debug(f"Processing batch {batch_num}/{total_batches}")
+        Returns:
+            (N, D) float32 array of provider embeddings in input order
             
-            try:
-                batch_embeddings = await self._provider.generate(batch)
-                
-                # Normalize if requested
-                if normalize:
-                    batch_embeddings = [
-                        self._normalize_l2(emb) for emb in batch_embeddings
-                    ]
-                
-                all_embeddings.extend(batch_embeddings)
-                
-            except Exception as e:
-                logger.error(f"Batch {batch_num} failed: {e}")
-                raise EmbeddingError(f"Embedding generation failed at batch {batch_num}: {e}")
-        
-        logger.info(f"Successfully generated {len(all_embeddings)} embeddings")
-        return all_embeddings
+        Raises:
+            EmbeddingError: If a batch fails after all retries
+        """
+        batches = [
+            texts[i:i + self.batch_size]
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        total_batches = len(batches)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run_batch(batch_num: int, batch: List[str]):
+            async with semaphore:
+                logger.debug(f"Processing batch {batch_num}/{total_batches}")
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        return await self._provider.generate(batch)
+                    except Exception as e:
+                        if attempt == self.max_retries:
+                            logger.error(f"Batch {batch_num} failed: {e}")
+                            raise EmbeddingError(
+                                f"Embedding generation failed at batch {batch_num}: {e}"
+                            )
+                        wait_time = random.uniform(0, 2 ** attempt)
+                        logger.warning(
+                            f"Batch {batch_num} failed (attempt {attempt + 1}), "
+                            f"retrying in {wait_time:.1f}s: {e}"
+                        )
+                        await asyncio.sleep(wait_time)
+        
+        batch_results = await asyncio.gather(
+            *(run_batch(i + 1, batch) for i, batch in enumerate(batches))
+        )
+        
+        import numpy as np
+        return np.vstack(batch_results).astype(np.float32, copy=False)
+    
+    def _cache_key(self, text: str) -> bytes:
+        """Content-address a cleaned text for the current provider and model."""
+        return hashlib.blake2b(
+            (self._cache_namespace + text).encode(), digest_size=16
+        ).digest()
+    
+    def _cache_get(self, key: bytes):
+        """Look up a cached embedding, marking it as recently used."""
+        embedding = self._cache.get(key)
+        if embedding is not None:
+            self._cache.move_to_end(key)
+        return embedding
+    
+    def _cache_put(self, key: bytes, embedding) -> None:
+        """Store a float32 embedding and evict the least recently used."""
+        if self.cache_size <= 0:
+            return
+        
+        self._cache[key] = embedding
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
     
     async def generate_single_embedding(
         self, 
@@ -327,8 +505,11 @@ class EmbeddingService:
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        text = " ".join(text.split())
+        # Remove excessive whitespace (most chunks need only a strip)
+        if _WS_RUN_RE.search(text) is None:
+            text = text.strip()
+        else:
+            text = _WS_RE.sub(" ", text).strip()
         
         # Truncate very long texts (OpenAI has ~8k token limit)
         max_chars = 30000  # Roughly 8k tokens
@@ -339,49 +520,73 @@ class EmbeddingService:
         return text
     
     @staticmethod
-    def _normalize_l2(embedding: List[float]) -> List[float]:
+    def cosine_similarity(vec1, vec2) -> float:
         """
-        L2 normalize an embedding vector.
+        Calculate cosine similarity between two vectors.
         
         Args:
-            embedding: Raw embedding vector
+            vec1: First vector (list or NumPy array)
+            vec2: Second vector (list or NumPy array)
             
         Returns:
-            Normalized embedding vector
+            Cosine similarity score (0 to 1 for normalized vectors)
         """
         import numpy as np
-        arr = np.array(embedding, dtype=np.float32)
-        norm = np.linalg.norm(arr)
+        arr1 = np.asarray(vec1, dtype=np.float32)
+        arr2 = np.asarray(vec2, dtype=np.float32)
         
-        if norm > 0:
-            arr = arr / norm
+        dot_product = float(np.dot(arr1, arr2))
+        norm1 = float(np.dot(arr1, arr1))
+        norm2 = float(np.dot(arr2, arr2))
         
-        return arr.tolist()
+        if norm1 == 0 or norm2 == 0:
+            return 0.0
+        
+        # Unit vectors (the common case) need no division
+        if abs(norm1 - 1.0) < 1e-6 and abs(norm2 - 1.0) < 1e-6:
+            return dot_product
+        
+        return dot_product / float(np.sqrt(norm1 * norm2))
     
     @staticmethod
-    def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
+    def cosine_similarity_batch(
+        query,
+        matrix,
+        query_normalized: bool = False,
+        matrix_normalized: bool = False
+    ) -> "np.ndarray":
         """
-        Calculate cosine similarity between two vectors.
+        Calculate cosine similarity between a query and every row of a matrix.
+        
+        Computed as a single matrix-vector product (BLAS SGEMV).
         
         Args:
-            vec1: First vector
-            vec2: Second vector
+            query: (D,) query vector
+            matrix: (N, D) matrix of vectors
+            query_normalized: Whether query is already L2-normalized
+            matrix_normalized: Whether matrix rows are already L2-normalized
             
         Returns:
-            Cosine similarity score (0 to 1 for normalized vectors)
+            (N,) float32 array of similarity scores
         """
         import numpy as np
-        arr1 = np.array(vec1, dtype=np.float32)
-        arr2 = np.array(vec2, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        matrix = np.asarray(matrix, dtype=np.float32)
         
-        dot_product = np.dot(arr1, arr2)
-        norm1 = np.linalg.norm(arr1)
-        norm2 = np.linalg.norm(arr2)
+        scores = matrix @ query
         
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+        if not query_normalized:
+            query_norm = np.linalg.norm(query)
+            if query_norm == 0:
+                return np.zeros(len(matrix), dtype=np.float32)
+            scores /= query_norm
+        
+        if not matrix_normalized:
+            row_norms = np.linalg.norm(matrix, axis=-1)
+            row_norms[row_norms == 0] = np.inf
+            scores /= row_norms
         
-        return float(dot_product / (norm1 * norm2))
+        return scores
 
 
 # Module-level convenience functions
@@ -3,14 +3,94 @@ Hugging Face embedding provider for DocuMind AI.
 Generates vector embeddings locally using sentence-transformers.
 """
 
-from typing import List
+import importlib.util
+import os
+import threading
+from typing import Any, Dict, List
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
 from src.utils.logger import get_logger
 
 logger = get_logger("documind.embeddings.hf")
 
+# Loaded models shared by all provider instances, keyed by model name
+_MODEL_CACHE: Dict[str, Any] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def _load_model(model: str):
+    """
+    Load a sentence-transformers model once per process.
+    
+    torch and sentence-transformers are imported here rather than at module
+    import, so constructing a provider stays cheap until it is first used.
+    
+    Args:
+        model: Model identifier for sentence-transformers
+        
+    Returns:
+        SentenceTransformer instance
+    """
+    loaded = _MODEL_CACHE.get(model)
+    if loaded is not None:
+        return loaded
+    
+    with _MODEL_LOCK:
+        loaded = _MODEL_CACHE.get(model)
+        if loaded is not None:
+            return loaded
+        
+        import torch
+        from sentence_transformers import SentenceTransformer
+        
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        logger.info(f"Loading local sentence-transformers model: {model} on {device}")
+        
+        # Load model locally; use half precision on GPU
+        loaded = SentenceTransformer(
+            model, device=device, cache_folder=os.getenv("HF_HOME")
+        )
+        if device == "cuda":
+            loaded.half()
+        else:
+            loaded = _quantize_for_cpu(loaded)
+        
+        _MODEL_CACHE[model] = loaded
+        return loaded
+
+
+def _quantize_for_cpu(loaded):
+    """
+    Apply the configured CPU quantization to a loaded model.
+    
+    With EMBEDDER_QUANTIZATION=int8 the model's linear layers are replaced
+    by dynamically quantized int8 versions: weights are stored as int8 and
+    activations are quantized per batch, cutting the memory traffic of each
+    forward pass roughly 4x. Output embeddings stay float32.
+    
+    Args:
+        loaded: SentenceTransformer instance on the CPU
+        
+    Returns:
+        The quantized model, or the original one if quantization is off
+    """
+    from src.config import settings
+    
+    mode = settings.EMBEDDER_QUANTIZATION
+    if mode in ("", "none"):
+        return loaded
+    if mode != "int8":
+        logger.warning(f"Unknown EMBEDDER_QUANTIZATION={mode!r}; keeping FP32 weights")
+        return loaded
+    
+    import torch
+    
+    logger.info("Applying dynamic int8 quantization to embedding model")
+    return torch.quantization.quantize_dynamic(
+        loaded, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
 
 class HFEmbeddingProvider:
     """
@@ -18,6 +98,9 @@ class HFEmbeddingProvider:
     Generates 384-dimension embeddings offline without API calls.
     """
     
+    # Texts per forward pass
+    BATCH_SIZE = 64
+    
     def __init__(self, api_key: str = None, model: str = "sentence-transformers/all-MiniLM-L6-v2"):
         """
         Initialize the local sentence-transformers embedding provider.
@@ -26,11 +109,11 @@ class HFEmbeddingProvider:
             api_key: Ignored (kept for backward compatibility)
             model: Model identifier for sentence-transformers
         """
-        self._model_name = model
-        logger.info(f"Loading local sentence-transformers model: {model}")
+        if importlib.util.find_spec("sentence_transformers") is None:
+            raise ImportError("sentence-transformers is not installed")
         
-        # Load model locally
-        self._model = SentenceTransformer(model)
+        # The model itself is loaded on first embed()
+        self._model_name = model
         self._dimensions = 384
         
         logger.info(f"Initialized HFEmbeddingProvider with local model {model}")
@@ -40,7 +123,12 @@ class HFEmbeddingProvider:
         """Return embedding dimensions."""
         return self._dimensions
     
-    def embed(self, texts: List[str]) -> List[List[float]]:
+    @property
+    def model(self):
+        """Get the shared SentenceTransformer, loading it on first use."""
+        return _load_model(self._model_name)
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for a list of texts using local model.
         
@@ -48,11 +136,11 @@ class HFEmbeddingProvider:
             texts: List of text strings to embed
             
         Returns:
-            List of 384-dimension normalized embedding vectors
+            (N, 384) float32 array of normalized embedding vectors
         """
         if not texts:
             logger.debug("Empty text list provided, returning empty embeddings")
-            return []
+            return np.empty((0, self._dimensions), dtype=np.float32)
         
         # Ensure texts is a list
         if not isinstance(texts, list):
@@ -60,15 +148,18 @@ class HFEmbeddingProvider:
         
         logger.info(f"Generating local embeddings for {len(texts)} texts")
         
-        # Generate embeddings locally with L2 normalization
-        embeddings = self._model.encode(
+        # Generate embeddings locally with L2 normalization. encode() already
+        # groups inputs by length internally to minimise padding.
+        embeddings = self.model.encode(
             texts,
+            batch_size=self.BATCH_SIZE,
             normalize_embeddings=True,
-            convert_to_numpy=True
+            convert_to_numpy=True,
+            show_progress_bar=False
         )
         
-        # Convert numpy arrays to list of lists
-        result = embeddings.tolist()
+        # FP16 models on GPU return half-precision arrays
+        result = embeddings.astype(np.float32, copy=False)
         
         logger.info(f"Successfully generated {len(result)} embeddings")
         return result
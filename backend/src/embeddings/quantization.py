@@ -0,0 +1,206 @@
+"""
+Product quantization for DocuMind AI embeddings.
+Compresses embeddings into compact uint8 codes for approximate search.
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+from bson.binary import Binary
+
+from src.utils.logger import get_logger
+
+logger = get_logger("documind.quantization")
+
+
+class PQCodec:
+    """
+    8-bit product quantizer.
+
+    Splits each D-dimensional vector into M subvectors and replaces each
+    subvector with the index of its nearest centroid in a per-subspace
+    codebook of K=256 entries, so a vector is stored in M bytes. Inner
+    products with a query are approximated from a (M, K) lookup table.
+    """
+
+    NUM_CENTROIDS = 256
+
+    def __init__(self, codebooks: np.ndarray):
+        """
+        Initialize the codec from trained codebooks.
+
+        Args:
+            codebooks: (M, K, D/M) float32 array of centroids
+        """
+        self.codebooks = np.ascontiguousarray(codebooks, dtype=np.float32)
+        self.num_subvectors, self.num_centroids, self.subvector_dim = self.codebooks.shape
+
+    @property
+    def dimensions(self) -> int:
+        """Return the dimensionality of the vectors this codec encodes."""
+        return self.num_subvectors * self.subvector_dim
+
+    @classmethod
+    def fit(
+        cls,
+        embeddings: np.ndarray,
+        num_subvectors: int = 48,
+        num_centroids: int = NUM_CENTROIDS,
+        iterations: int = 20,
+        sample_size: int = 16384,
+        seed: int = 0
+    ) -> 'PQCodec':
+        """
+        Learn codebooks with k-means in each subspace.
+
+        Args:
+            embeddings: (N, D) float32 array; D must be divisible by num_subvectors
+            num_subvectors: Number of subvectors M (bytes per encoded vector)
+            num_centroids: Centroids per subspace K (at most 256)
+            iterations: Lloyd iterations per subspace
+            sample_size: Maximum number of vectors used for training
+            seed: Random seed for sampling and initialization
+
+        Returns:
+            Trained PQCodec
+
+        Raises:
+            ValueError: If the shapes do not allow quantization
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        n, dims = embeddings.shape
+
+        if dims % num_subvectors:
+            raise ValueError(
+                f"Dimensions {dims} not divisible by {num_subvectors} subvectors"
+            )
+        if not 0 < num_centroids <= 256:
+            raise ValueError(f"num_centroids must be in 1..256, got {num_centroids}")
+        if n < num_centroids:
+            raise ValueError(
+                f"Need at least {num_centroids} vectors to train, got {n}"
+            )
+
+        rng = np.random.default_rng(seed)
+        if n > sample_size:
+            embeddings = embeddings[rng.choice(n, sample_size, replace=False)]
+
+        sub_dim = dims // num_subvectors
+        subspaces = embeddings.reshape(len(embeddings), num_subvectors, sub_dim)
+        codebooks = np.empty((num_subvectors, num_centroids, sub_dim), dtype=np.float32)
+
+        for m in range(num_subvectors):
+            codebooks[m] = _kmeans(subspaces[:, m, :], num_centroids, iterations, rng)
+
+        logger.info(
+            f"Trained PQ codebooks: {num_subvectors}x{num_centroids} "
+            f"on {len(embeddings)} vectors"
+        )
+        return cls(codebooks)
+
+    def encode(self, embeddings: np.ndarray, batch_size: int = 4096) -> np.ndarray:
+        """
+        Encode vectors into PQ codes.
+
+        Args:
+            embeddings: (N, D) float32 array
+            batch_size: Vectors processed per step (bounds memory use)
+
+        Returns:
+            (N, M) uint8 array of centroid indices
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        n = len(embeddings)
+        codes = np.empty((n, self.num_subvectors), dtype=np.uint8)
+
+        for start in range(0, n, batch_size):
+            batch = embeddings[start:start + batch_size].reshape(
+                -1, self.num_subvectors, self.subvector_dim
+            )
+            for m in range(self.num_subvectors):
+                codes[start:start + batch_size, m] = _nearest(
+                    batch[:, m, :], self.codebooks[m]
+                )
+
+        return codes
+
+    def score(self, query: np.ndarray) -> Callable[[np.ndarray], np.ndarray]:
+        """
+        Build an approximate inner-product scorer for a query.
+
+        Args:
+            query: (D,) float32 query vector
+
+        Returns:
+            Function mapping (N, M) uint8 codes to (N,) float32 scores
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(
+            self.num_subvectors, self.subvector_dim
+        )
+        # (M, K) table of query-subvector . centroid dot products
+        lut = np.einsum("mkd,md->mk", self.codebooks, query)
+        subspace_idx = np.arange(self.num_subvectors)
+
+        def scorer(codes: np.ndarray) -> np.ndarray:
+            return lut[subspace_idx, codes].sum(axis=1)
+
+        return scorer
+
+    def to_mongo_dict(self) -> Dict[str, Any]:
+        """Convert codebooks to MongoDB document fields."""
+        return {
+            "num_subvectors": self.num_subvectors,
+            "num_centroids": self.num_centroids,
+            "subvector_dim": self.subvector_dim,
+            "codebooks": Binary(self.codebooks.astype("<f4").tobytes()),
+        }
+
+    @classmethod
+    def from_mongo_dict(cls, data: Dict[str, Any]) -> 'PQCodec':
+        """Create codec from a MongoDB document."""
+        codebooks = np.frombuffer(data["codebooks"], dtype="<f4").reshape(
+            data["num_subvectors"], data["num_centroids"], data["subvector_dim"]
+        )
+        return cls(codebooks)
+
+
+def encode_codes(codes: np.ndarray) -> Binary:
+    """Pack one vector's uint8 PQ codes as BSON binary."""
+    return Binary(np.ascontiguousarray(codes, dtype=np.uint8).tobytes())
+
+
+def decode_codes(value: Optional[bytes]) -> np.ndarray:
+    """Unpack stored PQ codes (empty array if missing)."""
+    if not value:
+        return np.empty(0, dtype=np.uint8)
+    return np.frombuffer(value, dtype=np.uint8)
+
+
+def _nearest(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid (squared L2) for each point."""
+    distances = (
+        (centroids * centroids).sum(axis=1)[None, :]
+        - 2.0 * points @ centroids.T
+    )
+    return distances.argmin(axis=1)
+
+
+def _kmeans(
+    points: np.ndarray,
+    k: int,
+    iterations: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """Lloyd's k-means; empty clusters keep their previous centroid."""
+    centroids = points[rng.choice(len(points), k, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = _nearest(points, centroids)
+        counts = np.bincount(assignments, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, points)
+
+        non_empty = counts > 0
+        centroids[non_empty] = sums[non_empty] / counts[non_empty, None]
+
+    return centroids
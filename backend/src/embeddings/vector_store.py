@@ -3,10 +3,15 @@ Vector store for DocuMind AI using MongoDB Atlas Vector Search.
 Handles storage and retrieval of vector embeddings.
 """
 
+import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
 
+from bson.binary import Binary
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from pymongo import UpdateOne
 from pymongo.errors import BulkWriteError, OperationFailure
 
@@ -14,8 +19,71 @@ from src.config import settings
 from src.database.mongodb import db
 from src.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from src.embeddings.quantization import PQCodec
+
 logger = get_logger("documind.vector_store")
 
+# BSON binary vector subtype (as read by Atlas Vector Search) and the
+# header for packed float32 vectors: dtype byte followed by padding byte
+BSON_VECTOR_SUBTYPE = 9
+_FLOAT32_VECTOR_HEADER = b"\x27\x00"
+
+# Value of the embedding_fmt field on documents with packed vectors;
+# documents without it hold legacy BSON arrays of doubles. Packed vectors
+# are always L2-normalized before they are written.
+EMBEDDING_FORMAT = "f32le"
+
+
+def encode_vector(vector) -> Binary:
+    """
+    Pack a vector as a BSON float32 binary vector (little-endian).
+    
+    Args:
+        vector: Sequence or NumPy array of floats
+        
+    Returns:
+        bson Binary with the vector subtype
+    """
+    import numpy as np
+    data = np.asarray(vector, dtype="<f4").tobytes()
+    return Binary(_FLOAT32_VECTOR_HEADER + data, BSON_VECTOR_SUBTYPE)
+
+
+def decode_vector(value):
+    """
+    Decode a stored embedding into a float32 NumPy array.
+    
+    Accepts packed binary vectors as well as legacy BSON arrays of doubles.
+    
+    Args:
+        value: Stored embedding value
+        
+    Returns:
+        1-D float32 NumPy array (empty if value is missing)
+    """
+    import numpy as np
+    if isinstance(value, (bytes, Binary)):
+        return np.frombuffer(value, dtype="<f4", offset=len(_FLOAT32_VECTOR_HEADER))
+    return np.asarray(value or [], dtype=np.float32)
+
+
+def normalize_rows(matrix):
+    """
+    L2-normalize each row of a 2-D array in place (zero rows are left as-is).
+    
+    Args:
+        matrix: 2-D float32 NumPy array
+        
+    Returns:
+        The same array, normalized
+    """
+    import numpy as np
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
 
 @dataclass
 class EmbeddingDocument:
@@ -24,27 +92,45 @@ class EmbeddingDocument:
     chunk_id: str
     file_path: str
     content: str
-    embedding: List[float]
+    embedding: Any  # float32 NumPy row or list of floats
     language: Optional[str] = None
     start_line: Optional[int] = None
     end_line: Optional[int] = None
     metadata: Optional[Dict[str, Any]] = None
     created_at: Optional[datetime] = None
     
-    def to_mongo_dict(self) -> Dict[str, Any]:
-        """Convert to MongoDB document format."""
+    def to_mongo_dict(
+        self, embedding=None, pq_codes=None, pq_codebook_id=None
+    ) -> Dict[str, Any]:
+        """
+        Convert to MongoDB document format.
+        
+        The embedding is stored as a packed float32 binary vector.
+        
+        Args:
+            embedding: Optional vector to store instead of self.embedding
+                (e.g. an already normalized copy)
+            pq_codes: Optional uint8 product-quantization codes
+            pq_codebook_id: ID of the codebook pq_codes were encoded with
+        """
+        vector = self.embedding if embedding is None else embedding
         doc = {
             "job_id": self.job_id,
             "chunk_id": self.chunk_id,
             "file_path": self.file_path,
             "content": self.content,
-            "embedding": self.embedding,
+            "embedding": encode_vector(vector),
+            "embedding_fmt": EMBEDDING_FORMAT,
             "language": self.language,
             "start_line": self.start_line,
             "end_line": self.end_line,
             "metadata": self.metadata or {},
             "created_at": self.created_at or datetime.utcnow()
         }
+        if pq_codes is not None:
+            from src.embeddings.quantization import encode_codes
+            doc["pq_codes"] = encode_codes(pq_codes)
+            doc["pq_codebook_id"] = pq_codebook_id
         return doc
 
 
@@ -75,6 +161,33 @@ class VectorStore:
     Uses MongoDB Atlas Vector Search index for efficient nearest neighbor queries.
     """
     
+    # Number of per-job embedding matrices kept for fallback search
+    MATRIX_CACHE_SIZE = 8
+    
+    # Documents per round trip when streaming a job's embeddings
+    CURSOR_BATCH_SIZE = 1000
+    
+    # Shared projection stage of the Atlas $vectorSearch pipeline
+    _ATLAS_PROJECT_STAGE = {
+        "$project": {
+            "chunk_id": 1,
+            "job_id": 1,
+            "file_path": 1,
+            "content": 1,
+            "language": 1,
+            "start_line": 1,
+            "end_line": 1,
+            "metadata": 1,
+            "score": {"$meta": "vectorSearchScore"}
+        }
+    }
+    
+    # Fields needed to build a SearchResult (everything but the vectors)
+    RESULT_FIELDS = {
+        "_id": 0, "chunk_id": 1, "job_id": 1, "file_path": 1, "content": 1,
+        "language": 1, "start_line": 1, "end_line": 1, "metadata": 1
+    }
+    
     def __init__(self, collection_name: str = None):
         """
         Initialize the vector store.
@@ -84,7 +197,11 @@ class VectorStore:
         """
         self.collection_name = collection_name or settings.EMBEDDINGS_COLLECTION
         self._collection = None
+        self._raw_collection = None
+        self._codebooks = None
         self._index_name = settings.VECTOR_SEARCH_INDEX_NAME
+        # job_id -> (chunk IDs, vector or PQ code matrix, codec if quantized)
+        self._matrix_cache: "OrderedDict[str, Tuple[List[str], Any, Optional[PQCodec]]]" = OrderedDict()
         
         logger.info(f"Initialized VectorStore with collection: {self.collection_name}")
     
@@ -96,6 +213,31 @@ class VectorStore:
             self._ensure_indexes()
         return self._collection
     
+    @property
+    def raw_collection(self):
+        """
+        The embeddings collection decoding documents as RawBSONDocument.
+        
+        Used for the fallback scoring scan, where only the vector bytes and
+        chunk ID of each document are read.
+        """
+        if self._raw_collection is None:
+            self._raw_collection = self.collection.with_options(
+                codec_options=CodecOptions(document_class=RawBSONDocument)
+            )
+        return self._raw_collection
+    
+    @property
+    def codebooks(self):
+        """Get the PQ codebooks collection (one document per job), lazily initialized."""
+        if self._codebooks is None:
+            self._codebooks = db.get_collection(settings.PQ_CODEBOOKS_COLLECTION)
+            try:
+                self._codebooks.create_index("job_id", unique=True)
+            except Exception as e:
+                logger.warning(f"Could not create codebook index: {e}")
+        return self._codebooks
+    
     def _ensure_indexes(self) -> None:
         """Create necessary indexes for the embeddings collection."""
         try:
@@ -107,13 +249,15 @@ class VectorStore:
             logger.info("Standard indexes created for embeddings collection")
             
             # Note: Atlas Vector Search index must be created via Atlas UI or API
+            # Embeddings are stored pre-normalized as packed float32 binary
+            # vectors, so dot product is equivalent to cosine similarity.
             # The index definition would be:
             # {
             #   "fields": [{
             #     "type": "vector",
             #     "path": "embedding",
-            #     "numDimensions": 1536,
-            #     "similarity": "cosine"
+            #     "numDimensions": 384,
+            #     "similarity": "dotProduct"
             #   }]
             # }
             
@@ -122,13 +266,19 @@ class VectorStore:
     
     async def upsert_embeddings(
         self, 
-        documents: List[EmbeddingDocument]
+        documents: List[EmbeddingDocument],
+        append_only: bool = False
     ) -> int:
         """
         Insert or update embeddings in the vector store.
         
+        Chunk IDs not yet stored are written with one unordered insert_many;
+        only the ones that already exist go through per-document upserts.
+        
         Args:
             documents: List of EmbeddingDocument objects
+            append_only: Skip the existence check and insert everything
+                (for fresh jobs whose chunks cannot already be stored)
             
         Returns:
             Number of documents upserted
@@ -138,34 +288,133 @@ class VectorStore:
         
         logger.info(f"Upserting {len(documents)} embeddings")
         
-        # Build bulk upsert operations
+        for job_id in {doc.job_id for doc in documents}:
+            self._invalidate_job_matrix(job_id)
+        
+        import numpy as np
+        
+        # Normalize all vectors in one batch and store them packed, so the
+        # search side can use plain dot products
+        matrix = np.empty(
+            (len(documents), len(documents[0].embedding)), dtype=np.float32
+        )
+        for i, doc in enumerate(documents):
+            matrix[i] = doc.embedding
+        normalize_rows(matrix)
+        
+        codes, codebook_ids = self._quantize(documents, matrix)
+        
+        if append_only:
+            existing = set()
+        else:
+            existing = set(self.collection.distinct(
+                "chunk_id", {"chunk_id": {"$in": [doc.chunk_id for doc in documents]}}
+            ))
+        
+        new_docs = []
         operations = []
-        for doc in documents:
-            operations.append(
-                UpdateOne(
+        for i, (doc, vector) in enumerate(zip(documents, matrix)):
+            mongo_doc = doc.to_mongo_dict(
+                embedding=vector, pq_codes=codes[i], pq_codebook_id=codebook_ids[i]
+            )
+            if doc.chunk_id not in existing:
+                new_docs.append(mongo_doc)
+            elif codes[i] is None:
+                # Stale codes from an earlier codebook must not outlive it
+                operations.append(UpdateOne(
                     {"chunk_id": doc.chunk_id},
-                    {"$set": doc.to_mongo_dict()},
+                    {"$set": mongo_doc, "$unset": {"pq_codes": "", "pq_codebook_id": ""}},
                     upsert=True
-                )
-            )
+                ))
+            else:
+                operations.append(UpdateOne(
+                    {"chunk_id": doc.chunk_id}, {"$set": mongo_doc}, upsert=True
+                ))
         
+        inserted = 0
+        modified = 0
         try:
-            result = self.collection.bulk_write(operations, ordered=False)
+            if new_docs:
+                try:
+                    inserted = len(self.collection.insert_many(
+                        new_docs, ordered=False
+                    ).inserted_ids)
+                except BulkWriteError as e:
+                    logger.error(f"Bulk insert error: {e.details}")
+                    inserted = e.details.get('nInserted', 0)
             
-            upserted = result.upserted_count + result.modified_count
-            logger.info(
-                f"Upsert complete: {result.upserted_count} inserted, "
-                f"{result.modified_count} modified"
-            )
-            return upserted
-            
-        except BulkWriteError as e:
-            logger.error(f"Bulk write error: {e.details}")
-            # Return partial success count
-            return e.details.get('nUpserted', 0) + e.details.get('nModified', 0)
+            # Existing chunks are updated even if some of the inserts failed
+            if operations:
+                try:
+                    result = self.collection.bulk_write(operations, ordered=False)
+                    inserted += result.upserted_count
+                    modified = result.modified_count
+                except BulkWriteError as e:
+                    logger.error(f"Bulk write error: {e.details}")
+                    inserted += e.details.get('nUpserted', 0)
+                    modified = e.details.get('nModified', 0)
         except Exception as e:
             logger.error(f"Upsert failed: {e}")
             raise VectorStoreError(f"Failed to upsert embeddings: {e}")
+        
+        logger.info(
+            f"Upsert complete: {inserted} inserted, {modified} modified"
+        )
+        return inserted + modified
+    
+    def _quantize(
+        self, documents: List[EmbeddingDocument], matrix
+    ) -> Tuple[List[Any], List[Optional[str]]]:
+        """
+        Train a PQ codebook per job and encode the batch's vectors.
+        
+        Only jobs with at least PQ_MIN_VECTORS vectors in the batch are
+        quantized; their codebook is stored in the companion collection,
+        replacing any earlier one. Each codebook gets a fresh ID that is
+        also stamped on the codes encoded with it, so codes left over from
+        an earlier codebook can be told apart.
+        
+        Args:
+            documents: Documents being upserted
+            matrix: Their normalized (N, D) embedding matrix
+            
+        Returns:
+            Tuple of (per-document uint8 codes, per-document codebook IDs),
+            both None where the job is not quantized
+        """
+        codes: List[Any] = [None] * len(documents)
+        codebook_ids: List[Optional[str]] = [None] * len(documents)
+        if not settings.PQ_ENABLED:
+            return codes, codebook_ids
+        
+        from src.embeddings.quantization import PQCodec
+        
+        rows_by_job: Dict[str, List[int]] = {}
+        for i, doc in enumerate(documents):
+            rows_by_job.setdefault(doc.job_id, []).append(i)
+        
+        for job_id, rows in rows_by_job.items():
+            if len(rows) < max(settings.PQ_MIN_VECTORS, PQCodec.NUM_CENTROIDS):
+                continue
+            try:
+                codec = PQCodec.fit(matrix[rows], num_subvectors=settings.PQ_SUBVECTORS)
+            except ValueError as e:
+                logger.warning(f"Skipping PQ for job {job_id}: {e}")
+                continue
+            
+            codebook_id = uuid.uuid4().hex
+            for i, row_codes in zip(rows, codec.encode(matrix[rows])):
+                codes[i] = row_codes
+                codebook_ids[i] = codebook_id
+            
+            self.codebooks.update_one(
+                {"job_id": job_id},
+                {"$set": {"job_id": job_id, "codebook_id": codebook_id,
+                          **codec.to_mongo_dict(), "created_at": datetime.utcnow()}},
+                upsert=True
+            )
+        
+        return codes, codebook_ids
     
     async def similarity_search(
         self,
@@ -226,35 +475,32 @@ class VectorStore:
         Returns:
             List of SearchResult objects
         """
-        # Atlas Vector Search aggregation pipeline
+        if not isinstance(query_vector, list):
+            query_vector = query_vector.tolist()
+        
+        # Atlas Vector Search aggregation pipeline; only the search stage
+        # varies per query
         pipeline = [
             {
                 "$vectorSearch": {
                     "index": self._index_name,
                     "path": "embedding",
                     "queryVector": query_vector,
-                    "numCandidates": top_k * 10,  # Search more candidates for better results
+                    # Search more candidates for better results
+                    "numCandidates": top_k * settings.VECTOR_SEARCH_NUM_CANDIDATES_MULT,
                     "limit": top_k,
                     "filter": {"job_id": job_id}
                 }
             },
-            {
-                "$project": {
-                    "chunk_id": 1,
-                    "job_id": 1,
-                    "file_path": 1,
-                    "content": 1,
-                    "language": 1,
-                    "start_line": 1,
-                    "end_line": 1,
-                    "metadata": 1,
-                    "score": {"$meta": "vectorSearchScore"}
-                }
-            }
+            self._ATLAS_PROJECT_STAGE
         ]
         
         results = []
-        cursor = self.collection.aggregate(pipeline)
+        cursor = self.collection.aggregate(
+            pipeline,
+            batchSize=top_k,
+            maxTimeMS=settings.VECTOR_SEARCH_TIMEOUT_MS
+        )
         
         for doc in cursor:
             score = doc.get("score", 0)
@@ -289,6 +535,12 @@ class VectorStore:
         Fallback in-memory cosine similarity search.
         Used when Atlas Vector Search index is not available.
         
+        Scores every embedding of the job with a single matrix-vector
+        product (a parallel Numba kernel when numba is installed, or a
+        PQ lookup-table gather when the job has PQ codes)
+        and selects the top_k with a partial sort. Only the winners'
+        content and metadata are then fetched.
+        
         Args:
             query_vector: Query embedding vector
             job_id: Filter results to this job
@@ -300,51 +552,51 @@ class VectorStore:
         """
         import numpy as np
         
-        # Fetch all embeddings for the job
-        cursor = self.collection.find(
-            {"job_id": job_id},
-            {"chunk_id": 1, "job_id": 1, "file_path": 1, "content": 1,
-             "embedding": 1, "language": 1, "start_line": 1, "end_line": 1,
-             "metadata": 1}
-        )
-        
-        query_arr = np.array(query_vector, dtype=np.float32)
+        query_arr = np.asarray(query_vector, dtype=np.float32)
         query_norm = np.linalg.norm(query_arr)
         
-        if query_norm == 0:
+        if query_norm == 0 or top_k <= 0:
             return []
         
         query_arr = query_arr / query_norm
         
-        # Calculate similarities
-        scored_results = []
-        for doc in cursor:
-            embedding = doc.get("embedding", [])
-            if not embedding:
-                continue
-            
-            doc_arr = np.array(embedding, dtype=np.float32)
-            doc_norm = np.linalg.norm(doc_arr)
-            
-            if doc_norm > 0:
-                doc_arr = doc_arr / doc_norm
-                score = float(np.dot(query_arr, doc_arr))
-                
-                if score >= score_threshold:
-                    scored_results.append((score, doc))
+        chunk_ids, matrix, codec = self._load_job_matrix(job_id)
+        if not chunk_ids:
+            logger.info("Fallback search returned 0 results")
+            return []
+        
+        from src.embeddings._fallback_kernel import score_all, top_k as select_top_k
+        
+        if codec is not None:
+            # Approximate similarities from PQ codes
+            scores = codec.score(query_arr)(matrix)
+        else:
+            # Calculate similarities (rows are already L2-normalized)
+            scores = score_all(matrix, query_arr)
         
-        # Sort by score descending
-        scored_results.sort(key=lambda x: x[0], reverse=True)
+        # Partial sort: only the top_k candidates are fully ordered
+        top_idx = select_top_k(scores, top_k, score_threshold)
+        
+        winners = [chunk_ids[i] for i in top_idx]
+        docs = {
+            doc["chunk_id"]: doc
+            for doc in self.collection.find(
+                {"chunk_id": {"$in": winners}}, self.RESULT_FIELDS
+            )
+        }
         
-        # Take top_k results
         results = []
-        for score, doc in scored_results[:top_k]:
+        for chunk_id, i in zip(winners, top_idx):
+            doc = docs.get(chunk_id)
+            if doc is None:
+                # Deleted since the matrix was loaded
+                continue
             results.append(SearchResult(
-                chunk_id=doc["chunk_id"],
+                chunk_id=chunk_id,
                 job_id=doc["job_id"],
                 file_path=doc["file_path"],
                 content=doc["content"],
-                score=score,
+                score=float(scores[i]),
                 language=doc.get("language"),
                 start_line=doc.get("start_line"),
                 end_line=doc.get("end_line"),
@@ -354,6 +606,178 @@ class VectorStore:
         logger.info(f"Fallback search returned {len(results)} results")
         return results
     
+    def _load_job_matrix(self, job_id: str):
+        """
+        Load a job's embeddings as one row-normalized (N, D) float32 matrix.
+        
+        If the job has a PQ codebook and every embedding carries codes, the
+        (N, M) uint8 code matrix is loaded instead of the full vectors.
+        Results are kept in a small LRU cache per job and invalidated when
+        the job's embeddings are written or deleted.
+        
+        Args:
+            job_id: Job identifier
+            
+        Returns:
+            Tuple of (chunk IDs, matrix, PQCodec or None)
+        """
+        import numpy as np
+        
+        cached = self._matrix_cache.get(job_id)
+        if cached is not None:
+            self._matrix_cache.move_to_end(job_id)
+            return cached
+        
+        loaded = self._load_job_codes(job_id)
+        if loaded is not None:
+            return self._cache_job_matrix(job_id, loaded)
+        
+        # Stream only IDs and vectors; content is fetched for winners only
+        cursor = self._job_cursor(job_id, "embedding", "embedding_fmt")
+        
+        chunk_ids = []
+        vectors = []
+        legacy_rows = []
+        for doc in cursor:
+            vector = decode_vector(doc.get("embedding"))
+            if not vector.size:
+                continue
+            if doc.get("embedding_fmt") != EMBEDDING_FORMAT:
+                legacy_rows.append(len(vectors))
+            chunk_ids.append(doc["chunk_id"])
+            vectors.append(vector)
+        
+        if not vectors:
+            return [], np.empty((0, 0), dtype=np.float32), None
+        
+        matrix = np.empty((len(vectors), vectors[0].shape[0]), dtype=np.float32)
+        for i, vector in enumerate(vectors):
+            matrix[i] = vector
+        
+        # Packed vectors are stored normalized; only legacy rows need it
+        if legacy_rows:
+            matrix[legacy_rows] = normalize_rows(matrix[legacy_rows])
+        
+        return self._cache_job_matrix(job_id, (chunk_ids, matrix, None))
+    
+    def _load_job_codes(self, job_id: str):
+        """
+        Load a job's PQ codes and codebook.
+        
+        Args:
+            job_id: Job identifier
+            
+        Returns:
+            Tuple of (chunk IDs, (N, M) uint8 codes, PQCodec), or None if the
+            job is not (fully) quantized with its current codebook
+        """
+        if not settings.PQ_ENABLED:
+            return None
+        
+        codebook = self.codebooks.find_one({"job_id": job_id})
+        # Codebooks stored before IDs were stamped cannot be matched to codes
+        if codebook is None or codebook.get("codebook_id") is None:
+            return None
+        
+        import numpy as np
+        from src.embeddings.quantization import PQCodec, decode_codes
+        
+        codec = PQCodec.from_mongo_dict(codebook)
+        cursor = self._job_cursor(job_id, "pq_codes", "pq_codebook_id")
+        
+        chunk_ids = []
+        rows = []
+        for doc in cursor:
+            if doc.get("pq_codebook_id") != codebook["codebook_id"]:
+                # Unquantized, or encoded with an earlier codebook (e.g. the
+                # job was embedded across several upserts): scoring these
+                # codes against this codebook would be wrong, so use the
+                # exact vectors instead
+                return None
+            row = decode_codes(doc.get("pq_codes"))
+            if row.size != codec.num_subvectors:
+                return None
+            chunk_ids.append(doc["chunk_id"])
+            rows.append(row)
+        
+        if not chunk_ids:
+            return None
+        
+        return chunk_ids, np.stack(rows), codec
+    
+    def _job_cursor(self, job_id: str, *fields: str):
+        """
+        Stream chunk_id and the given fields for every embedding of a job.
+        
+        Uses the job_id index and large batches to keep round trips low,
+        and yields undecoded RawBSONDocuments.
+        """
+        projection = {"_id": 0, "chunk_id": 1}
+        projection.update((field, 1) for field in fields)
+        return self.raw_collection.find(
+            {"job_id": job_id}, projection
+        ).hint([("job_id", 1)]).batch_size(self.CURSOR_BATCH_SIZE)
+    
+    def _cache_job_matrix(self, job_id: str, entry):
+        """Store a loaded job matrix in the LRU cache and return it."""
+        self._matrix_cache[job_id] = entry
+        if len(self._matrix_cache) > self.MATRIX_CACHE_SIZE:
+            self._matrix_cache.popitem(last=False)
+        return entry
+    
+    def _invalidate_job_matrix(self, job_id: str) -> None:
+        """Drop a job's cached embedding matrix."""
+        self._matrix_cache.pop(job_id, None)
+    
+    def normalize_stored_embeddings(self, job_id: Optional[str] = None) -> int:
+        """
+        Rewrite legacy embeddings as normalized packed float32 vectors.
+        
+        Documents written before embeddings were packed hold raw arrays of
+        doubles that fallback search has to normalize on every load.
+        
+        Args:
+            job_id: Only migrate this job (default: all jobs)
+            
+        Returns:
+            Number of documents rewritten
+        """
+        query: Dict[str, Any] = {"embedding_fmt": {"$ne": EMBEDDING_FORMAT}}
+        if job_id:
+            query["job_id"] = job_id
+        
+        cursor = self.collection.find(
+            query, {"_id": 1, "job_id": 1, "embedding": 1}
+        ).batch_size(self.CURSOR_BATCH_SIZE)
+        
+        migrated = 0
+        operations = []
+        touched_jobs = set()
+        for doc in cursor:
+            vector = decode_vector(doc.get("embedding"))
+            if not vector.size:
+                continue
+            vector = normalize_rows(vector.reshape(1, -1).copy())[0]
+            operations.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"embedding": encode_vector(vector),
+                          "embedding_fmt": EMBEDDING_FORMAT}}
+            ))
+            touched_jobs.add(doc["job_id"])
+            
+            if len(operations) >= self.CURSOR_BATCH_SIZE:
+                migrated += self.collection.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        
+        if operations:
+            migrated += self.collection.bulk_write(operations, ordered=False).modified_count
+        
+        for touched in touched_jobs:
+            self._invalidate_job_matrix(touched)
+        
+        logger.info(f"Normalized {migrated} legacy embeddings")
+        return migrated
+    
     async def get_embeddings_by_job(
         self, 
         job_id: str, 
@@ -397,6 +821,9 @@ class VectorStore:
         Returns:
             Number of documents deleted
         """
+        self._invalidate_job_matrix(job_id)
+        if settings.PQ_ENABLED:
+            self.codebooks.delete_one({"job_id": job_id})
         result = self.collection.delete_many({"job_id": job_id})
         logger.info(f"Deleted {result.deleted_count} embeddings for job {job_id}")
         return result.deleted_count
@@ -9,103 +9,77 @@ This module provides:
 - Model capability metadata for adaptive prompts
 """
 
-from src.generation.llm_client import (
-    BaseLLMClient,
-    LLMResponse,
-    LLMClientError,
-    LLMProvider,
-    MockLLMClient,
-    HuggingFaceLLMClient,
-    OllamaLLMClient,
-    OpenAICompatibleClient,
-    get_llm_client,
-    get_default_llm_client
-)
+import importlib
 
-from src.generation.templates import (
-    PromptBuilder,
-    AdaptivePromptBuilder,
-    CodeSnippet,
-    get_prompt_builder,
-    get_default_prompt_builder,
-    get_strict_rag_builder,
-    get_streaming_builder,
-    create_snippet_from_retrieval,
-    SYSTEM_PROMPT_MASTER,
-    SYSTEM_PROMPT_CODE_ASSISTANT,
-    SYSTEM_PROMPT_MINIMAL,
-    SYSTEM_PROMPT_STRICT_RAG,
-    SYSTEM_PROMPT_STREAMING,
-    SYSTEM_PROMPT_UNIVERSAL,
-    MASTER_RAG_CONTEXT_TEMPLATE,
-    MASTER_RAG_SNIPPET_TEMPLATE
-)
-
-from src.generation.model_capabilities import (
-    ModelCapabilities,
-    JSONSupport,
-    CitationStrictness,
-    MODEL_CAPABILITIES,
-    get_model_capabilities,
-    get_preferred_chunk_size,
-    supports_streaming,
-    get_max_context
-)
-
-from src.generation.generator import (
-    Generator,
-    GeneratorError,
-    GenerationResponse,
-    GenerationStatus,
-    SourceReference,
-    get_generator,
-    generate_answer
-)
-
-__all__ = [
+# Public name -> submodule that defines it; imported on first access
+_LAZY_IMPORTS = {
     # LLM Client
-    "BaseLLMClient",
-    "LLMResponse",
-    "LLMClientError",
-    "LLMProvider",
-    "MockLLMClient",
-    "HuggingFaceLLMClient",
-    "OllamaLLMClient",
-    "OpenAICompatibleClient",
-    "get_llm_client",
-    "get_default_llm_client",
+    "BaseLLMClient": "src.generation.llm_client",
+    "BatchedLLMClient": "src.generation.llm_client",
+    "LLMResponse": "src.generation.llm_client",
+    "LLMClientError": "src.generation.llm_client",
+    "LLMProvider": "src.generation.llm_client",
+    "MockLLMClient": "src.generation.llm_client",
+    "HuggingFaceLLMClient": "src.generation.llm_client",
+    "OllamaLLMClient": "src.generation.llm_client",
+    "OpenAICompatibleClient": "src.generation.llm_client",
+    "get_llm_client": "src.generation.llm_client",
+    "get_default_llm_client": "src.generation.llm_client",
+    "CachedLLMClient": "src.generation.llm_cache",
     # Templates
-    "PromptBuilder",
-    "AdaptivePromptBuilder",
-    "CodeSnippet",
-    "get_prompt_builder",
-    "get_default_prompt_builder",
-    "get_strict_rag_builder",
-    "get_streaming_builder",
-    "create_snippet_from_retrieval",
-    "SYSTEM_PROMPT_MASTER",
-    "SYSTEM_PROMPT_CODE_ASSISTANT",
-    "SYSTEM_PROMPT_MINIMAL",
-    "SYSTEM_PROMPT_STRICT_RAG",
-    "SYSTEM_PROMPT_STREAMING",
-    "SYSTEM_PROMPT_UNIVERSAL",
-    "MASTER_RAG_CONTEXT_TEMPLATE",
-    "MASTER_RAG_SNIPPET_TEMPLATE",
+    "PromptBuilder": "src.generation.templates",
+    "AdaptivePromptBuilder": "src.generation.templates",
+    "CodeSnippet": "src.generation.templates",
+    "get_prompt_builder": "src.generation.templates",
+    "get_default_prompt_builder": "src.generation.templates",
+    "get_strict_rag_builder": "src.generation.templates",
+    "get_streaming_builder": "src.generation.templates",
+    "create_snippet_from_retrieval": "src.generation.templates",
+    "SYSTEM_PROMPT_MASTER": "src.generation.templates",
+    "SYSTEM_PROMPT_CODE_ASSISTANT": "src.generation.templates",
+    "SYSTEM_PROMPT_MINIMAL": "src.generation.templates",
+    "SYSTEM_PROMPT_STRICT_RAG": "src.generation.templates",
+    "SYSTEM_PROMPT_STREAMING": "src.generation.templates",
+    "SYSTEM_PROMPT_UNIVERSAL": "src.generation.templates",
+    "MASTER_RAG_CONTEXT_TEMPLATE": "src.generation.templates",
+    "MASTER_RAG_SNIPPET_TEMPLATE": "src.generation.templates",
     # Model Capabilities
-    "ModelCapabilities",
-    "JSONSupport",
-    "CitationStrictness",
-    "MODEL_CAPABILITIES",
-    "get_model_capabilities",
-    "get_preferred_chunk_size",
-    "supports_streaming",
-    "get_max_context",
+    "ModelCapabilities": "src.generation.model_capabilities",
+    "JSONSupport": "src.generation.model_capabilities",
+    "CitationStrictness": "src.generation.model_capabilities",
+    "MODEL_CAPABILITIES": "src.generation.model_capabilities",
+    "get_model_capabilities": "src.generation.model_capabilities",
+    "get_preferred_chunk_size": "src.generation.model_capabilities",
+    "supports_streaming": "src.generation.model_capabilities",
+    "get_max_context": "src.generation.model_capabilities",
     # Generator
-    "Generator",
-    "GeneratorError",
-    "GenerationResponse",
-    "GenerationStatus",
-    "SourceReference",
-    "get_generator",
-    "generate_answer"
-]
+    "Generator": "src.generation.generator",
+    "GeneratorError": "src.generation.generator",
+    "GenerationResponse": "src.generation.generator",
+    "GenerationStatus": "src.generation.generator",
+    "SourceReference": "src.generation.generator",
+    "get_generator": "src.generation.generator",
+    "generate_answer": "src.generation.generator",
+    "dump_json": "src.generation.generator"
+}
+
+__all__ = tuple(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str):
+    """
+    Import a public name from its submodule on first access (PEP 562).
+    
+    Keeps ``import src.generation`` cheap: HTTP clients, templates and the
+    generator are only loaded when one of their names is used.
+    """
+    module_path = _LAZY_IMPORTS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_path), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,56 @@
+"""
+Batch kernel for retrieval confidence scores.
+
+Uses a Numba-compiled loop when numba is installed and falls back to
+vectorized NumPy otherwise. Both apply the same formula as
+Generator._calculate_confidence.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _confidence_rows(score_sums, counts):
+        n = score_sums.shape[0]
+        out = np.zeros(n, np.float64)
+        for i in range(n):
+            count = counts[i]
+            if count == 0:
+                continue
+            result_factor = count / 5.0 if count < 5 else 1.0
+            c = 0.35 * (score_sums[i] / count + 1.0) + 0.3 * result_factor
+            out[i] = 0.0 if c < 0.0 else (1.0 if c > 1.0 else c)
+        return out
+else:
+    def _confidence_rows(score_sums, counts):
+        safe_counts = np.maximum(counts, 1)
+        result_factor = np.minimum(counts / 5.0, 1.0)
+        out = np.clip(
+            0.35 * (score_sums / safe_counts + 1.0) + 0.3 * result_factor, 0.0, 1.0
+        )
+        out[counts == 0] = 0.0
+        return out
+
+
+def confidence_batch(score_sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Confidence for several retrieval sets at once.
+
+    Args:
+        score_sums: (N,) sum of relevance scores per retrieval set
+        counts: (N,) number of results per retrieval set
+
+    Returns:
+        (N,) float64 confidences in the 0-1 range
+    """
+    return _confidence_rows(
+        np.ascontiguousarray(score_sums, dtype=np.float64),
+        np.ascontiguousarray(counts, dtype=np.int64)
+    )
@@ -3,14 +3,18 @@ Generator module for DocuMind AI.
 Orchestrates RAG (Retrieval-Augmented Generation) pipeline.
 """
 
-from dataclasses import dataclass, asdict
-from typing import List, Optional, Dict, Any
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Dict, Any, Tuple, Union
 from enum import Enum
 
 from src.config import settings
-from src.retrieval.retriever import Retriever, RetrievalResult, RetrieverError, get_retriever
 from src.generation.llm_client import (
     BaseLLMClient,
+    BatchedLLMClient,
     LLMResponse,
     LLMClientError,
     get_default_llm_client
@@ -20,8 +24,19 @@ from src.generation.templates import (
     CodeSnippet,
     get_default_prompt_builder
 )
+from src.generation.semantic_cache import SemanticCache
 from src.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    # Imported lazily at runtime: the retrieval stack pulls in the
+    # embedding service, vector store and MongoDB driver
+    from src.retrieval.retriever import Retriever, RetrievalResult
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = get_logger("documind.generator")
 
 
@@ -33,7 +48,7 @@ class GenerationStatus(str, Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SourceReference:
     """Reference to a source code snippet used in generation."""
     file_path: str
@@ -41,17 +56,37 @@ class SourceReference:
     end_line: int
     language: str
     relevance_score: float
-    snippet_preview: str  # First 200 chars of content
+    # Full chunk content; the preview is sliced from it on access
+    content: str = field(default="", repr=False)
+    preview_len: int = field(default=200, repr=False)
+    
+    @property
+    def snippet_preview(self) -> str:
+        """First preview_len characters of the chunk content."""
+        return self.content[:self.preview_len]
+    
+    def compact(self) -> "SourceReference":
+        """Copy that keeps only the preview, releasing the full chunk content."""
+        if len(self.content) <= self.preview_len:
+            return self
+        return replace(self, content=self.snippet_preview)
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "file_path": self.file_path,
+            "start_line": self.start_line,
+            "end_line": self.end_line,
+            "language": self.language,
+            "relevance_score": self.relevance_score,
+            "snippet_preview": self.snippet_preview
+        }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GenerationResponse:
     """Complete response from the generation pipeline."""
     answer: str
-    status: GenerationStatus
+    status: Union[GenerationStatus, str]
     sources: List[SourceReference]
     confidence: float  # 0.0 - 1.0 based on context quality
     model: str
@@ -59,19 +94,60 @@ class GenerationResponse:
     query: str
     tokens_used: Optional[int] = None
     error_message: Optional[str] = None
+    cache_hit: bool = False  # Served from the semantic response cache
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "answer": self.answer,
-            "status": self.status.value,
+            # GenerationStatus is a str subclass; take its string value
+            # directly rather than through the Enum.value descriptor
+            "status": str.__str__(self.status),
             "sources": [s.to_dict() for s in self.sources],
             "confidence": self.confidence,
             "model": self.model,
             "job_id": self.job_id,
             "query": self.query,
             "tokens_used": self.tokens_used,
-            "error_message": self.error_message
+            "error_message": self.error_message,
+            "cache_hit": self.cache_hit
         }
+    
+    def to_bytes(self) -> bytes:
+        """Serialize to JSON bytes (orjson when installed)."""
+        return dump_json(self.to_dict())
+
+
+def dump_json(obj: Any) -> bytes:
+    """
+    Serialize a response payload to JSON bytes.
+    
+    Uses orjson when installed and the standard library otherwise, with the
+    same handling of enums, NumPy values and objects exposing to_dict().
+    
+    Args:
+        obj: JSON-compatible value
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(obj, default=_json_default).encode()
+
+
+def _json_default(o: Any) -> Any:
+    """Serialize values the JSON encoders do not handle natively."""
+    if hasattr(o, "to_dict"):
+        return o.to_dict()
+    if isinstance(o, Enum):
+        return o.value
+    if hasattr(o, "item"):  # NumPy scalar
+        return o.item()
+    raise TypeError(f"Type is not JSON serializable: {type(o).__name__}")
 
 
 class GeneratorError(Exception):
@@ -90,11 +166,32 @@ class Generator:
     4. Structure and return results
     """
     
+    # Speculatively retrieved results kept for predicted follow-up queries
+    PREFETCH_CACHE_SIZE = 64
+    
+    # Tokens kept free between prompt and answer when capping max_tokens,
+    # and the smallest answer length the cap may leave
+    CONTEXT_SAFETY_TOKENS = 64
+    MIN_ANSWER_TOKENS = 64
+    
+    # Documentation requests up to this top_k search their broad queries
+    # one at a time and stop once enough files are found; larger ones
+    # search them all concurrently
+    DOC_ADAPTIVE_MAX_TOP_K = 5
+    
+    # Fixed queries used to sample representative code for documentation,
+    # in priority order; embedded once per generator
+    DOC_BROAD_QUERIES = ("main entry point", "core logic", "configuration")
+    
+    # Rendered prompts kept for repeated (query, retrieval set) pairs
+    PROMPT_CACHE_SIZE = 512
+    
     def __init__(
         self,
-        retriever: Optional[Retriever] = None,
+        retriever: Optional["Retriever"] = None,
         llm_client: Optional[BaseLLMClient] = None,
-        prompt_builder: Optional[PromptBuilder] = None
+        prompt_builder: Optional[PromptBuilder] = None,
+        semantic_cache: Optional[SemanticCache] = None
     ):
         """
         Initialize the generator.
@@ -103,15 +200,61 @@ class Generator:
             retriever: Retriever instance for code search
             llm_client: LLM client for generation
             prompt_builder: Prompt builder for formatting
+            semantic_cache: Response cache for similar queries (default from settings)
         """
-        self._retriever = retriever or get_retriever()
+        if retriever is None:
+            from src.retrieval.retriever import get_retriever
+            retriever = get_retriever()
+        self._retriever = retriever
         self._llm_client = llm_client or get_default_llm_client()
+        if settings.LLM_BATCH_ENABLED and not isinstance(
+            self._llm_client, BatchedLLMClient
+        ):
+            self._llm_client = BatchedLLMClient(
+                self._llm_client,
+                max_batch=settings.LLM_BATCH_MAX_SIZE,
+                max_wait_ms=settings.LLM_BATCH_MAX_WAIT_MS
+            )
         self._prompt_builder = prompt_builder or get_default_prompt_builder()
+        self._system_prompt_str = self._prompt_builder.render_system_prompt()
+        self.refresh_model_name()
+        if semantic_cache is None:
+            semantic_cache = SemanticCache(
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                ttl=settings.SEMANTIC_CACHE_TTL,
+                max_size=settings.SEMANTIC_CACHE_SIZE
+            )
+        self._semantic_cache = semantic_cache
+        self._prefetch_cache: "OrderedDict[Tuple, List[RetrievalResult]]" = OrderedDict()
+        self._prefetch_tasks: set = set()
+        self._prompt_cache: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._broad_query_embeddings = None
         
         logger.info(
-            f"Initialized Generator with model: {self._llm_client.get_model_name()}"
+            "Initialized Generator with model: %s", self._model_name
         )
     
+    def refresh_model_name(self) -> str:
+        """
+        Re-read the model name from the LLM client.
+        
+        The name (and the context budget derived from it) is cached at
+        construction; call this after switching the client's model.
+        
+        Returns:
+            The current model name
+        """
+        from src.generation.model_capabilities import get_max_context
+        self._model_name = self._llm_client.get_model_name()
+        self._max_context = get_max_context(self._model_name)
+        return self._model_name
+    
+    def forget_job(self, job_id: str) -> None:
+        """Drop a job's semantic-cache entries (e.g. after deletion)."""
+        dropped = self._semantic_cache.invalidate(lambda scope: scope[0] == job_id)
+        if dropped:
+            logger.info("Dropped %d cached responses for job %s", dropped, job_id)
+    
     async def generate(
         self,
         query: str,
@@ -138,64 +281,62 @@ class Generator:
         Raises:
             GeneratorError: If generation fails
         """
-        logger.info(f"Generating response for query in job {job_id}")
+        from src.retrieval.retriever import RetrieverError
+        
+        logger.info("Generating response for query in job %s", job_id)
+        
+        # Unknown jobs have nothing to retrieve: skip embedding and search
+        if not self._retriever.is_known_job(job_id):
+            return self._no_context_response(query, job_id)
         
-        # Step 1: Retrieve relevant code chunks
+        # Step 0: Serve near-duplicate queries from the semantic cache
+        cache_scope = (job_id, top_k, max_tokens, temperature, score_threshold)
         try:
-            retrieval_results = await self._retriever.retrieve(
-                query=query,
-                job_id=job_id,
-                top_k=top_k,
-                score_threshold=score_threshold
-            )
+            query_embedding = await self._retriever.embed_query(query)
         except RetrieverError as e:
-            logger.error(f"Retrieval failed: {e}")
+            logger.error("Retrieval failed: %s", e)
             raise GeneratorError(f"Failed to retrieve context: {e}")
         
-        # Step 2: Convert to code snippets and source references
-        snippets = self._results_to_snippets(retrieval_results)
-        sources = self._results_to_sources(retrieval_results)
+        cached = self._semantic_cache.get(cache_scope, query_embedding)
+        if cached is not None:
+            logger.info("Serving response from semantic cache")
+            return replace(cached, query=query, cache_hit=True)
         
-        # Calculate confidence based on retrieval quality
-        confidence = self._calculate_confidence(retrieval_results)
+        # Step 1: Retrieve relevant code chunks while the LLM backend warms up
+        try:
+            retrieval_results, _ = await asyncio.gather(
+                self._retrieve(
+                    query, job_id, top_k, score_threshold, query_embedding
+                ),
+                self._llm_client.prewarm()
+            )
+        except RetrieverError as e:
+            logger.error("Retrieval failed: %s", e)
+            raise GeneratorError(f"Failed to retrieve context: {e}")
         
-        # Determine status based on context availability
+        # Nothing relevant was found: answer without calling the LLM
         if not retrieval_results:
-            status = GenerationStatus.NO_CONTEXT
-        elif confidence < 0.3:
-            status = GenerationStatus.PARTIAL
-        else:
-            status = GenerationStatus.SUCCESS
+            return self._no_context_response(query, job_id)
         
-        # Step 3: Build prompt
-        prompt = self._prompt_builder.build_prompt(
-            query=query,
-            snippets=snippets,
-            include_system_prompt=True
+        # Steps 2-3: Build prompt, source references and confidence
+        prompt, sources, confidence, status = self._prepare_generation(
+            query, retrieval_results, max_tokens
         )
         
         # Step 4: Generate response
         try:
             llm_response = await self._llm_client.generate(
                 prompt=prompt,
-                max_tokens=max_tokens,
-                temperature=temperature
+                max_tokens=self._effective_max_tokens(prompt, max_tokens),
+                temperature=temperature,
+                cached_prefix=self._system_prompt_str
             )
         except LLMClientError as e:
-            logger.error(f"LLM generation failed: {e}")
-            return GenerationResponse(
-                answer="I encountered an error while generating a response. Please try again.",
-                status=GenerationStatus.ERROR,
-                sources=sources,
-                confidence=0.0,
-                model=self._llm_client.get_model_name(),
-                job_id=job_id,
-                query=query,
-                error_message=str(e)
-            )
+            logger.error("LLM generation failed: %s", e)
+            return self._error_response(query, job_id, sources, e)
         
         # Step 5: Build and return response
-        return GenerationResponse(
+        response = GenerationResponse(
             answer=llm_response.content,
             status=status,
             sources=sources,
@@ -205,6 +346,609 @@ class Generator:
             query=query,
             tokens_used=llm_response.tokens_used
         )
+        self._cache_response(cache_scope, query, query_embedding, response)
+        return response
+    
+    async def generate_batch(
+        self,
+        queries: List[str],
+        job_id: str,
+        top_k: int = 5,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        score_threshold: Optional[float] = None
+    ) -> List[GenerationResponse]:
+        """
+        Generate responses for several queries about the same codebase.
+        
+        All queries are embedded in one call, retrieved together, and
+        sent to the LLM through a single generate_batch() call.
+        
+        Args:
+            queries: The user's questions
+            job_id: Job ID to search within
+            top_k: Number of code chunks to retrieve per query
+            max_tokens: Maximum tokens per response
+            temperature: LLM sampling temperature
+            score_threshold: Minimum relevance score for chunks
+            
+        Returns:
+            One GenerationResponse per query, in query order
+            
+        Raises:
+            GeneratorError: If retrieval fails
+        """
+        from src.retrieval.retriever import RetrieverError
+        
+        logger.info("Generating responses for %d queries in job %s", len(queries), job_id)
+        
+        if not self._retriever.is_known_job(job_id):
+            return [self._no_context_response(query, job_id) for query in queries]
+        
+        cache_scope = (job_id, top_k, max_tokens, temperature, score_threshold)
+        try:
+            query_embeddings = await self._retriever.embed_queries(queries)
+        except RetrieverError as e:
+            logger.error("Retrieval failed: %s", e)
+            raise GeneratorError(f"Failed to retrieve context: {e}")
+        
+        responses: List[Optional[GenerationResponse]] = [None] * len(queries)
+        misses = []
+        for i, (query, query_embedding) in enumerate(zip(queries, query_embeddings)):
+            cached = self._semantic_cache.get(cache_scope, query_embedding)
+            if cached is not None:
+                responses[i] = replace(cached, query=query, cache_hit=True)
+            else:
+                misses.append(i)
+        
+        if not misses:
+            return responses
+        
+        try:
+            results_per_query, _ = await asyncio.gather(
+                self._retriever.retrieve_many(
+                    [queries[i] for i in misses],
+                    job_id=job_id,
+                    top_k=top_k,
+                    score_threshold=score_threshold,
+                    query_embeddings=query_embeddings[misses]
+                ),
+                self._llm_client.prewarm()
+            )
+        except RetrieverError as e:
+            logger.error("Retrieval failed: %s", e)
+            raise GeneratorError(f"Failed to retrieve context: {e}")
+        
+        # Queries with no relevant context are answered without the LLM
+        with_context = []
+        for i, results in zip(misses, results_per_query):
+            if results:
+                with_context.append((i, results))
+            else:
+                responses[i] = self._no_context_response(queries[i], job_id)
+        if not with_context:
+            return responses
+        
+        import numpy as np
+        from src.generation._confidence_kernel import confidence_batch
+        
+        misses = [i for i, _ in with_context]
+        with_context = [
+            (i, self._fit_context(queries[i], results, max_tokens))
+            for i, results in with_context
+        ]
+        contexts = [self._build_context(results) for _, results in with_context]
+        confidences = confidence_batch(
+            np.fromiter((scores.sum() for _, _, scores in contexts), dtype=np.float64),
+            np.fromiter((scores.size for _, _, scores in contexts), dtype=np.int64)
+        )
+        prepared = [
+            self._assemble_generation(queries[i], snippets, sources, confidence)
+            for i, (snippets, sources, _), confidence in zip(
+                misses, contexts, confidences.tolist()
+            )
+        ]
+        
+        # Prompts whose context leaves less room for the answer are sent as
+        # their own batch, so they do not cap every other answer's length
+        budget_groups: Dict[int, List[int]] = {}
+        for j, (prompt, _, _, _) in enumerate(prepared):
+            budget = self._effective_max_tokens(prompt, max_tokens)
+            budget_groups.setdefault(budget, []).append(j)
+        
+        group_results = await asyncio.gather(
+            *(
+                self._llm_client.generate_batch(
+                    [prepared[j][0] for j in positions],
+                    max_tokens=budget,
+                    temperature=temperature,
+                    cached_prefix=self._system_prompt_str
+                )
+                for budget, positions in budget_groups.items()
+            ),
+            return_exceptions=True
+        )
+        
+        llm_responses: List[Any] = [None] * len(prepared)
+        for positions, result in zip(budget_groups.values(), group_results):
+            if isinstance(result, LLMClientError):
+                # Only this group's queries get error responses
+                logger.error("LLM generation failed: %s", result)
+                for j in positions:
+                    llm_responses[j] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                for j, llm_response in zip(positions, result):
+                    llm_responses[j] = llm_response
+        
+        for i, (_, sources, confidence, status), llm_response in zip(
+            misses, prepared, llm_responses
+        ):
+            if isinstance(llm_response, LLMClientError):
+                responses[i] = self._error_response(
+                    queries[i], job_id, sources, llm_response
+                )
+                continue
+            response = GenerationResponse(
+                answer=llm_response.content,
+                status=status,
+                sources=sources,
+                confidence=confidence,
+                model=llm_response.model,
+                job_id=job_id,
+                query=queries[i],
+                tokens_used=llm_response.tokens_used
+            )
+            self._cache_response(
+                cache_scope, queries[i], query_embeddings[i], response
+            )
+            responses[i] = response
+        
+        return responses
+    
+    def _cache_response(
+        self,
+        cache_scope: Tuple,
+        query: str,
+        query_embedding,
+        response: GenerationResponse
+    ) -> None:
+        """
+        Store a response in the semantic cache.
+        
+        Sources are compacted to their previews first, so a cached response
+        does not keep full chunk contents alive for the cache TTL.
+        """
+        self._semantic_cache.put(
+            cache_scope,
+            query,
+            query_embedding,
+            replace(response, sources=[source.compact() for source in response.sources])
+        )
+    
+    def _prepare_generation(
+        self,
+        query: str,
+        retrieval_results: List["RetrievalResult"],
+        max_tokens: int
+    ) -> Tuple[str, List[SourceReference], float, GenerationStatus]:
+        """Build the prompt, sources, confidence and status for a query."""
+        retrieval_results = self._fit_context(query, retrieval_results, max_tokens)
+        snippets, sources, scores = self._build_context(retrieval_results)
+        
+        # Calculate confidence based on retrieval quality
+        confidence = self._calculate_confidence(scores)
+        
+        return self._assemble_generation(query, snippets, sources, confidence)
+    
+    def _fit_context(
+        self,
+        query: str,
+        retrieval_results: List["RetrievalResult"],
+        max_tokens: int
+    ) -> List["RetrievalResult"]:
+        """
+        Trim retrieval results to the model's context budget.
+        
+        The prompt and answer may use settings.CONTEXT_BUDGET_RATIO of the
+        model's context window. Results are kept in score order until their
+        estimated size (about 4 characters per token) exceeds what is left
+        after the system prompt, query and answer; the best result is always
+        kept and left to the prompt builder's own truncation.
+        
+        Args:
+            query: The user's question
+            retrieval_results: Results in descending score order
+            max_tokens: Tokens reserved for the answer
+            
+        Returns:
+            Leading slice of retrieval_results that fits the budget
+        """
+        budget = (
+            int(self._max_context * settings.CONTEXT_BUDGET_RATIO)
+            - (len(self._system_prompt_str) + len(query)) // 4
+            - max_tokens
+        )
+        used = 0
+        for n, r in enumerate(retrieval_results):
+            used += len(r.content or "") // 4
+            if used > budget:
+                keep = max(n, 1)
+                logger.debug(
+                    "Trimmed context to %d of %d results for the token budget",
+                    keep, len(retrieval_results)
+                )
+                return retrieval_results[:keep]
+        return retrieval_results
+    
+    def _effective_max_tokens(self, prompt: str, max_tokens: int) -> int:
+        """
+        Cap max_tokens to the room the prompt leaves in the context window.
+        
+        Asking for more than fits makes the backend truncate or abort after
+        paying for the full prefill. Prompt size is estimated at about 4
+        characters per token, with a safety margin.
+        
+        Args:
+            prompt: The complete prompt
+            max_tokens: Requested answer length
+            
+        Returns:
+            max_tokens, reduced if needed (never below MIN_ANSWER_TOKENS)
+        """
+        available = self._max_context - len(prompt) // 4 - self.CONTEXT_SAFETY_TOKENS
+        if available >= max_tokens:
+            return max_tokens
+        logger.debug(
+            "Capping max_tokens from %d to %d for a %d-character prompt",
+            max_tokens, available, len(prompt)
+        )
+        return max(available, self.MIN_ANSWER_TOKENS)
+    
+    def _assemble_generation(
+        self,
+        query: str,
+        snippets: List[CodeSnippet],
+        sources: List[SourceReference],
+        confidence: float
+    ) -> Tuple[str, List[SourceReference], float, GenerationStatus]:
+        """Pick the status and build the prompt for an already-scored context."""
+        # Determine status based on context availability
+        if not snippets:
+            status = GenerationStatus.NO_CONTEXT
+        elif confidence < 0.3:
+            status = GenerationStatus.PARTIAL
+        else:
+            status = GenerationStatus.SUCCESS
+        
+        prompt = self._cached_build_prompt(query, snippets)
+        return prompt, sources, confidence, status
+    
+    def _cached_build_prompt(self, query: str, snippets: List[CodeSnippet]) -> str:
+        """
+        Build the prompt, reusing the rendered string for repeated inputs.
+        
+        Retries and semantic-cache near misses often pair the same query
+        with the same retrieval set; those skip template rendering.
+        
+        Args:
+            query: The user's question
+            snippets: Code snippets for context
+            
+        Returns:
+            Complete prompt string
+        """
+        key = (query, tuple(
+            (s.file_path, s.start_line, s.end_line, s.language, s.score, s.content)
+            for s in snippets
+        ))
+        prompt = self._prompt_cache.get(key)
+        if prompt is not None:
+            self._prompt_cache.move_to_end(key)
+            return prompt
+        
+        prompt = self._prompt_builder.build_prompt_fast(
+            query=query,
+            snippets=snippets,
+            system_prompt_str=self._system_prompt_str
+        )
+        self._prompt_cache[key] = prompt
+        if len(self._prompt_cache) > self.PROMPT_CACHE_SIZE:
+            self._prompt_cache.popitem(last=False)
+        return prompt
+    
+    def _no_context_response(self, query: str, job_id: str) -> GenerationResponse:
+        """Build the canned response for a query with no relevant context."""
+        return GenerationResponse(
+            answer=settings.NO_CONTEXT_ANSWER,
+            status=GenerationStatus.NO_CONTEXT,
+            sources=[],
+            confidence=0.0,
+            model=self._model_name,
+            job_id=job_id,
+            query=query,
+            tokens_used=0
+        )
+    
+    def _error_response(
+        self,
+        query: str,
+        job_id: str,
+        sources: List[SourceReference],
+        error: Exception
+    ) -> GenerationResponse:
+        """Build the response returned when the LLM call fails."""
+        return GenerationResponse(
+            answer="I encountered an error while generating a response. Please try again.",
+            status=GenerationStatus.ERROR,
+            sources=sources,
+            confidence=0.0,
+            model=self._model_name,
+            job_id=job_id,
+            query=query,
+            error_message=str(error)
+        )
+    
+    async def generate_streaming(
+        self,
+        query: str,
+        job_id: str,
+        predicted_next: Optional[List[str]] = None,
+        top_k: int = 5,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        score_threshold: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response as a stream of text chunks.
+        
+        Text-only view of generate_stream(); see it for prefetching.
+        
+        Args:
+            query: The user's question
+            job_id: Job ID to search within
+            predicted_next: Likely follow-up queries to prefetch context for
+            top_k: Number of code chunks to retrieve
+            max_tokens: Maximum tokens in response
+            temperature: LLM sampling temperature
+            score_threshold: Minimum relevance score for chunks
+            
+        Yields:
+            Text chunks of the answer
+            
+        Raises:
+            GeneratorError: If retrieval or generation fails
+        """
+        async for event in self.generate_stream(
+            query,
+            job_id,
+            predicted_next=predicted_next,
+            top_k=top_k,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            score_threshold=score_threshold
+        ):
+            if event["event"] == "token":
+                yield event["content"]
+            elif event["event"] == "error":
+                raise GeneratorError(f"Failed to generate response: {event['message']}")
+    
+    async def generate_stream(
+        self,
+        query: str,
+        job_id: str,
+        predicted_next: Optional[List[str]] = None,
+        top_k: int = 5,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        score_threshold: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a response as a stream of events.
+        
+        The first event carries the sources and confidence so callers can
+        render them before the answer arrives; "token" events follow as
+        the LLM produces text, then a final "done" (or "error") event.
+        Models that do not support streaming are read in one piece and
+        sent as a single token event.
+        
+        While the LLM decodes, retrieval for the predicted follow-up
+        queries runs in the background; a later generate() or
+        generate_stream() call for one of them skips retrieval.
+        
+        Streams share the semantic cache with generate(): a near-duplicate
+        query is answered from it as a single token event, and a completed
+        stream is cached for later calls.
+        
+        Args:
+            query: The user's question
+            job_id: Job ID to search within
+            predicted_next: Likely follow-up queries to prefetch context for
+            top_k: Number of code chunks to retrieve
+            max_tokens: Maximum tokens in response
+            temperature: LLM sampling temperature
+            score_threshold: Minimum relevance score for chunks
+            
+        Yields:
+            Event dictionaries keyed by "event": "metadata", "token",
+            "done" or "error"
+            
+        Raises:
+            GeneratorError: If retrieval fails (before any event is yielded)
+        """
+        from src.retrieval.retriever import RetrieverError
+        from src.generation.model_capabilities import supports_streaming
+        
+        cache_scope = (job_id, top_k, max_tokens, temperature, score_threshold)
+        query_embedding = None
+        if not self._retriever.is_known_job(job_id):
+            retrieval_results = []
+        else:
+            try:
+                query_embedding = await self._retriever.embed_query(query)
+            except RetrieverError as e:
+                logger.error("Retrieval failed: %s", e)
+                raise GeneratorError(f"Failed to retrieve context: {e}")
+            
+            cached = self._semantic_cache.get(cache_scope, query_embedding)
+            if cached is not None:
+                logger.info("Serving streamed response from semantic cache")
+                yield {
+                    "event": "metadata",
+                    "status": str.__str__(cached.status),
+                    "sources": [source.to_dict() for source in cached.sources],
+                    "confidence": cached.confidence,
+                    "model": cached.model,
+                    "job_id": job_id,
+                    "query": query,
+                    "cache_hit": True
+                }
+                yield {"event": "token", "content": cached.answer}
+                yield {"event": "done"}
+                return
+            
+            try:
+                retrieval_results, _ = await asyncio.gather(
+                    self._retrieve(
+                        query, job_id, top_k, score_threshold, query_embedding
+                    ),
+                    self._llm_client.prewarm()
+                )
+            except RetrieverError as e:
+                logger.error("Retrieval failed: %s", e)
+                raise GeneratorError(f"Failed to retrieve context: {e}")
+        
+        prompt, sources, confidence, status = self._prepare_generation(
+            query, retrieval_results, max_tokens
+        )
+        model = self._model_name
+        
+        yield {
+            "event": "metadata",
+            "status": str.__str__(status),
+            "sources": [source.to_dict() for source in sources],
+            "confidence": confidence,
+            "model": model,
+            "job_id": job_id,
+            "query": query,
+            "cache_hit": False
+        }
+        
+        if predicted_next:
+            task = asyncio.create_task(
+                self._prefetch(predicted_next, job_id, top_k, score_threshold)
+            )
+            self._prefetch_tasks.add(task)
+            task.add_done_callback(self._prefetch_tasks.discard)
+        
+        if not retrieval_results:
+            yield {"event": "token", "content": settings.NO_CONTEXT_ANSWER}
+            yield {"event": "done"}
+            return
+        
+        tokens = []
+        try:
+            if self._llm_client.supports_streaming() and supports_streaming(model):
+                async for token in self._llm_client.generate_stream(
+                    prompt=prompt,
+                    max_tokens=self._effective_max_tokens(prompt, max_tokens),
+                    temperature=temperature,
+                    cached_prefix=self._system_prompt_str
+                ):
+                    tokens.append(token)
+                    yield {"event": "token", "content": token}
+            else:
+                llm_response = await self._llm_client.generate(
+                    prompt=prompt,
+                    max_tokens=self._effective_max_tokens(prompt, max_tokens),
+                    temperature=temperature,
+                    cached_prefix=self._system_prompt_str
+                )
+                tokens.append(llm_response.content)
+                yield {"event": "token", "content": llm_response.content}
+        except LLMClientError as e:
+            logger.error("LLM generation failed: %s", e)
+            yield {"event": "error", "message": str(e)}
+            return
+        
+        self._cache_response(
+            cache_scope,
+            query,
+            query_embedding,
+            GenerationResponse(
+                answer="".join(tokens),
+                status=status,
+                sources=sources,
+                confidence=confidence,
+                model=model,
+                job_id=job_id,
+                query=query
+            )
+        )
+        yield {"event": "done"}
+    
+    async def _retrieve(
+        self,
+        query: str,
+        job_id: str,
+        top_k: int,
+        score_threshold: Optional[float],
+        query_embedding=None
+    ) -> List["RetrievalResult"]:
+        """Retrieve chunks, using prefetched results when available."""
+        key = self._prefetch_key(query, job_id, top_k, score_threshold)
+        prefetched = self._prefetch_cache.pop(key, None)
+        if prefetched is not None:
+            logger.info("Using prefetched retrieval results")
+            return prefetched
+        
+        return await self._retriever.retrieve(
+            query=query,
+            job_id=job_id,
+            top_k=top_k,
+            score_threshold=score_threshold,
+            query_embedding=query_embedding
+        )
+    
+    async def _prefetch(
+        self,
+        queries: List[str],
+        job_id: str,
+        top_k: int,
+        score_threshold: Optional[float]
+    ) -> None:
+        """Retrieve context for predicted queries into the prefetch cache."""
+        from src.retrieval.retriever import RetrieverError
+        
+        for query in queries:
+            key = self._prefetch_key(query, job_id, top_k, score_threshold)
+            if key in self._prefetch_cache:
+                continue
+            try:
+                results = await self._retriever.retrieve(
+                    query=query,
+                    job_id=job_id,
+                    top_k=top_k,
+                    score_threshold=score_threshold
+                )
+            except RetrieverError as e:
+                logger.debug("Prefetch failed for predicted query: %s", e)
+                continue
+            
+            self._prefetch_cache[key] = results
+            while len(self._prefetch_cache) > self.PREFETCH_CACHE_SIZE:
+                self._prefetch_cache.popitem(last=False)
+    
+    @staticmethod
+    def _prefetch_key(
+        query: str,
+        job_id: str,
+        top_k: int,
+        score_threshold: Optional[float]
+    ) -> Tuple:
+        """Key prefetched results by job, parameters and normalized query."""
+        return (job_id, top_k, score_threshold, " ".join(query.casefold().split()))
     
     async def generate_with_context(
         self,
@@ -229,44 +973,49 @@ class Generator:
         Returns:
             GenerationResponse with answer and metadata
         """
-        # Convert chunks to snippets
-        snippets = [
-            CodeSnippet(
-                file_path=chunk.get("file_path", "unknown"),
-                content=chunk.get("content", ""),
-                language=chunk.get("language", "text"),
-                start_line=chunk.get("start_line", 1),
-                end_line=chunk.get("end_line", 1),
-                score=chunk.get("score", 0.0)
-            )
-            for chunk in context_chunks
-        ]
+        if not context_chunks:
+            return self._no_context_response(query, job_id)
         
-        # Build sources
-        sources = [
-            SourceReference(
-                file_path=chunk.get("file_path", "unknown"),
-                start_line=chunk.get("start_line", 1),
-                end_line=chunk.get("end_line", 1),
-                language=chunk.get("language", "text"),
-                relevance_score=chunk.get("score", 0.0),
-                snippet_preview=chunk.get("content", "")[:200]
-            )
-            for chunk in context_chunks
-        ]
+        # Convert chunks to snippets and sources in one pass
+        snippets = []
+        sources = []
+        for chunk in context_chunks:
+            file_path = chunk.get("file_path", "unknown")
+            content = chunk.get("content", "")
+            language = chunk.get("language", "text")
+            start_line = chunk.get("start_line", 1)
+            end_line = chunk.get("end_line", 1)
+            score = chunk.get("score", 0.0)
+            snippets.append(CodeSnippet(
+                file_path=file_path,
+                content=content,
+                language=language,
+                start_line=start_line,
+                end_line=end_line,
+                score=score
+            ))
+            sources.append(SourceReference(
+                file_path=file_path,
+                start_line=start_line,
+                end_line=end_line,
+                language=language,
+                relevance_score=score,
+                content=content
+            ))
         
         # Build prompt and generate
-        prompt = self._prompt_builder.build_prompt(
+        prompt = self._prompt_builder.build_prompt_fast(
             query=query,
             snippets=snippets,
-            include_system_prompt=True
+            system_prompt_str=self._system_prompt_str
         )
         
         try:
             llm_response = await self._llm_client.generate(
                 prompt=prompt,
-                max_tokens=max_tokens,
-                temperature=temperature
+                max_tokens=self._effective_max_tokens(prompt, max_tokens),
+                temperature=temperature,
+                cached_prefix=self._system_prompt_str
             )
         except LLMClientError as e:
             return GenerationResponse(
@@ -274,7 +1023,7 @@ class Generator:
                 status=GenerationStatus.ERROR,
                 sources=sources,
                 confidence=0.0,
-                model=self._llm_client.get_model_name(),
+                model=self._model_name,
                 job_id=job_id,
                 query=query,
                 error_message=str(e)
@@ -294,71 +1043,167 @@ class Generator:
             tokens_used=llm_response.tokens_used
         )
     
-    def _results_to_snippets(
+    def _build_context(
         self,
-        results: List[RetrievalResult]
-    ) -> List[CodeSnippet]:
-        """Convert retrieval results to code snippets."""
-        return [
-            CodeSnippet(
+        results: List["RetrievalResult"]
+    ) -> Tuple[List[CodeSnippet], List[SourceReference], Any]:
+        """
+        Convert retrieval results to snippets and sources in a single pass.
+        
+        Args:
+            results: Retrieval results to convert
+            
+        Returns:
+            Tuple of (snippets, sources, (N,) float64 array of relevance scores)
+        """
+        import numpy as np
+        
+        scores = np.fromiter(
+            (r.score for r in results), dtype=np.float64, count=len(results)
+        )
+        snippets = []
+        sources = []
+        for r in results:
+            language = r.language or "text"
+            start_line = r.start_line or 1
+            end_line = r.end_line or 1
+            snippets.append(CodeSnippet(
                 file_path=r.file_path,
                 content=r.content,
-                language=r.language or "text",
-                start_line=r.start_line or 1,
-                end_line=r.end_line or 1,
+                language=language,
+                start_line=start_line,
+                end_line=end_line,
                 score=r.score
-            )
-            for r in results
-        ]
-    
-    def _results_to_sources(
-        self,
-        results: List[RetrievalResult]
-    ) -> List[SourceReference]:
-        """Convert retrieval results to source references."""
-        return [
-            SourceReference(
+            ))
+            sources.append(SourceReference(
                 file_path=r.file_path,
-                start_line=r.start_line or 1,
-                end_line=r.end_line or 1,
-                language=r.language or "text",
+                start_line=start_line,
+                end_line=end_line,
+                language=language,
                 relevance_score=r.score,
-                snippet_preview=r.content[:200] if r.content else ""
-            )
-            for r in results
-        ]
+                content=r.content or ""
+            ))
+        return snippets, sources, scores
     
-    def _calculate_confidence(
-        self,
-        results: List[RetrievalResult]
-    ) -> float:
+    @staticmethod
+    def _calculate_confidence(scores) -> float:
         """
         Calculate confidence score based on retrieval quality.
         
         Factors:
         - Number of results
         - Average relevance scores
-        - Score distribution
+        
+        Args:
+            scores: (N,) array of retrieval relevance scores
+            
+        Returns:
+            Confidence in the 0-1 range
         """
-        if not results:
+        count = scores.size
+        if not count:
             return 0.0
         
-        # Average score
-        avg_score = sum(r.score for r in results) / len(results)
+        # 0.7 * normalized average score plus 0.3 * result-count factor
+        # (more results is better, up to 5), with the score normalization
+        # (avg + 1) / 2 folded into the weight: 0.7 * 0.5 = 0.35
+        confidence = 0.35 * (float(scores.mean()) + 1.0) + 0.3 * min(count / 5, 1.0)
         
-        # Normalize score (handle negative scores from mock embeddings)
-        # Assuming scores range from -1 to 1, normalize to 0-1
-        normalized_avg = (avg_score + 1) / 2
+        # Scores are nominally in [-1, 1], but product-quantized inner
+        # products are approximate and can step outside it
+        return min(max(confidence, 0.0), 1.0)
+    
+    async def _doc_query_embeddings(self):
+        """
+        Embeddings of DOC_BROAD_QUERIES, computed on first use.
         
-        # Factor in number of results (more is better, up to a point)
-        result_factor = min(len(results) / 5, 1.0)
+        The queries never change, so every documentation request after the
+        first skips the embedding forward pass.
         
-        # Combined confidence
-        confidence = (normalized_avg * 0.7) + (result_factor * 0.3)
+        Returns:
+            (N, D) query matrix in DOC_BROAD_QUERIES order
+            
+        Raises:
+            RetrieverError: If embedding fails
+        """
+        if self._broad_query_embeddings is None:
+            self._broad_query_embeddings = await self._retriever.embed_queries(
+                list(self.DOC_BROAD_QUERIES)
+            )
+        return self._broad_query_embeddings
+    
+    async def _retrieve_doc_context(
+        self,
+        broad_queries: List[str],
+        job_id: str,
+        top_k: int,
+        query_embeddings=None
+    ) -> List["RetrievalResult"]:
+        """
+        Retrieve documentation context for several broad queries.
         
-        # Clamp to 0-1 range
-        return max(0.0, min(1.0, confidence))
-
+        Small requests (top_k <= DOC_ADAPTIVE_MAX_TOP_K) search the queries
+        in order and stop as soon as top_k distinct files are found, saving
+        searches on easy jobs. Larger ones search all queries concurrently
+        for lower tail latency. Queries that fail are skipped.
+        
+        Args:
+            broad_queries: Queries in priority order
+            job_id: Job ID to search within
+            top_k: Number of distinct files wanted
+            query_embeddings: Precomputed (N, D) embeddings of broad_queries
+            
+        Returns:
+            Results deduplicated by file path, in query order
+        """
+        from src.retrieval.retriever import RetrieverError
+        
+        per_query_k = top_k // len(broad_queries) + 2
+        all_results = []
+        seen_paths = set()
+        
+        def merge(results: List["RetrievalResult"]) -> None:
+            for r in results:
+                # Deduplicate by file path
+                if r.file_path not in seen_paths:
+                    all_results.append(r)
+                    seen_paths.add(r.file_path)
+        
+        if top_k > self.DOC_ADAPTIVE_MAX_TOP_K:
+            # Embed all broad queries in one call and search them together
+            try:
+                results_list = await self._retriever.retrieve_many(
+                    broad_queries,
+                    job_id=job_id,
+                    top_k=per_query_k,
+                    query_embeddings=query_embeddings
+                )
+            except RetrieverError:
+                return all_results
+            for results in results_list:
+                merge(results)
+            return all_results
+        
+        if query_embeddings is None:
+            try:
+                query_embeddings = await self._retriever.embed_queries(broad_queries)
+            except RetrieverError:
+                return all_results
+        for query, query_embedding in zip(broad_queries, query_embeddings):
+            try:
+                results = await self._retriever.retrieve(
+                    query=query,
+                    job_id=job_id,
+                    top_k=per_query_k,
+                    query_embedding=query_embedding
+                )
+            except RetrieverError:
+                continue
+            merge(results)
+            if len(all_results) >= top_k:
+                break
+        return all_results
+    
     async def generate_documentation(
         self,
         job_id: str,
@@ -391,43 +1236,27 @@ class Generator:
             top_k = 15  # More context for comprehensive coverage
             temperature = 0.4  # Slightly higher for more natural writing
         
-        from string import Template
-        from src.generation.templates import DOC_TYPE_PROMPTS, CONTEXT_SNIPPET_TEMPLATE
+        from src.generation.templates import DOC_TYPE_TEMPLATES
+        from src.retrieval.retriever import RetrieverError
         
-        logger.info(f"Generating {doc_type} documentation for job {job_id}")
+        logger.info("Generating %s documentation for job %s", doc_type, job_id)
         
         # Get the appropriate prompt template
         doc_type_upper = doc_type.upper()
-        if doc_type_upper not in DOC_TYPE_PROMPTS:
-            raise GeneratorError(f"Unsupported doc_type: {doc_type}. Supported: {list(DOC_TYPE_PROMPTS.keys())}")
+        if doc_type_upper not in DOC_TYPE_TEMPLATES:
+            raise GeneratorError(f"Unsupported doc_type: {doc_type}. Supported: {list(DOC_TYPE_TEMPLATES.keys())}")
         
-        prompt_template = DOC_TYPE_PROMPTS[doc_type_upper]
+        prompt_template = DOC_TYPE_TEMPLATES[doc_type_upper]
         
         # Step 1: Retrieve ALL chunks for comprehensive documentation
-        # Use a broad query to get representative samples
-        broad_queries = [
-            "main entry point",
-            "core logic",
-            "configuration"
-        ]
-        
-        all_results = []
-        seen_paths = set()
-        
-        for query in broad_queries:
-            try:
-                results = await self._retriever.retrieve(
-                    query=query,
-                    job_id=job_id,
-                    top_k=top_k // len(broad_queries) + 2
-                )
-                for r in results:
-                    # Deduplicate by file path
-                    if r.file_path not in seen_paths:
-                        all_results.append(r)
-                        seen_paths.add(r.file_path)
-            except RetrieverError:
-                continue
+        # Use broad queries to get representative samples
+        try:
+            query_embeddings = await self._doc_query_embeddings()
+        except RetrieverError:
+            query_embeddings = None
+        all_results = await self._retrieve_doc_context(
+            list(self.DOC_BROAD_QUERIES), job_id, top_k, query_embeddings
+        )
         
         # If no results from queries, try getting any chunks
         if not all_results:
@@ -438,30 +1267,22 @@ class Generator:
                     top_k=top_k
                 )
             except RetrieverError as e:
-                logger.error(f"Retrieval failed: {e}")
+                logger.error("Retrieval failed: %s", e)
                 raise GeneratorError(f"Failed to retrieve context: {e}")
         
+        # Nothing indexed to document: answer without calling the LLM
+        if not all_results:
+            return self._no_context_response(f"Generate {doc_type}", job_id)
+        
         # Step 2: Build code snippets section
-        snippets = self._results_to_snippets(all_results[:top_k])
-        sources = self._results_to_sources(all_results[:top_k])
+        snippets, sources, scores = self._build_context(all_results[:top_k])
         
         # Format code snippets for the prompt
-        formatted_snippets = []
-        for i, snippet in enumerate(snippets):
-            snippet_text = Template(CONTEXT_SNIPPET_TEMPLATE).safe_substitute(
-                file_path=snippet.file_path,
-                language=snippet.language,
-                start_line=snippet.start_line,
-                end_line=snippet.end_line,
-                score=f"{snippet.score:.2%}" if snippet.score else "N/A",
-                content=snippet.content
-            )
-            formatted_snippets.append(snippet_text)
-        
-        code_context = "\n\n".join(formatted_snippets)
+        # (CodeSnippet.format uses the pre-parsed snippet template)
+        code_context = "\n\n".join(snippet.format() for snippet in snippets)
         
         # Step 3: Build the full prompt
-        full_prompt = Template(prompt_template).safe_substitute(
+        full_prompt = prompt_template.safe_substitute(
             code_snippets=code_context,
             repo_name=repo_name or "Unknown Repository",
             repo_owner=repo_owner or "Unknown"
@@ -471,25 +1292,25 @@ class Generator:
         try:
             llm_response = await self._llm_client.generate(
                 prompt=full_prompt,
-                max_tokens=max_tokens,
+                max_tokens=self._effective_max_tokens(full_prompt, max_tokens),
                 temperature=temperature
             )
         except LLMClientError as e:
-            logger.error(f"LLM generation failed: {e}")
+            logger.error("LLM generation failed: %s", e)
             return GenerationResponse(
                 answer="Failed to generate documentation. Please try again.",
                 status=GenerationStatus.ERROR,
                 sources=sources,
                 confidence=0.0,
-                model=self._llm_client.get_model_name(),
+                model=self._model_name,
                 job_id=job_id,
                 query=f"Generate {doc_type}",
                 error_message=str(e)
             )
         
         # Calculate confidence
-        confidence = self._calculate_confidence(all_results[:top_k])
-        status = GenerationStatus.SUCCESS if all_results else GenerationStatus.NO_CONTEXT
+        confidence = self._calculate_confidence(scores)
+        status = GenerationStatus.SUCCESS
         
         return GenerationResponse(
             answer=llm_response.content,
@@ -508,16 +1329,32 @@ class Generator:
 # =============================================================================
 
 _generator: Optional[Generator] = None
+_generator_lock = threading.Lock()
 
 
 def get_generator() -> Generator:
-    """Get or create the default generator singleton."""
+    """Get or create the default generator singleton (thread-safe)."""
     global _generator
     if _generator is None:
-        _generator = Generator()
+        with _generator_lock:
+            if _generator is None:
+                _generator = Generator()
     return _generator
 
 
+def forget_job(job_id: str) -> None:
+    """
+    Drop a job's cached responses from the global generator.
+    
+    Does nothing if the generator has not been created yet.
+    
+    Args:
+        job_id: Job ID to forget
+    """
+    if _generator is not None:
+        _generator.forget_job(job_id)
+
+
 async def generate_answer(
     query: str,
     job_id: str,
@@ -0,0 +1,224 @@
+"""
+Exact-match LLM response cache for DocuMind AI.
+Serves repeated deterministic prompts without another LLM request.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from src.generation.llm_client import BaseLLMClient, LLMResponse
+from src.utils.logger import get_logger
+
+logger = get_logger("documind.llm_cache")
+
+
+class CachedLLMClient(BaseLLMClient):
+    """
+    Caching wrapper around another LLM client.
+
+    Only deterministic calls are cached (temperature 0, or do_sample
+    disabled): with sampling on, the same prompt is expected to give a
+    different answer. Entries are keyed by model, prompt and every
+    generation parameter, expire after ttl seconds and the least recently
+    used are evicted beyond max_size. Hits are returned with tokens_used=0,
+    since no tokens were spent on them.
+
+    Concurrent misses for the same key are coalesced: the first caller
+    sends the request and the others wait for its response instead of
+    sending their own.
+    """
+
+    def __init__(
+        self,
+        client: BaseLLMClient,
+        max_size: int = 1000,
+        ttl: float = 3600.0
+    ):
+        """
+        Initialize the caching wrapper.
+
+        Args:
+            client: LLM client to send cache misses to
+            max_size: Maximum number of cached responses
+            ttl: Entry lifetime in seconds
+        """
+        self._client = client
+        self.max_size = max_size
+        self.ttl = ttl
+        # key -> (response, created_at)
+        self._entries: "OrderedDict[Hashable, Tuple[LLMResponse, float]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+        # key -> response future of the request currently being sent
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+        logger.info(
+            f"Caching deterministic LLM responses for {client.get_model_name()}: "
+            f"max_size={max_size}, ttl={ttl}s"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cache_key(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        kwargs: Dict[str, Any]
+    ) -> Optional[Hashable]:
+        """
+        Build the cache key for a call.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            kwargs: Additional provider-specific parameters
+
+        Returns:
+            Hashable key, or None if the call is not deterministic or has
+            unhashable parameters
+        """
+        if temperature > 0 and kwargs.get("do_sample", True):
+            return None
+        key = (
+            self._client.get_model_name(),
+            prompt,
+            max_tokens,
+            temperature,
+            tuple(sorted(kwargs.items()))
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _get(self, key: Hashable) -> Optional[LLMResponse]:
+        """Look up a live entry, counting the hit or miss."""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] > self.ttl:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return replace(entry[0], tokens_used=0)
+
+    def _put(self, key: Hashable, response: LLMResponse) -> None:
+        """Store a response, evicting the least recently used beyond max_size."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (response, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def hit_ratio(self) -> float:
+        """Fraction of cacheable calls served from the cache."""
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> LLMResponse:
+        """Serve a deterministic prompt from the cache or the wrapped client."""
+        key = self.cache_key(prompt, max_tokens, temperature, kwargs)
+        if key is None:
+            return await self._client.generate(
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+
+        cached = self._get(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit (hit ratio {self.hit_ratio():.2f})")
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            logger.debug("Joining in-flight LLM request for identical prompt")
+            return replace(await asyncio.shield(inflight), tokens_used=0)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self._client.generate(
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Mark retrieved so an unshared failure is not logged twice
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        else:
+            future.set_result(response)
+            self._put(key, response)
+        finally:
+            del self._inflight[key]
+        return response
+
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> List[LLMResponse]:
+        """Serve cached prompts and send only the misses as one batch."""
+        keys = [self.cache_key(p, max_tokens, temperature, kwargs) for p in prompts]
+        responses: List[Optional[LLMResponse]] = [
+            self._get(key) if key is not None else None for key in keys
+        ]
+        misses = [i for i, response in enumerate(responses) if response is None]
+        if not misses:
+            return responses
+
+        fresh = await self._client.generate_batch(
+            [prompts[i] for i in misses],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+        for i, response in zip(misses, fresh):
+            responses[i] = response
+            if keys[i] is not None:
+                self._put(keys[i], response)
+        return responses
+
+    def generate_stream(self, *args, **kwargs):
+        """Stream from the wrapped client (streams are not cached)."""
+        return self._client.generate_stream(*args, **kwargs)
+
+    def supports_streaming(self) -> bool:
+        return self._client.supports_streaming()
+
+    async def prewarm(self) -> None:
+        await self._client.prewarm()
+
+    async def ensure_session(self) -> None:
+        await self._client.ensure_session()
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def get_model_name(self) -> str:
+        return self._client.get_model_name()
@@ -4,18 +4,41 @@ Provides a pluggable interface for Language Model integrations.
 """
 
 import asyncio
+import importlib.util
+import json
 import os
+import random
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Union
 from enum import Enum
 
 from src.config import settings
 from src.utils.logger import get_logger
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = get_logger("documind.llm_client")
 
 
+def _json_loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON response body (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(payload: Any) -> bytes:
+    """Encode a JSON request body (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
 class LLMProvider(str, Enum):
     """Supported LLM providers."""
     HUGGINGFACE = "huggingface"
@@ -33,6 +56,7 @@ class LLMResponse:
     tokens_used: Optional[int] = None
     finish_reason: Optional[str] = None
     raw_response: Optional[Dict[str, Any]] = None
+    cached_tokens: Optional[int] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -41,7 +65,8 @@ class LLMResponse:
             "model": self.model,
             "provider": self.provider,
             "tokens_used": self.tokens_used,
-            "finish_reason": self.finish_reason
+            "finish_reason": self.finish_reason,
+            "cached_tokens": self.cached_tokens
         }
 
 
@@ -50,9 +75,121 @@ class LLMClientError(Exception):
     pass
 
 
+# Whether the h2 package is installed; checked on first use
+_HTTP2_AVAILABLE: Optional[bool] = None
+
+
+def _http2_available() -> bool:
+    """Check whether httpx can speak HTTP/2 (the h2 package is installed)."""
+    global _HTTP2_AVAILABLE
+    if _HTTP2_AVAILABLE is None:
+        _HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+        if not _HTTP2_AVAILABLE:
+            logger.warning("h2 not installed; LLM clients will use HTTP/1.1")
+    return _HTTP2_AVAILABLE
+
+
 class BaseLLMClient(ABC):
     """Abstract base class for LLM clients."""
     
+    # Request timeout in seconds for the pooled HTTP client
+    timeout: float = 60.0
+    
+    # Connection pool limits for the pooled HTTP client
+    HTTP_MAX_CONNECTIONS = 64
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 16
+    HTTP_KEEPALIVE_EXPIRY = 60.0
+    
+    # Negotiate HTTP/2 so concurrent requests to one host share a
+    # connection; needs the h2 package (httpx[http2])
+    http2: bool = False
+    
+    # Full-jitter retry backoff: attempt n sleeps a uniform random time
+    # up to min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2**n) seconds
+    RETRY_BACKOFF_BASE = 1.0
+    RETRY_BACKOFF_CAP = 30.0
+    
+    _http_client = None
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before retrying after a failed attempt.
+        
+        The delay is drawn at random so concurrent callers that failed
+        together (e.g. on a provider-wide 429) do not retry in lockstep.
+        
+        Args:
+            attempt: Zero-based number of the attempt that failed
+            
+        Returns:
+            Delay in seconds
+        """
+        return random.uniform(
+            0, min(self.RETRY_BACKOFF_CAP, self.RETRY_BACKOFF_BASE * 2 ** attempt)
+        )
+    
+    def _retry_delay(self, response, attempt: int) -> float:
+        """
+        Seconds to wait before retrying a throttled request.
+        
+        Uses the server's Retry-After header (in seconds) when present,
+        capped at RETRY_BACKOFF_CAP, and the jittered backoff otherwise.
+        
+        Args:
+            response: The throttled httpx response
+            attempt: Zero-based number of the attempt that failed
+            
+        Returns:
+            Delay in seconds
+        """
+        try:
+            retry_after = float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            return self._backoff_delay(attempt)
+        return min(max(retry_after, 0.0), self.RETRY_BACKOFF_CAP)
+    
+    def _get_http_client(self):
+        """
+        Get this client's pooled httpx.AsyncClient, creating it on first use.
+        
+        Reusing one client keeps connections to the backend alive across
+        requests instead of paying a TCP (and TLS) handshake per call.
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            import httpx
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers=self._default_headers(),
+                http2=self.http2 and _http2_available(),
+                limits=httpx.Limits(
+                    max_connections=self.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=self.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=self.HTTP_KEEPALIVE_EXPIRY
+                )
+            )
+        return self._http_client
+    
+    def _default_headers(self) -> Dict[str, str]:
+        """Headers sent with every request of the pooled HTTP client."""
+        return {"Content-Type": "application/json"}
+    
+    async def ensure_session(self) -> None:
+        """Create the pooled HTTP client if it does not exist yet."""
+        self._get_http_client()
+    
+    async def close(self) -> None:
+        """Close the pooled HTTP client and its connections."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    async def __aenter__(self) -> "BaseLLMClient":
+        await self.ensure_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+    
     @abstractmethod
     async def generate(
         self,
@@ -64,6 +201,10 @@ class BaseLLMClient(ABC):
         """
         Generate a response from the LLM.
         
+        Callers may pass cached_prefix: a leading part of the prompt that
+        is byte-identical across requests (e.g. the system prompt), so
+        providers with prompt caching can reuse its prefill.
+        
         Args:
             prompt: The input prompt
             max_tokens: Maximum tokens to generate
@@ -83,6 +224,68 @@ class BaseLLMClient(ABC):
     def supports_streaming(self) -> bool:
         """Check if this client supports streaming. Override in subclasses."""
         return False
+    
+    @staticmethod
+    def _split_prefix(prompt: str, cached_prefix: Optional[str]) -> Tuple[str, str]:
+        """
+        Split a prompt into its static prefix and the per-request remainder.
+        
+        Args:
+            prompt: The full prompt
+            cached_prefix: Expected static prefix of the prompt
+            
+        Returns:
+            Tuple of (prefix, remainder); the prefix is empty if the prompt
+            does not start with cached_prefix
+        """
+        if cached_prefix and prompt.startswith(cached_prefix):
+            return cached_prefix, prompt[len(cached_prefix):].lstrip("\n")
+        return "", prompt
+    
+    async def prewarm(self) -> None:
+        """
+        Prepare the backend for an upcoming request (e.g. load the model).
+        
+        Called concurrently with retrieval; must not raise. No-op by default.
+        """
+        return None
+    
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> List[LLMResponse]:
+        """
+        Generate responses for several prompts.
+        
+        Issues the requests concurrently by default, at most
+        settings.LLM_CONCURRENCY at a time so a large batch does not trip
+        provider rate limits; override in clients whose backend accepts
+        several prompts in one request.
+        
+        Args:
+            prompts: Input prompts
+            max_tokens: Maximum tokens to generate per prompt
+            temperature: Sampling temperature (0-1)
+            **kwargs: Additional provider-specific parameters
+            
+        Returns:
+            LLMResponse objects, in prompt order
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.LLM_CONCURRENCY))
+        
+        async def bounded(prompt: str) -> LLMResponse:
+            async with semaphore:
+                return await self.generate(
+                    prompt=prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **kwargs
+                )
+        
+        return list(await asyncio.gather(*[bounded(prompt) for prompt in prompts]))
 
 
 class MockLLMClient(BaseLLMClient):
@@ -91,8 +294,30 @@ class MockLLMClient(BaseLLMClient):
     Returns predefined responses without making external API calls.
     """
     
-    def __init__(self, model_name: str = "mock-llm"):
+    # Prompt markers of a question, and the canned answers with and without one
+    QUERY_MARKERS = ("Question:", "Query:")
+    ANSWER_WITH_QUERY = (
+        "Based on the code context provided, here is my analysis:\n\n"
+        "The code appears to implement a specific functionality. "
+        "Key points:\n"
+        "1. The implementation follows standard patterns\n"
+        "2. Error handling is present\n"
+        "3. The code is well-structured\n\n"
+        "**Note:** This is a mock response for testing purposes."
+    )
+    ANSWER_WITHOUT_QUERY = "Mock LLM response for testing. No specific query detected."
+    
+    def __init__(self, model_name: str = "mock-llm", delay: Optional[float] = None):
+        """
+        Initialize the mock client.
+        
+        Args:
+            model_name: Model name to report
+            delay: Simulated latency per call in seconds (defaults to
+                   settings.MOCK_LLM_DELAY)
+        """
         self.model_name = model_name
+        self.delay = settings.MOCK_LLM_DELAY if delay is None else delay
         logger.info(f"Initialized MockLLMClient with model: {model_name}")
     
     async def generate(
@@ -103,8 +328,9 @@ class MockLLMClient(BaseLLMClient):
         **kwargs
     ) -> LLMResponse:
         """Generate a mock response."""
-        # Simulate some processing delay
-        await asyncio.sleep(0.1)
+        # Simulate processing delay only when configured
+        if self.delay:
+            await asyncio.sleep(self.delay)
         
         # Generate a simple mock response based on prompt content
         mock_content = self._generate_mock_content(prompt)
@@ -119,18 +345,9 @@ class MockLLMClient(BaseLLMClient):
     
     def _generate_mock_content(self, prompt: str) -> str:
         """Generate mock content based on prompt."""
-        # Extract query if present in prompt
-        if "Question:" in prompt or "Query:" in prompt:
-            return (
-                "Based on the code context provided, here is my analysis:\n\n"
-                "The code appears to implement a specific functionality. "
-                "Key points:\n"
-                "1. The implementation follows standard patterns\n"
-                "2. Error handling is present\n"
-                "3. The code is well-structured\n\n"
-                "**Note:** This is a mock response for testing purposes."
-            )
-        return "Mock LLM response for testing. No specific query detected."
+        if any(marker in prompt for marker in self.QUERY_MARKERS):
+            return self.ANSWER_WITH_QUERY
+        return self.ANSWER_WITHOUT_QUERY
     
     def get_model_name(self) -> str:
         return self.model_name
@@ -150,7 +367,8 @@ class HuggingFaceLLMClient(BaseLLMClient):
         api_key: Optional[str] = None,
         model_name: Optional[str] = None,
         timeout: float = 60.0,
-        max_retries: int = 3
+        max_retries: int = 3,
+        http2: bool = True
     ):
         """
         Initialize the Hugging Face LLM client.
@@ -160,12 +378,16 @@ class HuggingFaceLLMClient(BaseLLMClient):
             model_name: Model to use (defaults to HF_LLM_MODEL env var)
             timeout: Request timeout in seconds
             max_retries: Number of retry attempts
+            http2: Use HTTP/2 when the server supports it (disable for
+                   HTTP/1.1-only servers)
         """
         self.api_key = api_key or os.getenv("HF_API_KEY", settings.HF_API_KEY)
         self.model_name = model_name or os.getenv("HF_LLM_MODEL", self.DEFAULT_MODEL)
         self.timeout = timeout
         self.max_retries = max_retries
+        self.http2 = http2
         self.base_url = "https://api-inference.huggingface.co/models"
+        self._url = f"{self.base_url}/{self.model_name}"
         
         if not self.api_key:
             logger.warning("No HF_API_KEY provided, HuggingFace client may fail")
@@ -194,22 +416,55 @@ class HuggingFaceLLMClient(BaseLLMClient):
         Raises:
             LLMClientError: If generation fails after retries
         """
-        # Import httpx lazily to avoid startup overhead
-        try:
-            import httpx
-        except ImportError:
+        result = await self._post(
+            self._build_payload(prompt, max_tokens, temperature, **kwargs)
+        )
+        return self._parse_response(result)
+    
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> List[LLMResponse]:
+        """
+        Generate responses for several prompts in one Inference API request.
+        
+        Args:
+            prompts: Input prompts
+            max_tokens: Maximum new tokens to generate per prompt
+            temperature: Sampling temperature
+            **kwargs: Additional parameters
+            
+        Returns:
+            LLMResponse objects, in prompt order
+            
+        Raises:
+            LLMClientError: If generation fails after retries
+        """
+        result = await self._post(
+            self._build_payload(prompts, max_tokens, temperature, **kwargs)
+        )
+        if not isinstance(result, list) or len(result) != len(prompts):
             raise LLMClientError(
-                "httpx not installed. Install with: pip install httpx"
+                f"HF API returned {len(result) if isinstance(result, list) else 'no'} "
+                f"results for {len(prompts)} prompts"
             )
-        
-        url = f"{self.base_url}/{self.model_name}"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "inputs": prompt,
+        return [self._parse_response(item) for item in result]
+    
+    def _build_payload(
+        self,
+        inputs: Any,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build a text-generation payload for one prompt or a list of prompts."""
+        # The Inference API has no prompt caching; the prompt is sent whole
+        kwargs.pop("cached_prefix", None)
+        return {
+            "inputs": inputs,
             "parameters": {
                 "max_new_tokens": max_tokens,
                 "temperature": temperature,
@@ -218,53 +473,87 @@ class HuggingFaceLLMClient(BaseLLMClient):
                 **kwargs
             }
         }
+    
+    async def _post(self, payload: Dict[str, Any]) -> Any:
+        """
+        POST a payload to the model endpoint, retrying transient failures.
+        
+        Args:
+            payload: Request payload
+            
+        Returns:
+            Decoded JSON response
+            
+        Raises:
+            LLMClientError: If the request fails after retries
+        """
+        # Import httpx lazily to avoid startup overhead
+        try:
+            import httpx
+        except ImportError:
+            raise LLMClientError(
+                "httpx not installed. Install with: pip install httpx"
+            )
         
         last_error = None
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.post(url, json=payload, headers=headers)
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        return self._parse_response(result)
-                    
-                    elif response.status_code == 503:
-                        # Model loading - wait and retry
-                        error_data = response.json()
-                        wait_time = error_data.get("estimated_time", 20)
-                        logger.warning(
-                            f"Model loading, waiting {wait_time}s (attempt {attempt + 1})"
-                        )
-                        await asyncio.sleep(min(wait_time, 30))
-                        continue
-                    
-                    elif response.status_code == 429:
-                        # Rate limited - exponential backoff
-                        wait_time = (2 ** attempt) + 1
-                        logger.warning(f"Rate limited, waiting {wait_time}s")
-                        await asyncio.sleep(wait_time)
-                        continue
-                    
-                    else:
-                        error_text = response.text
-                        logger.error(f"HF API error {response.status_code}: {error_text}")
-                        raise LLMClientError(
-                            f"HF API error: {response.status_code} - {error_text}"
-                        )
+                client = self._get_http_client()
+                response = await client.post(self._url, content=_json_dumps(payload))
+                
+                if response.status_code == 200:
+                    return _json_loads(response.content)
+                
+                elif response.status_code == 503:
+                    # Model loading - wait and retry (gateways may send a
+                    # non-JSON 503 body; fall back to the default wait)
+                    try:
+                        error_data = _json_loads(response.content)
+                    except json.JSONDecodeError:
+                        error_data = None
+                    if not isinstance(error_data, dict):
+                        error_data = {}
+                    wait_time = min(error_data.get("estimated_time", 20), 30)
+                    wait_time += random.uniform(0, 2)
+                    logger.warning(
+                        f"Model loading, waiting {wait_time:.1f}s (attempt {attempt + 1})"
+                    )
+                    await asyncio.sleep(wait_time)
+                    continue
+                
+                elif response.status_code == 429:
+                    # Rate limited - honor Retry-After, else jittered backoff
+                    wait_time = self._retry_delay(response, attempt)
+                    logger.warning(f"Rate limited, waiting {wait_time:.1f}s")
+                    await asyncio.sleep(wait_time)
+                    continue
+                
+                else:
+                    error_text = response.content.decode("utf-8", errors="replace")
+                    logger.error(f"HF API error {response.status_code}: {error_text}")
+                    raise LLMClientError(
+                        f"HF API error: {response.status_code} - {error_text}"
+                    )
                         
             except httpx.TimeoutException:
                 last_error = LLMClientError(f"Request timeout after {self.timeout}s")
                 logger.warning(f"Timeout on attempt {attempt + 1}")
-                await asyncio.sleep(2 ** attempt)
+                await asyncio.sleep(self._backoff_delay(attempt))
                 
             except httpx.RequestError as e:
                 last_error = LLMClientError(f"Request error: {str(e)}")
                 logger.warning(f"Request error on attempt {attempt + 1}: {e}")
-                await asyncio.sleep(2 ** attempt)
+                await asyncio.sleep(self._backoff_delay(attempt))
         
         raise last_error or LLMClientError("Failed after all retries")
     
+    def _default_headers(self) -> Dict[str, str]:
+        """Request headers for the API."""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
     def _parse_response(self, result: Any) -> LLMResponse:
         """Parse the HF API response."""
         if isinstance(result, list) and len(result) > 0:
@@ -283,6 +572,78 @@ class HuggingFaceLLMClient(BaseLLMClient):
             raw_response=result if isinstance(result, dict) else {"result": result}
         )
     
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        **kwargs
+    ):
+        """
+        Stream a response from the Inference API token by token.
+        
+        Text-generation endpoints send server-sent events, one generated
+        token per "data:" line.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum new tokens to generate
+            temperature: Sampling temperature
+            **kwargs: Additional parameters
+            
+        Yields:
+            str: Individual tokens as they are generated
+            
+        Raises:
+            LLMClientError: If generation fails
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise LLMClientError(
+                "httpx not installed. Install with: pip install httpx"
+            )
+        
+        payload = self._build_payload(prompt, max_tokens, temperature, **kwargs)
+        payload["stream"] = True
+        
+        try:
+            client = self._get_http_client()
+            async with client.stream(
+                "POST", self._url, content=_json_dumps(payload)
+            ) as response:
+                if response.status_code != 200:
+                    error_text = await response.aread()
+                    raise LLMClientError(
+                        f"HF API error: {response.status_code} - {error_text.decode()}"
+                    )
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    
+                    try:
+                        chunk = _json_loads(line[5:].strip())
+                    except json.JSONDecodeError:
+                        logger.warning(f"Failed to parse streaming chunk: {line}")
+                        continue
+                    
+                    if "error" in chunk:
+                        raise LLMClientError(f"HF API error: {chunk['error']}")
+                    
+                    token = chunk.get("token") or {}
+                    if token.get("text") and not token.get("special"):
+                        yield token["text"]
+        
+        except httpx.TimeoutException:
+            raise LLMClientError(f"Streaming timeout after {self.timeout}s")
+        except httpx.RequestError as e:
+            raise LLMClientError(f"Streaming request error: {str(e)}")
+    
+    def supports_streaming(self) -> bool:
+        """Check if this client supports streaming."""
+        return True
+    
     def get_model_name(self) -> str:
         return self.model_name
 
@@ -321,6 +682,8 @@ class OllamaLLMClient(BaseLLMClient):
         
         # Remove trailing slash if present
         self.base_url = self.base_url.rstrip("/")
+        self._url = f"{self.base_url}/api/generate"
+        self._warmed = False
         
         logger.info(f"Initialized OllamaLLMClient: {self.base_url} with model: {self.model_name}")
     
@@ -338,29 +701,29 @@ class OllamaLLMClient(BaseLLMClient):
             return False
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                # Check server is running
-                response = await client.get(f"{self.base_url}/api/tags")
-                if response.status_code != 200:
-                    logger.error(f"Ollama server not responding: {response.status_code}")
-                    return False
-                
-                # Check if model exists
-                models_data = response.json()
-                models = [m.get("name", "") for m in models_data.get("models", [])]
-                
-                # Match model name (with or without :latest tag)
-                model_found = any(
-                    self.model_name in m or m.startswith(self.model_name.split(":")[0])
-                    for m in models
-                )
-                
-                if not model_found:
-                    logger.warning(f"Model '{self.model_name}' not found. Available: {models}")
-                    return False
-                
-                logger.info(f"Ollama connectivity verified. Model '{self.model_name}' available.")
-                return True
+            client = self._get_http_client()
+            # Check server is running
+            response = await client.get(f"{self.base_url}/api/tags", timeout=10.0)
+            if response.status_code != 200:
+                logger.error(f"Ollama server not responding: {response.status_code}")
+                return False
+            
+            # Check if model exists
+            models_data = response.json()
+            models = [m.get("name", "") for m in models_data.get("models", [])]
+            
+            # Match model name (with or without :latest tag)
+            model_found = any(
+                self.model_name in m or m.startswith(self.model_name.split(":")[0])
+                for m in models
+            )
+            
+            if not model_found:
+                logger.warning(f"Model '{self.model_name}' not found. Available: {models}")
+                return False
+            
+            logger.info(f"Ollama connectivity verified. Model '{self.model_name}' available.")
+            return True
                 
         except httpx.ConnectError:
             logger.error(f"Cannot connect to Ollama at {self.base_url}")
@@ -369,6 +732,28 @@ class OllamaLLMClient(BaseLLMClient):
             logger.error(f"Ollama connectivity check failed: {e}")
             return False
     
+    async def prewarm(self) -> None:
+        """
+        Ask Ollama to load the model into memory.
+        
+        A generate request without a prompt only loads the model, so the
+        first real request does not pay the model load time. Runs once per
+        client; failures are logged and ignored.
+        """
+        if self._warmed:
+            return
+        
+        try:
+            import httpx
+            client = self._get_http_client()
+            response = await client.post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model_name}
+            )
+            self._warmed = response.status_code == 200
+        except Exception as e:
+            logger.debug(f"Ollama prewarm failed: {e}")
+    
     async def generate(
         self,
         prompt: str,
@@ -398,8 +783,6 @@ class OllamaLLMClient(BaseLLMClient):
                 "httpx not installed. Install with: pip install httpx"
             )
         
-        url = f"{self.base_url}/api/generate"
-        
         # Adaptive token limits based on request
         # - Short docs (README): cap at 256 for speed
         # - Long docs (DETAILED): allow up to 32K for ultra-long enterprise output
@@ -425,41 +808,41 @@ class OllamaLLMClient(BaseLLMClient):
         last_error = None
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.post(url, json=payload)
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        return self._parse_response(result)
-                    
-                    elif response.status_code == 404:
-                        raise LLMClientError(
-                            f"Model '{self.model_name}' not found. Pull it with: ollama pull {self.model_name}"
-                        )
-                    
-                    else:
-                        error_text = response.text
-                        logger.error(f"Ollama API error {response.status_code}: {error_text}")
-                        raise LLMClientError(
-                            f"Ollama error: {response.status_code} - {error_text}"
-                        )
+                client = self._get_http_client()
+                response = await client.post(self._url, content=_json_dumps(payload))
+                
+                if response.status_code == 200:
+                    result = _json_loads(response.content)
+                    return self._parse_response(result)
+                
+                elif response.status_code == 404:
+                    raise LLMClientError(
+                        f"Model '{self.model_name}' not found. Pull it with: ollama pull {self.model_name}"
+                    )
+                
+                else:
+                    error_text = response.content.decode("utf-8", errors="replace")
+                    logger.error(f"Ollama API error {response.status_code}: {error_text}")
+                    raise LLMClientError(
+                        f"Ollama error: {response.status_code} - {error_text}"
+                    )
                         
             except httpx.ConnectError:
                 last_error = LLMClientError(
                     f"Cannot connect to Ollama at {self.base_url}. Is Ollama running?"
                 )
                 logger.warning(f"Connection failed on attempt {attempt + 1}")
-                await asyncio.sleep(2 ** attempt)
+                await asyncio.sleep(self._backoff_delay(attempt))
                 
             except httpx.TimeoutException:
                 last_error = LLMClientError(f"Request timeout after {self.timeout}s")
                 logger.warning(f"Timeout on attempt {attempt + 1}")
-                await asyncio.sleep(2 ** attempt)
+                await asyncio.sleep(self._backoff_delay(attempt))
                 
             except httpx.RequestError as e:
                 last_error = LLMClientError(f"Request error: {str(e)}")
                 logger.warning(f"Request error on attempt {attempt + 1}: {e}")
-                await asyncio.sleep(2 ** attempt)
+                await asyncio.sleep(self._backoff_delay(attempt))
         
         raise last_error or LLMClientError("Failed after all retries")
     
@@ -512,7 +895,8 @@ class OllamaLLMClient(BaseLLMClient):
                 "httpx not installed. Install with: pip install httpx"
             )
         
-        url = f"{self.base_url}/api/generate"
+        # Ollama reuses the KV cache of a matching prompt prefix on its own
+        kwargs.pop("cached_prefix", None)
         
         payload = {
             "model": self.model_name,
@@ -526,34 +910,34 @@ class OllamaLLMClient(BaseLLMClient):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                async with client.stream("POST", url, json=payload) as response:
-                    if response.status_code != 200:
-                        error_text = await response.aread()
-                        raise LLMClientError(
-                            f"Ollama error: {response.status_code} - {error_text.decode()}"
-                        )
+            client = self._get_http_client()
+            async with client.stream("POST", self._url, content=_json_dumps(payload)) as response:
+                if response.status_code != 200:
+                    error_text = await response.aread()
+                    raise LLMClientError(
+                        f"Ollama error: {response.status_code} - {error_text.decode()}"
+                    )
+                
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
                     
-                    async for line in response.aiter_lines():
-                        if not line:
-                            continue
+                    try:
+                        import json
+                        chunk = _json_loads(line)
                         
-                        try:
-                            import json
-                            chunk = json.loads(line)
-                            
-                            # Yield the response token
-                            token = chunk.get("response", "")
-                            if token:
-                                yield token
+                        # Yield the response token
+                        token = chunk.get("response", "")
+                        if token:
+                            yield token
+                        
+                        # Check if done
+                        if chunk.get("done", False):
+                            break
                             
-                            # Check if done
-                            if chunk.get("done", False):
-                                break
-                                
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse streaming chunk: {line}")
-                            continue
+                    except json.JSONDecodeError:
+                        logger.warning(f"Failed to parse streaming chunk: {line}")
+                        continue
                             
         except httpx.ConnectError:
             raise LLMClientError(
@@ -586,7 +970,8 @@ class OpenAICompatibleClient(BaseLLMClient):
         model_name: Optional[str] = None,
         base_url: Optional[str] = None,
         timeout: float = 60.0,
-        max_retries: int = 3
+        max_retries: int = 3,
+        http2: bool = True
     ):
         """
         Initialize the OpenAI-compatible client.
@@ -597,6 +982,8 @@ class OpenAICompatibleClient(BaseLLMClient):
             base_url: API base URL (defaults to OpenAI)
             timeout: Request timeout in seconds
             max_retries: Number of retry attempts
+            http2: Use HTTP/2 when the server supports it (disable for
+                   HTTP/1.1-only servers)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY", settings.OPENAI_API_KEY)
         self.model_name = model_name or os.getenv("OPENAI_MODEL", self.DEFAULT_MODEL)
@@ -605,6 +992,8 @@ class OpenAICompatibleClient(BaseLLMClient):
         )
         self.timeout = timeout
         self.max_retries = max_retries
+        self.http2 = http2
+        self._url = f"{self.base_url}/chat/completions"
         
         if not self.api_key:
             logger.warning("No OPENAI_API_KEY provided")
@@ -637,60 +1026,149 @@ class OpenAICompatibleClient(BaseLLMClient):
                 "httpx not installed. Install with: pip install httpx"
             )
         
-        url = f"{self.base_url}/chat/completions"
-        headers = {
+        payload = self._build_payload(prompt, max_tokens, temperature, **kwargs)
+        
+        last_error = None
+        for attempt in range(self.max_retries):
+            try:
+                client = self._get_http_client()
+                response = await client.post(self._url, content=_json_dumps(payload))
+                
+                if response.status_code == 200:
+                    result = _json_loads(response.content)
+                    return self._parse_response(result)
+                
+                elif response.status_code == 429:
+                    wait_time = self._retry_delay(response, attempt)
+                    logger.warning(f"Rate limited, waiting {wait_time:.1f}s")
+                    await asyncio.sleep(wait_time)
+                    continue
+                
+                else:
+                    error_text = response.content.decode("utf-8", errors="replace")
+                    logger.error(f"OpenAI API error {response.status_code}: {error_text}")
+                    raise LLMClientError(
+                        f"OpenAI API error: {response.status_code} - {error_text}"
+                    )
+                        
+            except httpx.TimeoutException:
+                last_error = LLMClientError(f"Request timeout after {self.timeout}s")
+                logger.warning(f"Timeout on attempt {attempt + 1}")
+                await asyncio.sleep(self._backoff_delay(attempt))
+                
+            except httpx.RequestError as e:
+                last_error = LLMClientError(f"Request error: {str(e)}")
+                logger.warning(f"Request error on attempt {attempt + 1}: {e}")
+                await asyncio.sleep(self._backoff_delay(attempt))
+        
+        raise last_error or LLMClientError("Failed after all retries")
+    
+    def _default_headers(self) -> Dict[str, str]:
+        """Request headers for the API."""
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
-        
-        # Build messages
+    
+    def _build_payload(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build a chat completions payload for one prompt."""
+        # Build messages; a static prefix goes first as the system message
+        # so the provider's automatic prompt caching can reuse it
         messages = []
+        prefix, user_prompt = self._split_prefix(prompt, kwargs.pop("cached_prefix", None))
         if "system_prompt" in kwargs:
             messages.append({"role": "system", "content": kwargs.pop("system_prompt")})
-        messages.append({"role": "user", "content": prompt})
+            user_prompt = prompt
+        elif prefix:
+            messages.append({"role": "system", "content": prefix})
+        messages.append({"role": "user", "content": user_prompt})
         
-        payload = {
+        return {
             "model": self.model_name,
             "messages": messages,
             "max_tokens": max_tokens,
             "temperature": temperature,
-            **{k: v for k, v in kwargs.items() if k not in ["system_prompt"]}
+            **kwargs
         }
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        **kwargs
+    ):
+        """
+        Generate a streaming response using the chat completions API.
         
-        last_error = None
-        for attempt in range(self.max_retries):
-            try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.post(url, json=payload, headers=headers)
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        return self._parse_response(result)
+        Reads the server-sent events of a stream=True request and yields
+        content deltas as they arrive.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            **kwargs: Additional parameters (system_prompt, etc.)
+            
+        Yields:
+            str: Content deltas as they are generated
+            
+        Raises:
+            LLMClientError: If generation fails
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise LLMClientError(
+                "httpx not installed. Install with: pip install httpx"
+            )
+        
+        payload = self._build_payload(prompt, max_tokens, temperature, **kwargs)
+        payload["stream"] = True
+        
+        try:
+            client = self._get_http_client()
+            async with client.stream(
+                "POST", self._url, content=_json_dumps(payload)
+            ) as response:
+                if response.status_code != 200:
+                    error_text = await response.aread()
+                    raise LLMClientError(
+                        f"OpenAI API error: {response.status_code} - {error_text.decode()}"
+                    )
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
                     
-                    elif response.status_code == 429:
-                        wait_time = (2 ** attempt) + 1
-                        logger.warning(f"Rate limited, waiting {wait_time}s")
-                        await asyncio.sleep(wait_time)
+                    try:
+                        chunk = _json_loads(data)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Failed to parse streaming chunk: {line}")
                         continue
                     
-                    else:
-                        error_text = response.text
-                        logger.error(f"OpenAI API error {response.status_code}: {error_text}")
-                        raise LLMClientError(
-                            f"OpenAI API error: {response.status_code} - {error_text}"
-                        )
-                        
-            except httpx.TimeoutException:
-                last_error = LLMClientError(f"Request timeout after {self.timeout}s")
-                logger.warning(f"Timeout on attempt {attempt + 1}")
-                await asyncio.sleep(2 ** attempt)
-                
-            except httpx.RequestError as e:
-                last_error = LLMClientError(f"Request error: {str(e)}")
-                logger.warning(f"Request error on attempt {attempt + 1}: {e}")
-                await asyncio.sleep(2 ** attempt)
-        
-        raise last_error or LLMClientError("Failed after all retries")
+                    for choice in chunk.get("choices", []):
+                        token = (choice.get("delta") or {}).get("content")
+                        if token:
+                            yield token
+                            
+        except httpx.TimeoutException:
+            raise LLMClientError(f"Streaming timeout after {self.timeout}s")
+        except httpx.RequestError as e:
+            raise LLMClientError(f"Streaming request error: {str(e)}")
+    
+    def supports_streaming(self) -> bool:
+        """Check if this client supports streaming."""
+        return True
     
     def _parse_response(self, result: Dict[str, Any]) -> LLMResponse:
         """Parse the OpenAI API response."""
@@ -700,6 +1178,12 @@ class OpenAICompatibleClient(BaseLLMClient):
         
         usage = result.get("usage", {})
         total_tokens = usage.get("total_tokens")
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+        if cached_tokens:
+            logger.debug(
+                "Prompt cache hit: %d of %s prompt tokens",
+                cached_tokens, usage.get("prompt_tokens")
+            )
         
         return LLMResponse(
             content=content.strip(),
@@ -707,17 +1191,171 @@ class OpenAICompatibleClient(BaseLLMClient):
             provider="openai",
             tokens_used=total_tokens,
             finish_reason=choice.get("finish_reason"),
-            raw_response=result
+            raw_response=result,
+            cached_tokens=cached_tokens
         )
     
     def get_model_name(self) -> str:
         return self.model_name
 
 
+class BatchedLLMClient(BaseLLMClient):
+    """
+    Micro-batching wrapper around another LLM client.
+    
+    Concurrent generate() calls with the same sampling parameters are
+    collected for up to max_wait_ms (or until max_batch are pending) and
+    sent through the wrapped client's generate_batch() as one request.
+    Calls with extra provider parameters (other than cached_prefix)
+    bypass batching.
+    """
+    
+    def __init__(
+        self,
+        client: BaseLLMClient,
+        max_batch: int = 16,
+        max_wait_ms: float = 10.0
+    ):
+        """
+        Initialize the batching wrapper.
+        
+        Args:
+            client: LLM client to send batches through
+            max_batch: Maximum prompts per batch
+            max_wait_ms: Maximum time a call waits for a batch to fill
+        """
+        self._client = client
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        # (max_tokens, temperature, cached_prefix) -> pending (prompt, future) pairs
+        self._pending: Dict[Tuple[int, float, Optional[str]], List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[int, float, Optional[str]], asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+        
+        logger.info(
+            f"Batching LLM requests for {client.get_model_name()}: "
+            f"max_batch={max_batch}, max_wait_ms={max_wait_ms}"
+        )
+    
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> LLMResponse:
+        """Queue the prompt for the next batch and wait for its response."""
+        if kwargs.keys() - {"cached_prefix"}:
+            return await self._client.generate(
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+        
+        loop = asyncio.get_running_loop()
+        key = (max_tokens, temperature, kwargs.get("cached_prefix"))
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((prompt, future))
+        
+        if len(pending) >= self.max_batch:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        
+        return await future
+    
+    def _flush(self, key: Tuple[int, float, Optional[str]]) -> None:
+        """Send the pending batch for a parameter set."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        
+        task = asyncio.ensure_future(self._run_batch(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run_batch(
+        self,
+        key: Tuple[int, float, Optional[str]],
+        batch: List[Tuple[str, asyncio.Future]]
+    ) -> None:
+        """
+        Generate a batch and resolve each caller's future.
+        
+        Identical prompts that arrive in the same window are sent once and
+        share the response, like semantic-cache hits do.
+        """
+        max_tokens, temperature, cached_prefix = key
+        # Distinct prompts in arrival order -> their position in the request
+        slots: Dict[str, int] = {}
+        for prompt, _ in batch:
+            slots.setdefault(prompt, len(slots))
+        try:
+            responses = await self._client.generate_batch(
+                list(slots),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                cached_prefix=cached_prefix
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for prompt, future in batch:
+            if not future.done():
+                future.set_result(responses[slots[prompt]])
+    
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> List[LLMResponse]:
+        """Pass explicit batches straight to the wrapped client."""
+        return await self._client.generate_batch(
+            prompts,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+    
+    def generate_stream(self, *args, **kwargs):
+        """Stream from the wrapped client (streams are not batched)."""
+        return self._client.generate_stream(*args, **kwargs)
+    
+    def supports_streaming(self) -> bool:
+        return self._client.supports_streaming()
+    
+    async def prewarm(self) -> None:
+        await self._client.prewarm()
+    
+    async def ensure_session(self) -> None:
+        await self._client.ensure_session()
+    
+    async def close(self) -> None:
+        await self._client.close()
+    
+    def get_model_name(self) -> str:
+        return self._client.get_model_name()
+
+
 # =============================================================================
 # Factory function for creating LLM clients
 # =============================================================================
 
+# Clients built by get_llm_client, keyed by (provider, constructor arguments)
+_llm_clients: Dict[Tuple[str, Tuple], BaseLLMClient] = {}
+_llm_clients_lock = threading.Lock()
+
+
 def get_llm_client(
     provider: Optional[str] = None,
     **kwargs
@@ -725,14 +1363,49 @@ def get_llm_client(
     """
     Factory function to get an LLM client instance.
     
+    Clients are shared: calls with the same provider and constructor
+    arguments return the same instance, so its pooled HTTP connections are
+    reused (thread-safe). Calls with unhashable arguments get a new client.
+    
     Args:
         provider: LLM provider name ("ollama", "huggingface", "openai", "mock")
                   Defaults to settings.LLM_PROVIDER or "mock"
         **kwargs: Additional arguments for the client constructor
         
     Returns:
-        Configured LLM client instance
+        Configured LLM client instance, wrapped in a CachedLLMClient when
+        LLM_CACHE_ENABLED is set
     """
+    provider = (provider or settings.LLM_PROVIDER or "mock").lower()
+    key = (provider, tuple(sorted(kwargs.items())))
+    try:
+        client = _llm_clients.get(key)
+    except TypeError:
+        return _build_llm_client(provider, **kwargs)
+    if client is None:
+        with _llm_clients_lock:
+            client = _llm_clients.get(key)
+            if client is None:
+                client = _build_llm_client(provider, **kwargs)
+                _llm_clients[key] = client
+    return client
+
+
+def _build_llm_client(provider: str, **kwargs) -> BaseLLMClient:
+    """Construct a client, adding the response cache when enabled."""
+    client = _create_llm_client(provider, **kwargs)
+    if settings.LLM_CACHE_ENABLED:
+        from src.generation.llm_cache import CachedLLMClient
+        client = CachedLLMClient(
+            client,
+            max_size=settings.LLM_CACHE_SIZE,
+            ttl=settings.LLM_CACHE_TTL
+        )
+    return client
+
+
+def _create_llm_client(provider: Optional[str], **kwargs) -> BaseLLMClient:
+    """Construct the client for a provider (see get_llm_client)."""
     from src.config import settings
     
     # Determine provider from settings
@@ -771,11 +1444,20 @@ def get_llm_client(
 
 # Singleton instance for convenience
 _llm_client: Optional[BaseLLMClient] = None
+_llm_client_lock = threading.Lock()
 
 
 def get_default_llm_client() -> BaseLLMClient:
-    """Get or create the default LLM client singleton."""
+    """Get or create the default LLM client singleton (thread-safe)."""
     global _llm_client
     if _llm_client is None:
-        _llm_client = get_llm_client()
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = get_llm_client()
     return _llm_client
+
+
+async def close_default_llm_client() -> None:
+    """Close the connections of every client built by get_llm_client."""
+    for client in list(_llm_clients.values()):
+        await client.close()
@@ -191,7 +191,7 @@ MODEL_CAPABILITIES: Dict[str, ModelCapabilities] = {
         max_context=8192,
         supports_tools=False,
         supports_json=JSONSupport.LIMITED,
-        supports_streaming=False,  # HF Inference API doesn't stream well
+        supports_streaming=True,  # TGI-backed; streamed as server-sent events
         preferred_chunk_size=350,
         citation_strictness=CitationStrictness.MEDIUM,
         default_temperature=0.7,
@@ -0,0 +1,184 @@
+"""
+Semantic response cache for DocuMind AI.
+Serves generation responses for repeated or paraphrased queries.
+"""
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger("documind.semantic_cache")
+
+
+@dataclass
+class _CacheEntry:
+    """A cached response and the query embedding it answers."""
+    scope: Hashable
+    query: str
+    vector: Any  # (D,) float32, L2-normalized
+    response: Any
+    created_at: float
+
+
+class SemanticCache:
+    """
+    In-process semantic cache keyed by query embedding.
+
+    A lookup matches when a cached query in the same scope (job and
+    generation parameters) has inner product >= threshold with the new
+    query; vectors are L2-normalized, so this is cosine similarity. Entries
+    expire after ttl seconds and the least recently used are evicted
+    beyond max_size.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.97,
+        ttl: float = 300.0,
+        max_size: int = 1000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            ttl: Entry lifetime in seconds
+            max_size: Maximum number of entries
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._next_id = 0
+        # (created_at, entry ID) in insertion order, which with a fixed TTL
+        # is also expiry order; IDs already evicted are skipped
+        self._expiry: Deque[Tuple[float, int]] = deque()
+        # Per-scope (entry IDs, stacked vectors), rebuilt lazily on change
+        self._scope_index: Dict[Hashable, Tuple[List[int], Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, scope: Hashable, vector) -> Optional[Any]:
+        """
+        Look up a response for a query embedding.
+
+        Args:
+            scope: Cache scope (e.g. job ID plus generation parameters)
+            vector: L2-normalized query embedding
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        if not self._entries:
+            return None
+
+        self._expire()
+        ids, matrix = self._index_for(scope)
+        if not ids:
+            return None
+
+        scores = matrix @ vector
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+
+        entry_id = ids[best]
+        self._entries.move_to_end(entry_id)
+        logger.debug(f"Semantic cache hit (similarity {scores[best]:.3f})")
+        return self._entries[entry_id].response
+
+    def put(self, scope: Hashable, query: str, vector, response: Any) -> None:
+        """
+        Store a response for a query embedding.
+
+        Args:
+            scope: Cache scope
+            query: Original query text
+            vector: L2-normalized query embedding
+            response: Response to cache
+        """
+        if self.max_size <= 0:
+            return
+
+        import numpy as np
+
+        entry_id = self._next_id
+        self._next_id += 1
+        now = time.monotonic()
+        self._entries[entry_id] = _CacheEntry(
+            scope=scope,
+            query=query,
+            vector=np.asarray(vector, dtype=np.float32),
+            response=response,
+            created_at=now
+        )
+        self._expiry.append((now, entry_id))
+        self._scope_index.pop(scope, None)
+
+        while len(self._entries) > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._scope_index.pop(evicted.scope, None)
+        # Evicted and invalidated IDs linger in the expiry queue until their
+        # TTL passes; compact it so a long TTL cannot let it grow unbounded
+        if len(self._expiry) > 2 * self.max_size:
+            self._expiry = deque(
+                item for item in self._expiry if item[1] in self._entries
+            )
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._expiry.clear()
+        self._scope_index.clear()
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Drop every entry whose scope matches a predicate.
+
+        Args:
+            predicate: Called with each scope; True drops its entries
+
+        Returns:
+            Number of entries dropped
+        """
+        dropped = [
+            entry_id for entry_id, entry in self._entries.items()
+            if predicate(entry.scope)
+        ]
+        for entry_id in dropped:
+            entry = self._entries.pop(entry_id)
+            self._scope_index.pop(entry.scope, None)
+        return len(dropped)
+
+    def _expire(self) -> None:
+        """Drop entries older than the TTL, stopping at the first live one."""
+        cutoff = time.monotonic() - self.ttl
+        while self._expiry and self._expiry[0][0] < cutoff:
+            _, entry_id = self._expiry.popleft()
+            entry = self._entries.pop(entry_id, None)
+            if entry is not None:
+                self._scope_index.pop(entry.scope, None)
+
+    def _index_for(self, scope: Hashable) -> Tuple[List[int], Any]:
+        """Get (entry IDs, (N, D) matrix) for a scope."""
+        index = self._scope_index.get(scope)
+        if index is not None:
+            return index
+
+        import numpy as np
+
+        ids = [
+            entry_id for entry_id, entry in self._entries.items()
+            if entry.scope == scope
+        ]
+        matrix = (
+            np.stack([self._entries[entry_id].vector for entry_id in ids])
+            if ids else None
+        )
+        index = (ids, matrix)
+        self._scope_index[scope] = index
+        return index
@@ -3,7 +3,8 @@ Prompt templates module for DocuMind AI.
 Defines system prompts, context injection templates, and anti-hallucination rules.
 """
 
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, replace
 from typing import List, Dict, Any, Optional
 from string import Template
 
@@ -774,11 +775,31 @@ DOC_TYPE_PROMPTS = {
 }
 
 
+# Pre-parsed templates for the per-request prompt paths
+_CONTEXT = Template(CONTEXT_TEMPLATE)
+_NO_CONTEXT = Template(NO_CONTEXT_TEMPLATE)
+_CONTEXT_SNIPPET = Template(CONTEXT_SNIPPET_TEMPLATE)
+_STRICT_RAG_SNIPPET = Template(STRICT_RAG_SNIPPET_TEMPLATE)
+_USER_TEMPLATES = {
+    template: Template(template)
+    for template in (
+        MASTER_RAG_CONTEXT_TEMPLATE,
+        STREAMING_CONTEXT_TEMPLATE,
+        STRICT_RAG_CONTEXT_TEMPLATE,
+        CONTEXT_TEMPLATE,
+    )
+}
+# Documentation prompts by doc type, parsed once per process
+DOC_TYPE_TEMPLATES = {
+    doc_type: Template(prompt) for doc_type, prompt in DOC_TYPE_PROMPTS.items()
+}
+
+
 # =============================================================================
 # Prompt Builder Classes
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CodeSnippet:
     """Represents a code snippet for prompt injection."""
     file_path: str
@@ -792,8 +813,7 @@ class CodeSnippet:
     def format(self, strict_mode: bool = False) -> str:
         """Format the snippet for prompt injection."""
         if strict_mode and self.chunk_id:
-            template = Template(STRICT_RAG_SNIPPET_TEMPLATE)
-            return template.safe_substitute(
+            return _STRICT_RAG_SNIPPET.safe_substitute(
                 chunk_id=self.chunk_id,
                 chunk_text=self.content,
                 file_path=self.file_path,
@@ -801,8 +821,7 @@ class CodeSnippet:
                 end_line=self.end_line
             )
         
-        template = Template(CONTEXT_SNIPPET_TEMPLATE)
-        return template.safe_substitute(
+        return _CONTEXT_SNIPPET.safe_substitute(
             file_path=self.file_path,
             language=self.language or "text",
             start_line=self.start_line,
@@ -832,7 +851,19 @@ class PromptBuilder:
         """
         self.system_prompt = system_prompt
         self.max_context_tokens = max_context_tokens
+    
+    def render_system_prompt(self) -> str:
+        """
+        Render the system prompt.
         
+        The system prompt is fixed for the builder's lifetime, so callers
+        may render it once and pass it to build_prompt_fast().
+        
+        Returns:
+            System prompt string
+        """
+        return self.system_prompt
+    
     def build_prompt(
         self,
         query: str,
@@ -850,22 +881,53 @@ class PromptBuilder:
         Returns:
             Formatted prompt string
         """
-        # Build context section
+        if include_system_prompt:
+            return self.build_prompt_fast(
+                query, snippets, self.render_system_prompt()
+            )
+        return self.build_user_prompt(query, snippets)
+    
+    def build_prompt_fast(
+        self,
+        query: str,
+        snippets: List[CodeSnippet],
+        system_prompt_str: str
+    ) -> str:
+        """
+        Build a complete prompt around a pre-rendered system prompt.
+        
+        Args:
+            query: The user's question
+            snippets: List of relevant code snippets
+            system_prompt_str: Output of render_system_prompt()
+            
+        Returns:
+            Formatted prompt string
+        """
+        return f"{system_prompt_str}\n\n{self.build_user_prompt(query, snippets)}"
+    
+    def build_user_prompt(
+        self,
+        query: str,
+        snippets: List[CodeSnippet]
+    ) -> str:
+        """
+        Build the user part of the prompt (context and query).
+        
+        Args:
+            query: The user's question
+            snippets: List of relevant code snippets
+            
+        Returns:
+            Formatted user prompt string
+        """
         if snippets:
             context = self._build_context_section(snippets)
-            user_prompt = Template(CONTEXT_TEMPLATE).safe_substitute(
+            return _CONTEXT.safe_substitute(
                 code_snippets=context,
                 query=query
             )
-        else:
-            user_prompt = Template(NO_CONTEXT_TEMPLATE).safe_substitute(
-                query=query
-            )
-        
-        # Combine with system prompt if requested
-        if include_system_prompt:
-            return f"{self.system_prompt}\n\n{user_prompt}"
-        return user_prompt
+        return _NO_CONTEXT.safe_substitute(query=query)
     
     def _build_context_section(self, snippets: List[CodeSnippet]) -> str:
         """Build the context section from code snippets."""
@@ -906,12 +968,12 @@ class PromptBuilder:
         # Build context section
         if snippets:
             context = self._build_context_section(snippets)
-            user_content = Template(CONTEXT_TEMPLATE).safe_substitute(
+            user_content = _CONTEXT.safe_substitute(
                 code_snippets=context,
                 query=query
             )
         else:
-            user_content = Template(NO_CONTEXT_TEMPLATE).safe_substitute(
+            user_content = _NO_CONTEXT.safe_substitute(
                 query=query
             )
         
@@ -994,30 +1056,29 @@ class AdaptivePromptBuilder(PromptBuilder):
             recommended_temperature=getattr(self.capabilities, 'recommended_temperature', 0.7)
         )
     
-    def build_prompt(
+    def build_user_prompt(
         self,
         query: str,
-        snippets: List[CodeSnippet],
-        include_system_prompt: bool = True
+        snippets: List[CodeSnippet]
     ) -> str:
         """
-        Build a prompt adapted to the model's capabilities.
+        Build a user prompt adapted to the model's capabilities.
         
         Args:
             query: The user's question
             snippets: List of relevant code snippets
-            include_system_prompt: Whether to include system prompt
             
         Returns:
-            Formatted prompt string
+            Formatted user prompt string
         """
         use_strict = self.capabilities.should_use_strict_rag() or self.use_master_prompt
         
         # Assign chunk IDs for citation if using strict mode
         if use_strict:
-            for i, snippet in enumerate(snippets):
-                if not snippet.chunk_id:
-                    snippet.chunk_id = f"chunk_{i+1}"
+            snippets = [
+                snippet if snippet.chunk_id else replace(snippet, chunk_id=f"chunk_{i+1}")
+                for i, snippet in enumerate(snippets)
+            ]
         
         # Build context section
         if snippets:
@@ -1033,19 +1094,11 @@ class AdaptivePromptBuilder(PromptBuilder):
             else:
                 template = CONTEXT_TEMPLATE
             
-            user_prompt = Template(template).safe_substitute(
+            return _USER_TEMPLATES[template].safe_substitute(
                 code_snippets=context,
                 query=query
             )
-        else:
-            user_prompt = Template(NO_CONTEXT_TEMPLATE).safe_substitute(
-                query=query
-            )
-        
-        # Combine with system prompt if requested
-        if include_system_prompt:
-            return f"{self.system_prompt}\n\n{user_prompt}"
-        return user_prompt
+        return _NO_CONTEXT.safe_substitute(query=query)
     
     def _build_context_section(
         self,
@@ -1184,11 +1237,14 @@ def get_streaming_builder(
 
 # Default prompt builder instance
 _default_builder: Optional[PromptBuilder] = None
+_default_builder_lock = threading.Lock()
 
 
 def get_default_prompt_builder() -> PromptBuilder:
-    """Get or create the default prompt builder singleton."""
+    """Get or create the default prompt builder singleton (thread-safe)."""
     global _default_builder
     if _default_builder is None:
-        _default_builder = get_prompt_builder()
+        with _default_builder_lock:
+            if _default_builder is None:
+                _default_builder = get_prompt_builder()
     return _default_builder
@@ -3,8 +3,10 @@ Retriever module for DocuMind AI.
 Combines embedding generation and vector search for RAG retrieval.
 """
 
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, asdict
+import asyncio
+import threading
+from typing import List, Optional, Dict, Any, Set
+from dataclasses import dataclass
 
 from src.config import settings
 from src.embeddings.embedding_service import EmbeddingService, get_embedding_service
@@ -16,7 +18,7 @@ from src.utils.logger import get_logger
 logger = get_logger("documind.retriever")
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievalResult:
     """Represents a retrieval result with chunk content and metadata."""
     chunk_id: str
@@ -29,7 +31,15 @@ class RetrievalResult:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        return asdict(self)
+        return {
+            "chunk_id": self.chunk_id,
+            "file_path": self.file_path,
+            "content": self.content,
+            "score": self.score,
+            "language": self.language,
+            "start_line": self.start_line,
+            "end_line": self.end_line
+        }
 
 
 class RetrieverError(Exception):
@@ -60,14 +70,52 @@ class Retriever:
         self._embedding_service = embedding_service or get_embedding_service()
         self._vector_store = vector_store or get_vector_store()
         
+        # Jobs already verified to exist with embeddings
+        self._known_jobs: Set[str] = set()
+        
         logger.info("Initialized Retriever")
     
+    async def embed_query(self, query: str):
+        """
+        Embed a query string.
+        
+        Args:
+            query: Search query string
+            
+        Returns:
+            L2-normalized float32 query vector
+            
+        Raises:
+            RetrieverError: If embedding fails
+        """
+        return (await self.embed_queries([query]))[0]
+    
+    async def embed_queries(self, queries: List[str]):
+        """
+        Embed several query strings in one embedding call.
+        
+        Args:
+            queries: Search query strings
+            
+        Returns:
+            (N, D) L2-normalized float32 query matrix
+            
+        Raises:
+            RetrieverError: If embedding fails
+        """
+        try:
+            return await self._embedding_service.generate_embeddings_ndarray(queries)
+        except Exception as e:
+            logger.error(f"Failed to generate query embedding: {e}")
+            raise RetrieverError(f"Failed to generate query embedding: {e}")
+    
     async def retrieve(
         self,
         query: str,
         job_id: str,
         top_k: int = None,
-        score_threshold: float = None
+        score_threshold: float = None,
+        query_embedding=None
     ) -> List[RetrievalResult]:
         """
         Retrieve the most relevant code chunks for a query.
@@ -77,6 +125,7 @@ class Retriever:
             job_id: Job ID to search within
             top_k: Number of results to return
             score_threshold: Minimum similarity score (0-1)
+            query_embedding: Precomputed embedding of query (from embed_query)
             
         Returns:
             List of RetrievalResult objects ranked by relevance
@@ -89,7 +138,84 @@ class Retriever:
         
         logger.info(f"Retrieving chunks for query in job {job_id}, top_k={top_k}")
         
-        # Validate job exists
+        await self._ensure_job_embedded(job_id)
+        
+        # Generate query embedding
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query)
+        
+        results = await self._search(query_embedding, job_id, top_k, threshold)
+        logger.info(f"Retrieved {len(results)} chunks for query")
+        return results
+    
+    async def retrieve_many(
+        self,
+        queries: List[str],
+        job_id: str,
+        top_k: int = None,
+        score_threshold: float = None,
+        query_embeddings=None
+    ) -> List[List[RetrievalResult]]:
+        """
+        Retrieve the most relevant code chunks for several queries.
+        
+        The job is validated once, all queries are embedded in a single
+        call, and the similarity searches run concurrently.
+        
+        Args:
+            queries: Search query strings
+            job_id: Job ID to search within
+            top_k: Number of results to return per query
+            score_threshold: Minimum similarity score (0-1)
+            query_embeddings: Precomputed (N, D) embeddings of queries
+            
+        Returns:
+            One ranked list of RetrievalResult objects per query
+            
+        Raises:
+            RetrieverError: If retrieval fails
+        """
+        top_k = top_k if top_k is not None else settings.DEFAULT_TOP_K
+        threshold = score_threshold if score_threshold is not None else settings.SIMILARITY_THRESHOLD
+        
+        logger.info(f"Retrieving chunks for {len(queries)} queries in job {job_id}, top_k={top_k}")
+        
+        await self._ensure_job_embedded(job_id)
+        
+        if query_embeddings is None:
+            query_embeddings = await self.embed_queries(queries)
+        
+        return list(await asyncio.gather(*[
+            self._search(query_embedding, job_id, top_k, threshold)
+            for query_embedding in query_embeddings
+        ]))
+    
+    def is_known_job(self, job_id: str) -> bool:
+        """
+        Check whether a job exists without touching the query path.
+        
+        Jobs seen before are answered from memory; others cost a single
+        job lookup.
+        
+        Args:
+            job_id: Job ID to check
+            
+        Returns:
+            True if the job exists
+        """
+        if job_id in self._known_jobs:
+            return True
+        return JobRepository.get_job(job_id) is not None
+    
+    def forget_job(self, job_id: str) -> None:
+        """Drop a job from the known-jobs set (e.g. after deletion)."""
+        self._known_jobs.discard(job_id)
+    
+    async def _ensure_job_embedded(self, job_id: str) -> None:
+        """Validate the job exists and embed its chunks if needed."""
+        if job_id in self._known_jobs:
+            return
+        
         job = JobRepository.get_job(job_id)
         if not job:
             raise RetrieverError(f"Job not found: {job_id}")
@@ -98,16 +224,18 @@ class Retriever:
         has_embeddings = await self._vector_store.has_embeddings(job_id)
         if not has_embeddings:
             logger.warning(f"No embeddings found for job {job_id}, generating now...")
-            await self.embed_job_chunks(job_id)
-        
-        # Generate query embedding
-        try:
-            query_embedding = await self._embedding_service.generate_single_embedding(query)
-        except Exception as e:
-            logger.error(f"Failed to generate query embedding: {e}")
-            raise RetrieverError(f"Failed to generate query embedding: {e}")
-        
-        # Perform similarity search
+            await self.embed_job_chunks(job_id, append_only=True)
+        else:
+            self._known_jobs.add(job_id)
+    
+    async def _search(
+        self,
+        query_embedding,
+        job_id: str,
+        top_k: int,
+        threshold: float
+    ) -> List[RetrievalResult]:
+        """Run a similarity search and convert the hits to RetrievalResults."""
         try:
             search_results = await self._vector_store.similarity_search(
                 query_vector=query_embedding,
@@ -120,7 +248,7 @@ class Retriever:
             raise RetrieverError(f"Similarity search failed: {e}")
         
         # Convert to RetrievalResult objects
-        results = [
+        return [
             RetrievalResult(
                 chunk_id=sr.chunk_id,
                 file_path=sr.file_path,
@@ -132,16 +260,15 @@ class Retriever:
             )
             for sr in search_results
         ]
-        
-        logger.info(f"Retrieved {len(results)} chunks for query")
-        return results
     
-    async def embed_job_chunks(self, job_id: str) -> int:
+    async def embed_job_chunks(self, job_id: str, append_only: bool = False) -> int:
         """
         Generate and store embeddings for all chunks of a job.
         
         Args:
             job_id: Job ID to embed chunks for
+            append_only: The job has no stored embeddings yet, so skip the
+                vector store's existence check
             
         Returns:
             Number of chunks embedded
@@ -165,7 +292,7 @@ class Retriever:
         
         # Generate embeddings
         try:
-            embeddings = await self._embedding_service.generate_embeddings(texts)
+            embeddings = await self._embedding_service.generate_embeddings_ndarray(texts)
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {e}")
             raise RetrieverError(f"Failed to generate embeddings: {e}")
@@ -190,12 +317,17 @@ class Retriever:
         
         # Store embeddings
         try:
-            count = await self._vector_store.upsert_embeddings(documents)
+            count = await self._vector_store.upsert_embeddings(
+                documents, append_only=append_only
+            )
             logger.info(f"Stored {count} embeddings for job {job_id}")
-            return count
         except Exception as e:
             logger.error(f"Failed to store embeddings: {e}")
             raise RetrieverError(f"Failed to store embeddings: {e}")
+        
+        if count:
+            self._known_jobs.add(job_id)
+        return count
     
     async def retrieve_with_context(
         self,
@@ -277,16 +409,32 @@ class Retriever:
 
 # Module-level convenience functions
 _retriever: Optional[Retriever] = None
+_retriever_lock = threading.Lock()
 
 
 def get_retriever() -> Retriever:
-    """Get or create the global retriever instance."""
+    """Get or create the global retriever instance (thread-safe)."""
     global _retriever
     if _retriever is None:
-        _retriever = Retriever()
+        with _retriever_lock:
+            if _retriever is None:
+                _retriever = Retriever()
     return _retriever
 
 
+def forget_job(job_id: str) -> None:
+    """
+    Drop a job from the global retriever's known-jobs set.
+    
+    Does nothing if the retriever has not been created yet.
+    
+    Args:
+        job_id: Job ID to forget
+    """
+    if _retriever is not None:
+        _retriever.forget_job(job_id)
+
+
 async def retrieve(
     query: str,
     job_id: str,
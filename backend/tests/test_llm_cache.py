@@ -0,0 +1,164 @@
+"""
+Unit tests for the exact-match LLM response cache.
+Run with: python -m pytest tests/test_llm_cache.py -v
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CountingLLMClient:
+    """Stand-in LLM client that counts calls and can be made to fail."""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def get_model_name(self) -> str:
+        return "counting-llm"
+
+    async def generate(self, prompt, max_tokens=1024, temperature=0.7, **kwargs):
+        from src.generation.llm_client import LLMResponse
+
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return LLMResponse(
+            content=f"answer to {prompt}",
+            model="counting-llm",
+            provider="mock",
+            tokens_used=len(prompt.split())
+        )
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCachedLLMClient:
+    """Test CachedLLMClient caching and request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_coalesce(self):
+        """N concurrent identical deterministic calls reach the client once."""
+        from src.generation.llm_cache import CachedLLMClient
+
+        inner = CountingLLMClient(delay=0.05)
+        client = CachedLLMClient(inner)
+
+        responses = await asyncio.gather(*[
+            client.generate("Question: what?", max_tokens=64, temperature=0.0)
+            for _ in range(8)
+        ])
+
+        assert inner.calls == 1
+        assert len({r.content for r in responses}) == 1
+        # Only the caller that sent the request is charged for its tokens
+        assert sum(1 for r in responses if r.tokens_used) == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_joined_callers(self):
+        """Every caller waiting on a failed request sees its error."""
+        from src.generation.llm_cache import CachedLLMClient
+        from src.generation.llm_client import LLMClientError
+
+        inner = CountingLLMClient(delay=0.05, error=LLMClientError("backend down"))
+        client = CachedLLMClient(inner)
+
+        results = await asyncio.gather(
+            *[client.generate("prompt", temperature=0.0) for _ in range(5)],
+            return_exceptions=True
+        )
+
+        assert inner.calls == 1
+        assert all(isinstance(r, LLMClientError) for r in results)
+        assert len(client) == 0
+
+        # The failure is not cached: the next call retries
+        inner.error = None
+        await client.generate("prompt", temperature=0.0)
+        assert inner.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_sampling_bypasses_cache(self):
+        """Calls with temperature > 0 are always sent to the client."""
+        from src.generation.llm_cache import CachedLLMClient
+
+        inner = CountingLLMClient()
+        client = CachedLLMClient(inner)
+
+        await client.generate("prompt", temperature=0.7)
+        await client.generate("prompt", temperature=0.7)
+
+        assert inner.calls == 2
+        assert len(client) == 0
+
+    @pytest.mark.asyncio
+    async def test_repeat_is_served_from_cache(self):
+        """A repeated deterministic call is a hit with no tokens spent."""
+        from src.generation.llm_cache import CachedLLMClient
+
+        inner = CountingLLMClient()
+        client = CachedLLMClient(inner)
+
+        first = await client.generate("prompt", temperature=0.0)
+        second = await client.generate("prompt", temperature=0.0)
+
+        assert inner.calls == 1
+        assert second.content == first.content
+        assert second.tokens_used == 0
+        assert client.hit_ratio() == 0.5
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, monkeypatch):
+        """Entries older than the TTL are sent to the client again."""
+        from src.generation import llm_cache
+
+        clock = FakeClock()
+        monkeypatch.setattr(llm_cache.time, "monotonic", clock)
+        inner = CountingLLMClient()
+        client = llm_cache.CachedLLMClient(inner, ttl=10.0)
+
+        await client.generate("prompt", temperature=0.0)
+        clock.now += 5
+        await client.generate("prompt", temperature=0.0)
+        assert inner.calls == 1
+
+        clock.now += 6
+        await client.generate("prompt", temperature=0.0)
+        assert inner.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """The least recently used entry is evicted beyond max_size."""
+        from src.generation.llm_cache import CachedLLMClient
+
+        inner = CountingLLMClient()
+        client = CachedLLMClient(inner, max_size=2)
+
+        await client.generate("a", temperature=0.0)
+        await client.generate("b", temperature=0.0)
+        await client.generate("a", temperature=0.0)  # "a" is now most recent
+        await client.generate("c", temperature=0.0)  # evicts "b"
+        assert inner.calls == 3
+        assert len(client) == 2
+
+        await client.generate("a", temperature=0.0)
+        assert inner.calls == 3
+        await client.generate("b", temperature=0.0)
+        assert inner.calls == 4
@@ -0,0 +1,117 @@
+"""
+Unit tests for the semantic response cache.
+Run with: python -m pytest tests/test_semantic_cache.py -v
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def unit(*values):
+    """L2-normalized float32 vector."""
+    v = np.asarray(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSemanticCache:
+    """Test SemanticCache lookups, scoping and eviction."""
+
+    def test_hit_above_threshold(self):
+        """A near-identical query is served from the cache."""
+        from src.generation.semantic_cache import SemanticCache
+
+        cache = SemanticCache(threshold=0.97)
+        cache.put("job", "what does it do?", unit(1, 0, 0), "answer")
+
+        assert cache.get("job", unit(1, 0.05, 0)) == "answer"
+
+    def test_miss_below_threshold(self):
+        """A merely related query is not served from the cache."""
+        from src.generation.semantic_cache import SemanticCache
+
+        cache = SemanticCache(threshold=0.97)
+        cache.put("job", "what does it do?", unit(1, 0, 0), "answer")
+
+        # cosine similarity ~0.89
+        assert cache.get("job", unit(1, 0.5, 0)) is None
+
+    def test_scopes_are_isolated(self):
+        """An identical query in another job never hits."""
+        from src.generation.semantic_cache import SemanticCache
+
+        cache = SemanticCache()
+        cache.put(("job-a", 5), "q", unit(1, 0, 0), "answer a")
+
+        assert cache.get(("job-b", 5), unit(1, 0, 0)) is None
+        assert cache.get(("job-a", 5), unit(1, 0, 0)) == "answer a"
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Entries stop matching once their TTL has passed."""
+        from src.generation import semantic_cache
+
+        clock = FakeClock()
+        monkeypatch.setattr(semantic_cache.time, "monotonic", clock)
+        cache = semantic_cache.SemanticCache(ttl=10.0)
+        cache.put("job", "old", unit(1, 0, 0), "old answer")
+        clock.now += 5
+        cache.put("job", "new", unit(0, 1, 0), "new answer")
+
+        clock.now += 6
+        assert cache.get("job", unit(1, 0, 0)) is None
+        assert cache.get("job", unit(0, 1, 0)) == "new answer"
+        assert len(cache) == 1
+
+    def test_lru_eviction_updates_scope_index(self):
+        """An evicted entry is no longer returned from a built scope index."""
+        from src.generation.semantic_cache import SemanticCache
+
+        cache = SemanticCache(max_size=2)
+        cache.put("job", "a", unit(1, 0, 0), "a")
+        cache.put("job", "b", unit(0, 1, 0), "b")
+        # Builds the scope index and makes "a" most recently used
+        assert cache.get("job", unit(1, 0, 0)) == "a"
+
+        cache.put("other", "c", unit(0, 0, 1), "c")
+
+        assert len(cache) == 2
+        assert cache.get("job", unit(0, 1, 0)) is None
+        assert cache.get("job", unit(1, 0, 0)) == "a"
+
+    def test_invalidate_drops_matching_scopes(self):
+        """invalidate() removes only the entries of matching scopes."""
+        from src.generation.semantic_cache import SemanticCache
+
+        cache = SemanticCache()
+        cache.put(("job-a", 5), "q", unit(1, 0, 0), "a")
+        cache.put(("job-a", 10), "q", unit(1, 0, 0), "a10")
+        cache.put(("job-b", 5), "q", unit(1, 0, 0), "b")
+        assert cache.get(("job-a", 5), unit(1, 0, 0)) == "a"
+
+        assert cache.invalidate(lambda scope: scope[0] == "job-a") == 2
+        assert cache.get(("job-a", 5), unit(1, 0, 0)) is None
+        assert cache.get(("job-b", 5), unit(1, 0, 0)) == "b"
+
+    def test_zero_size_disables(self):
+        """max_size 0 stores nothing."""
+        from src.generation.semantic_cache import SemanticCache
+
+        cache = SemanticCache(max_size=0)
+        cache.put("job", "q", unit(1, 0, 0), "answer")
+
+        assert len(cache) == 0
+        assert cache.get("job", unit(1, 0, 0)) is None